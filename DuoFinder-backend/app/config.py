@@ -7,3 +7,67 @@ SECRET_KEY = os.getenv("SECRET_KEY", "fallback-secret")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 DATABASE_URL = os.getenv("DATABASE_URL")
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
+
+# Índice de candidatos en memoria (/matches/suggestions)
+CANDIDATE_RANK_BUCKET_SIZE = int(os.getenv("CANDIDATE_RANK_BUCKET_SIZE", "4"))
+CANDIDATE_RANK_WINDOW = int(os.getenv("CANDIDATE_RANK_WINDOW", "3"))
+
+# Set de "ya swipeados" por usuario (LRU con TTL: acota cuánto tarda en verse un swipe hecho en otro worker)
+SWIPED_CACHE_MAX_USERS = int(os.getenv("SWIPED_CACHE_MAX_USERS", "20000"))
+SWIPED_CACHE_TTL_SECONDS = float(os.getenv("SWIPED_CACHE_TTL_SECONDS", "60"))
+
+# Mazo precalculado de sugerencias por usuario
+SUGGESTION_DECK_SIZE = int(os.getenv("SUGGESTION_DECK_SIZE", "100"))
+SUGGESTION_DECK_LOW_WATER = int(os.getenv("SUGGESTION_DECK_LOW_WATER", "20"))
+SUGGESTION_DECK_MAX_USERS = int(os.getenv("SUGGESTION_DECK_MAX_USERS", "5000"))
+SUGGESTION_DECK_WORKERS = int(os.getenv("SUGGESTION_DECK_WORKERS", "2"))
+
+# Cola de "likes recibidos" por usuario (LRU con TTL, igual que el set de swipeados)
+INCOMING_LIKES_MAX_USERS = int(os.getenv("INCOMING_LIKES_MAX_USERS", "20000"))
+INCOMING_LIKES_TTL_SECONDS = float(os.getenv("INCOMING_LIKES_TTL_SECONDS", "60"))
+
+# Pub/sub del chat en tiempo real: "memory" (un worker) o "broker" (varios workers)
+PUBSUB_BACKEND = os.getenv("PUBSUB_BACKEND", "memory")
+PUBSUB_BROKER_HOST = os.getenv("PUBSUB_BROKER_HOST", "127.0.0.1")
+PUBSUB_BROKER_PORT = int(os.getenv("PUBSUB_BROKER_PORT", "8765"))
+PUBSUB_QUEUE_SIZE = int(os.getenv("PUBSUB_QUEUE_SIZE", "100"))
+# espera máxima entre reintentos de conexión al broker (backoff exponencial desde 0.5 s)
+PUBSUB_RECONNECT_MAX_SECONDS = float(os.getenv("PUBSUB_RECONNECT_MAX_SECONDS", "10"))
+CHAT_LONGPOLL_MAX_TIMEOUT = float(os.getenv("CHAT_LONGPOLL_MAX_TIMEOUT", "30"))
+# cada cuánto /chats/ws revalida el token (vencimiento y época): un token revocado no sigue suscripto
+CHAT_WS_REVALIDATE_SECONDS = float(os.getenv("CHAT_WS_REVALIDATE_SECONDS", "60"))
+
+# Compactación de mensajes viejos en segmentos comprimidos (scripts/compact_chat.py)
+CHAT_COLD_AFTER_DAYS = int(os.getenv("CHAT_COLD_AFTER_DAYS", "90"))
+CHAT_SEGMENT_SIZE = int(os.getenv("CHAT_SEGMENT_SIZE", "500"))
+
+# Índice invertido para /chats/search (archivo local, se reconstruye si no existe)
+CHAT_SEARCH_INDEX_PATH = os.getenv("CHAT_SEARCH_INDEX_PATH", "data/chat_search.idx")
+
+# Filtro de términos prohibidos (chat, Bio, Username); el archivo se relee si cambia
+CONTENT_FILTER_TERMS_PATH = os.getenv("CONTENT_FILTER_TERMS_PATH", "data/banned_terms.txt")
+CONTENT_FILTER_RELOAD_SECONDS = float(os.getenv("CONTENT_FILTER_RELOAD_SECONDS", "30"))
+
+# Caché match_id -> miembros para autorizar en /chats
+MATCH_CACHE_MAX = int(os.getenv("MATCH_CACHE_MAX", "50000"))
+MATCH_CACHE_TTL_SECONDS = float(os.getenv("MATCH_CACHE_TTL_SECONDS", "300"))
+
+# Caché de usuarios autenticados (sub del JWT -> Principal)
+PRINCIPAL_CACHE_MAX = int(os.getenv("PRINCIPAL_CACHE_MAX", "50000"))
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+
+# Cada cuánto cada worker relee dbo.UserTokenEpoch (revocación de JWT)
+TOKEN_EPOCH_REFRESH_SECONDS = float(os.getenv("TOKEN_EPOCH_REFRESH_SECONDS", "10"))
+
+# Hash de contraseñas: costo de bcrypt y pool acotado propio (ver app/utils/password_hasher.py)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+
+# Engine async (app/db/async_connection.py); sin URL se deriva de DATABASE_URL
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", "20"))
+DB_ASYNC_MAX_OVERFLOW = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "20"))
+
+# Compactación del journal del índice de búsqueda: se rearma al duplicar su tamaño (y pasar este mínimo)
+CHAT_SEARCH_COMPACT_MIN_MB = int(os.getenv("CHAT_SEARCH_COMPACT_MIN_MB", "64"))
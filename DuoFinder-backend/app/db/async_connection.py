@@ -0,0 +1,69 @@
+# app/db/async_connection.py
+"""
+Engine y sesión async, al lado de los sync de app/db/connection.py.
+
+Los endpoints `async def` usan get_async_db: las queries se esperan en el
+event loop en vez de ocupar un thread del threadpool de Starlette. Los helpers
+sync que ya existen (cachés, thread_summary, chat_archive) se reutilizan con
+`await adb.run_sync(helper, ...)`, que les pasa una Session sync cuyas
+queries siguen siendo async por debajo.
+
+El driver sale de ASYNC_DATABASE_URL; si no está, se deriva de DATABASE_URL
+(mssql+pyodbc -> mssql+aioodbc, sqlite -> sqlite+aiosqlite). Localmente y en
+pruebas alcanza con una URL sqlite y aiosqlite instalado.
+"""
+import logging
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import ASYNC_DATABASE_URL, DATABASE_URL, DB_ASYNC_MAX_OVERFLOW, DB_ASYNC_POOL_SIZE
+
+logger = logging.getLogger(__name__)
+
+# driver sync -> equivalente async
+ASYNC_DRIVERS = {
+    "mssql": "aioodbc",
+    "mssql+pyodbc": "aioodbc",
+    "sqlite": "aiosqlite",
+    "sqlite+pysqlite": "aiosqlite",
+}
+
+
+def async_url(url: Optional[str]) -> Optional[str]:
+    """URL async equivalente a `url` (o la misma si ya es async / no se conoce el driver)."""
+    if not url:
+        return None
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is None:
+        return url
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+def _create_engine(url: Optional[str]) -> Optional[AsyncEngine]:
+    if not url:
+        return None
+    kwargs = {"pool_pre_ping": True}
+    if make_url(url).get_backend_name() != "sqlite":
+        kwargs.update(pool_size=DB_ASYNC_POOL_SIZE, max_overflow=DB_ASYNC_MAX_OVERFLOW)
+    try:
+        return create_async_engine(url, **kwargs)
+    except Exception as e:
+        # sin driver async los endpoints async fallan; los sync siguen funcionando
+        logger.warning("No se pudo crear el engine async: %s", e)
+        return None
+
+
+async_engine = _create_engine(ASYNC_DATABASE_URL or async_url(DATABASE_URL))
+
+# expire_on_commit=False: después del commit no se puede hacer lazy load en async
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    if async_engine is None:
+        raise RuntimeError("Engine async no configurado (ASYNC_DATABASE_URL / driver async)")
+    async with AsyncSessionLocal() as db:
+        yield db
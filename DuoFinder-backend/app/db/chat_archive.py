@@ -0,0 +1,164 @@
+# app/db/chat_archive.py
+"""
+Almacenamiento frío del chat: los mensajes viejos salen de dbo.Chat y pasan a
+dbo.ChatSegment, en segmentos por match de hasta CHAT_SEGMENT_SIZE mensajes
+(JSON comprimido con zlib). Siempre se compacta un prefijo del hilo (por ID),
+así cada match queda partido en [segmentos fríos] + [filas calientes] y
+get_chat puede paginar de uno a otro por ID sin huecos.
+
+Los mensajes compactados sin leer pasan como leídos: mark_read solo recuenta
+filas calientes, así que compact_match los guarda con ReadChat=true y descuenta
+de los no leídos de dbo.MatchThreadSummary los que movió.
+"""
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session, noload
+
+from app.config import CHAT_SEGMENT_SIZE
+from app.models.chat import Chat
+from app.models.chat_segment import ChatSegment
+from app.models.match_thread_summary import MatchThreadSummary
+from app.models.matches import Matches
+
+
+@dataclass(frozen=True)
+class ArchivedChat:
+    """Mismos nombres que el modelo Chat, para que ChatMessageOut.from_model sirva igual."""
+    ID: int
+    MatchesID: int
+    SenderID: int
+    ContentChat: str
+    CreatedDate: Optional[datetime]
+    ReadChat: bool
+
+
+def encode_segment(rows: List[Chat], mark_read: bool = False) -> bytes:
+    payload = [
+        [r.ID, r.SenderID, r.ContentChat, r.CreatedDate.isoformat() if r.CreatedDate else None,
+         mark_read or bool(r.ReadChat)]
+        for r in rows
+    ]
+    return zlib.compress(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode(), 6)
+
+
+def decode_segment(segment: ChatSegment) -> List[ArchivedChat]:
+    payload = json.loads(zlib.decompress(segment.Payload))
+    return [
+        ArchivedChat(
+            ID=mid,
+            MatchesID=segment.MatchesID,
+            SenderID=sender,
+            ContentChat=content,
+            CreatedDate=datetime.fromisoformat(created) if created else None,
+            ReadChat=read,
+        )
+        for mid, sender, content, created, read in payload
+    ]
+
+
+def archived_before(db: Session, match_id: int, before_id: Optional[int], n: int) -> List[ArchivedChat]:
+    """Hasta n mensajes fríos con ID < before_id, del más nuevo al más viejo."""
+    q = db.query(ChatSegment).filter(ChatSegment.MatchesID == match_id)
+    if before_id is not None:
+        q = q.filter(ChatSegment.FirstID < before_id)
+    out: List[ArchivedChat] = []
+    for segment in q.order_by(ChatSegment.SegmentNo.desc()):
+        rows = [r for r in decode_segment(segment) if before_id is None or r.ID < before_id]
+        out.extend(reversed(rows))
+        if len(out) >= n:
+            break
+    return out[:n]
+
+
+def archived_after(db: Session, match_id: int, after_id: int, n: int) -> List[ArchivedChat]:
+    """Hasta n mensajes fríos con ID > after_id, en orden ascendente."""
+    q = db.query(ChatSegment).filter(ChatSegment.MatchesID == match_id, ChatSegment.LastID > after_id)
+    out: List[ArchivedChat] = []
+    for segment in q.order_by(ChatSegment.SegmentNo.asc()):
+        out.extend(r for r in decode_segment(segment) if r.ID > after_id)
+        if len(out) >= n:
+            break
+    return out[:n]
+
+
+def archived_by_ids(db: Session, match_id: int, ids: List[int]) -> List[ArchivedChat]:
+    """Mensajes fríos puntuales de un match (p. ej. resultados de búsqueda)."""
+    if not ids:
+        return []
+    wanted = set(ids)
+    segments = db.query(ChatSegment).filter(
+        ChatSegment.MatchesID == match_id,
+        ChatSegment.FirstID <= max(wanted),
+        ChatSegment.LastID >= min(wanted),
+    )
+    return [r for segment in segments for r in decode_segment(segment) if r.ID in wanted]
+
+
+def compact_match(
+    db: Session, match_id: int, cutoff: datetime, segment_size: int = CHAT_SEGMENT_SIZE
+) -> int:
+    """
+    Mueve a segmentos el prefijo del hilo anterior a `cutoff` (hasta el primer
+    mensaje reciente). Los no leídos quedan leídos en el segmento y se descuentan
+    del resumen del match. No hace commit. Devuelve cuántos mensajes movió.
+    """
+    first_hot = db.query(func.min(Chat.ID)).filter(
+        Chat.MatchesID == match_id, Chat.CreatedDate >= cutoff
+    ).scalar()
+    next_no = (
+        db.query(func.max(ChatSegment.SegmentNo)).filter(ChatSegment.MatchesID == match_id).scalar() or 0
+    ) + 1
+
+    users = db.query(Matches.UserID1, Matches.UserID2).filter(Matches.ID == match_id).one_or_none()
+    moved = 0
+    unread: Dict[int, int] = {}  # receptor -> no leídos movidos
+    while True:
+        q = db.query(Chat).options(noload(Chat.match), noload(Chat.sender)).filter(Chat.MatchesID == match_id)
+        if first_hot is not None:
+            q = q.filter(Chat.ID < first_hot)
+        rows = q.order_by(Chat.ID).limit(segment_size).all()
+        if not rows:
+            _discount_unread(db, match_id, users, unread)
+            return moved
+        for r in rows:
+            if not r.ReadChat and users is not None:
+                receiver = users.UserID2 if r.SenderID == users.UserID1 else users.UserID1
+                unread[receiver] = unread.get(receiver, 0) + 1
+
+        db.add(ChatSegment(
+            MatchesID=match_id,
+            SegmentNo=next_no,
+            FirstID=rows[0].ID,
+            LastID=rows[-1].ID,
+            MessageCount=len(rows),
+            FirstDate=rows[0].CreatedDate,
+            LastDate=rows[-1].CreatedDate,
+            Payload=encode_segment(rows, mark_read=True),
+        ))
+        # el lote es un prefijo: todo lo <= LastID del match es exactamente lo que se movió
+        db.query(Chat).filter(Chat.MatchesID == match_id, Chat.ID <= rows[-1].ID).delete(
+            synchronize_session=False
+        )
+        db.flush()
+        next_no += 1
+        moved += len(rows)
+
+
+def _discount_unread(db: Session, match_id: int, users, unread: Dict[int, int]) -> None:
+    """Resta de UnreadUser1/2 los no leídos que pasaron a segmentos (sin bajar de 0)."""
+    if users is None or not unread:
+        return
+    values = {}
+    for column, user_id in ((MatchThreadSummary.UnreadUser1, users.UserID1),
+                            (MatchThreadSummary.UnreadUser2, users.UserID2)):
+        n = unread.get(user_id, 0)
+        if n:
+            values[column] = case((column > n, column - n), else_=0)
+    db.query(MatchThreadSummary).filter(MatchThreadSummary.MatchesID == match_id).update(
+        values, synchronize_session=False
+    )
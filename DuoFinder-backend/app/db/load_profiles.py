@@ -0,0 +1,35 @@
+# app/db/load_profiles.py
+"""
+Perfiles de carga para User: qué columnas y relaciones trae cada uso.
+
+    db.query(User).options(*USER_PRINCIPAL).filter(...)
+
+- USER_PRINCIPAL: lo mínimo para autenticar (login, get_current_user).
+- USER_PROFILE_CARD: tarjeta de otro usuario (nombre, edad, bio, imágenes).
+- USER_FULL: todas las columnas, sin colecciones; /users/me arma juegos e
+  imágenes con sus propias queries.
+
+Todos terminan en noload("*"): nada que no esté pedido se carga, ni siquiera
+al acceder al atributo.
+
+Las opciones se arman al importar este módulo y load_only() configura los
+mappers en ese momento: app.models (que importa app.models.user) registra
+todos los modelos antes, así las relaciones por nombre ya resuelven.
+"""
+from sqlalchemy.orm import load_only, noload, selectinload
+
+from app.models.user import User
+from app.models.user_images import UserImages
+
+USER_PRINCIPAL = (
+    load_only(User.ID, User.Mail, User.Password, User.IsActive, User.Server),
+    noload("*"),
+)
+
+USER_PROFILE_CARD = (
+    load_only(User.ID, User.Username, User.BirthDate, User.Bio, User.Server, User.IsActive),
+    selectinload(User.images).load_only(UserImages.ImageURL, UserImages.IsPrimary).noload("*"),
+    noload("*"),
+)
+
+USER_FULL = (noload("*"),)
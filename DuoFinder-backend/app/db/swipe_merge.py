@@ -0,0 +1,183 @@
+# app/db/swipe_merge.py
+"""
+Registro atómico de swipes (T-SQL).
+
+Un único batch agrega los swipes al ledger append-only dbo.Swipes y promueve a
+dbo.Matches solo las parejas con like mutuo (o actualiza mi lado si la pareja ya
+tenía fila, p. ej. un unlike después del match). Si el swipe completa un match
+inserta el mensaje de sistema en dbo.Chat y lo registra en dbo.MatchThreadSummary
+(ver app/db/thread_summary.py). Un applock por pareja (tomado en orden
+canónico para no generar deadlocks entre lotes) serializa swipes concurrentes
+sobre la misma pareja, así dos likes simultáneos siempre se ven entre sí.
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+MATCH_SYSTEM_MESSAGE = "¡Se creó el chat por match!"
+
+_MERGE_SQL = """
+SET NOCOUNT ON;
+DECLARE @in TABLE (
+    TargetID INT PRIMARY KEY, UserID1 INT, UserID2 INT, MySide TINYINT, Liked BIT, IsRanked BIT,
+    PrevMine BIT NULL, Theirs BIT NULL, SwipeID BIGINT NULL
+);
+DECLARE @ids TABLE (TargetID INT, SwipeID BIGINT);
+DECLARE @merged TABLE (
+    MatchID INT, UserID1 INT, UserID2 INT,
+    PrevL1 BIT NULL, PrevL2 BIT NULL, NewL1 BIT NULL, NewL2 BIT NULL
+);
+DECLARE @chats TABLE (MatchID INT, ChatID INT);
+
+INSERT INTO @in (TargetID, UserID1, UserID2, MySide, Liked, IsRanked)
+VALUES {values};
+
+-- un lock por pareja, en orden (UserID1, UserID2)
+DECLARE @lo INT = 0, @hi INT = 0, @lk NVARCHAR(64);
+WHILE 1 = 1
+BEGIN
+    SELECT TOP 1 @lo = UserID1, @hi = UserID2 FROM @in
+    WHERE UserID1 > @lo OR (UserID1 = @lo AND UserID2 > @hi)
+    ORDER BY UserID1, UserID2;
+    IF @@ROWCOUNT = 0 BREAK;
+    SET @lk = CONCAT(N'swipe:', @lo, N':', @hi);
+    EXEC sp_getapplock @Resource = @lk, @LockMode = N'Exclusive', @LockOwner = N'Transaction';
+END;
+
+-- último swipe previo mío y último del otro hacia mí (seeks sobre el clustered por actor)
+UPDATE i SET
+    PrevMine = (SELECT TOP 1 s.Liked FROM dbo.Swipes s
+                WHERE s.ActorID = :me AND s.TargetID = i.TargetID ORDER BY s.ID DESC),
+    Theirs = (SELECT TOP 1 s.Liked FROM dbo.Swipes s
+              WHERE s.ActorID = i.TargetID AND s.TargetID = :me ORDER BY s.ID DESC)
+FROM @in i;
+
+INSERT INTO dbo.Swipes (ActorID, TargetID, Liked, CreatedDate)
+OUTPUT inserted.TargetID, inserted.ID INTO @ids
+SELECT :me, TargetID, Liked, SYSUTCDATETIME() FROM @in;
+
+UPDATE i SET SwipeID = d.SwipeID FROM @in i JOIN @ids d ON d.TargetID = i.TargetID;
+
+MERGE dbo.Matches WITH (HOLDLOCK) AS t
+USING @in AS s
+    ON t.UserID1 = s.UserID1 AND t.UserID2 = s.UserID2
+WHEN MATCHED THEN UPDATE SET
+    LikedByUser1 = CASE WHEN s.MySide = 1 THEN s.Liked ELSE t.LikedByUser1 END,
+    LikedByUser2 = CASE WHEN s.MySide = 2 THEN s.Liked ELSE t.LikedByUser2 END,
+    IsRanked = s.IsRanked
+WHEN NOT MATCHED BY TARGET AND s.Liked = 1 AND s.Theirs = 1 THEN
+    INSERT (UserID1, UserID2, MatchDate, Status, IsRanked, LikedByUser1, LikedByUser2)
+    VALUES (s.UserID1, s.UserID2, SYSUTCDATETIME(), 1, s.IsRanked, 1, 1)
+OUTPUT inserted.ID, inserted.UserID1, inserted.UserID2,
+       deleted.LikedByUser1, deleted.LikedByUser2,
+       inserted.LikedByUser1, inserted.LikedByUser2
+INTO @merged;
+
+INSERT INTO dbo.Chat (MatchesID, SenderID, ContentChat, CreatedDate, Status, ReadChat)
+OUTPUT inserted.MatchesID, inserted.ID INTO @chats
+SELECT m.MatchID, :me, :sysmsg, SYSUTCDATETIME(), 1, 0
+FROM @merged m
+WHERE m.NewL1 = 1 AND m.NewL2 = 1
+  AND NOT (ISNULL(m.PrevL1, 0) = 1 AND ISNULL(m.PrevL2, 0) = 1)
+  AND NOT EXISTS (SELECT 1 FROM dbo.Chat c WHERE c.MatchesID = m.MatchID AND c.Status = 1)
+  -- un hilo compactado entero ya no tiene filas en dbo.Chat, pero sí segmentos
+  AND NOT EXISTS (SELECT 1 FROM dbo.ChatSegment g WHERE g.MatchesID = m.MatchID);
+
+MERGE dbo.MatchThreadSummary WITH (HOLDLOCK) AS t
+USING (
+    SELECT c.MatchID, c.ChatID,
+           CASE WHEN m.UserID1 = :me THEN 0 ELSE 1 END AS Inc1,
+           CASE WHEN m.UserID2 = :me THEN 0 ELSE 1 END AS Inc2
+    FROM @chats c
+    JOIN @merged m ON m.MatchID = c.MatchID
+) AS s
+    ON t.MatchesID = s.MatchID
+WHEN MATCHED THEN UPDATE SET
+    LastMessageID = s.ChatID,
+    LastSenderID = :me,
+    LastPreview = :sysmsg,
+    LastActivity = SYSUTCDATETIME(),
+    UnreadUser1 = t.UnreadUser1 + s.Inc1,
+    UnreadUser2 = t.UnreadUser2 + s.Inc2
+WHEN NOT MATCHED BY TARGET THEN
+    INSERT (MatchesID, LastMessageID, LastSenderID, LastPreview, LastActivity, UnreadUser1, UnreadUser2)
+    VALUES (s.MatchID, s.ChatID, :me, :sysmsg, SYSUTCDATETIME(), s.Inc1, s.Inc2);
+
+SELECT i.TargetID, i.MySide, i.PrevMine, i.Theirs, i.Liked, i.SwipeID,
+       m.MatchID, m.PrevL1, m.PrevL2, m.NewL1, m.NewL2, c.ChatID
+FROM @in i
+LEFT JOIN @merged m ON m.UserID1 = i.UserID1 AND m.UserID2 = i.UserID2
+LEFT JOIN @chats c ON c.MatchID = m.MatchID;
+"""
+
+
+@dataclass(frozen=True)
+class SwipeOutcome:
+    target_id: int
+    swipe_id: int               # fila en dbo.Swipes
+    match_id: Optional[int]     # solo si la pareja está (o estuvo) en Matches
+    prev_liked: Tuple[Optional[bool], Optional[bool]]  # (usuario menor, usuario mayor)
+    new_liked: Tuple[Optional[bool], Optional[bool]]
+    chat_id: Optional[int]  # mensaje de sistema creado en este batch
+
+    @property
+    def is_match(self) -> bool:
+        return self.new_liked[0] is True and self.new_liked[1] is True
+
+    @property
+    def is_new_match(self) -> bool:
+        was_match = self.prev_liked[0] is True and self.prev_liked[1] is True
+        return self.is_match and not was_match
+
+
+def _bit(value) -> Optional[bool]:
+    return None if value is None else bool(value)
+
+
+def merge_swipes(db: Session, me: int, swipes: List[Tuple[int, bool, int]]) -> List[SwipeOutcome]:
+    """
+    swipes: [(target_id, like, match_is_ranked), ...] con targets distintos de `me`.
+    No hace commit: queda dentro de la transacción de la sesión.
+    """
+    if not swipes:
+        return []
+
+    params = {"me": me, "sysmsg": MATCH_SYSTEM_MESSAGE}
+    values = []
+    for i, (target, like, is_ranked) in enumerate(swipes):
+        u_low, u_high = (me, target) if me < target else (target, me)
+        values.append(f"(:t{i}, :l{i}, :h{i}, :side{i}, :like{i}, :ranked{i})")
+        params.update({
+            f"t{i}": target,
+            f"l{i}": u_low,
+            f"h{i}": u_high,
+            f"side{i}": 1 if me == u_low else 2,
+            f"like{i}": 1 if like else 0,
+            f"ranked{i}": 1 if is_ranked else 0,
+        })
+
+    rows = db.execute(text(_MERGE_SQL.format(values=", ".join(values))), params).fetchall()
+
+    out: List[SwipeOutcome] = []
+    for r in rows:
+        if r.MatchID is not None:
+            prev = (_bit(r.PrevL1), _bit(r.PrevL2))
+            new = (_bit(r.NewL1), _bit(r.NewL2))
+        else:
+            # sin fila en Matches: el estado sale del ledger
+            mine_prev, mine, theirs = _bit(r.PrevMine), _bit(r.Liked), _bit(r.Theirs)
+            prev = (mine_prev, theirs) if r.MySide == 1 else (theirs, mine_prev)
+            new = (mine, theirs) if r.MySide == 1 else (theirs, mine)
+        out.append(
+            SwipeOutcome(
+                target_id=r.TargetID,
+                swipe_id=r.SwipeID,
+                match_id=r.MatchID,
+                prev_liked=prev,
+                new_liked=new,
+                chat_id=r.ChatID,
+            )
+        )
+    return out
@@ -0,0 +1,81 @@
+# app/db/thread_summary.py
+"""
+Mantenimiento de dbo.MatchThreadSummary (T-SQL).
+
+Cada mensaje nuevo actualiza, en la misma transacción que el INSERT en dbo.Chat,
+el último mensaje del match y suma uno a los no leídos del destinatario. Así la
+bandeja y /{match_id}/info leen una fila en lugar de agregar sobre Chat.
+mark_read hace lo inverso al marcar leído hasta un watermark.
+"""
+from datetime import datetime
+from typing import Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.models.chat import Chat
+from app.models.match_thread_summary import MatchThreadSummary
+from app.utils.match_cache import MatchMembership
+
+PREVIEW_LENGTH = 200
+
+_UPSERT_SQL = """
+MERGE dbo.MatchThreadSummary WITH (HOLDLOCK) AS t
+USING (SELECT :match_id AS MatchesID) AS s
+    ON t.MatchesID = s.MatchesID
+WHEN MATCHED THEN UPDATE SET
+    -- monotónico: un commit que llega tarde con un ID menor no pisa al último mensaje
+    LastMessageID = CASE WHEN :message_id > ISNULL(t.LastMessageID, 0) THEN :message_id ELSE t.LastMessageID END,
+    LastSenderID = CASE WHEN :message_id > ISNULL(t.LastMessageID, 0) THEN :sender_id ELSE t.LastSenderID END,
+    LastPreview = CASE WHEN :message_id > ISNULL(t.LastMessageID, 0) THEN :preview ELSE t.LastPreview END,
+    LastActivity = CASE WHEN :message_id > ISNULL(t.LastMessageID, 0) THEN :at ELSE t.LastActivity END,
+    UnreadUser1 = t.UnreadUser1 + :inc1,
+    UnreadUser2 = t.UnreadUser2 + :inc2
+WHEN NOT MATCHED BY TARGET THEN
+    INSERT (MatchesID, LastMessageID, LastSenderID, LastPreview, LastActivity, UnreadUser1, UnreadUser2)
+    VALUES (:match_id, :message_id, :sender_id, :preview, :at, :inc1, :inc2);
+"""
+
+
+def preview(content: str) -> str:
+    return content[:PREVIEW_LENGTH]
+
+
+def record_message(db: Session, match: MatchMembership, message: Chat) -> None:
+    """Registra `message` (ya flusheado, con ID) en el resumen del match. No hace commit."""
+    db.execute(text(_UPSERT_SQL), {
+        "match_id": match.ID,
+        "message_id": message.ID,
+        "sender_id": message.SenderID,
+        "preview": preview(message.ContentChat),
+        "at": message.CreatedDate or datetime.utcnow(),
+        "inc1": 1 if message.SenderID != match.UserID1 else 0,
+        "inc2": 1 if message.SenderID != match.UserID2 else 0,
+    })
+
+
+def mark_read(db: Session, match: MatchMembership, reader_id: int, up_to_id: int) -> Tuple[int, int]:
+    """
+    Marca como leídos los mensajes del partner con ID <= up_to_id (un solo UPDATE)
+    y recalcula el contador del lector con lo que queda sin leer después del
+    watermark (rango chico sobre IX_Chat_MatchesID_ID). No hace commit.
+    Devuelve (marcados, no_leídos_restantes).
+    """
+    unread = [
+        Chat.MatchesID == match.ID,
+        Chat.SenderID != reader_id,
+        Chat.ReadChat == False,
+    ]
+    marked = (
+        db.query(Chat)
+        .filter(*unread, Chat.ID <= up_to_id)
+        .update({Chat.ReadChat: True}, synchronize_session=False)
+    )
+
+    remaining = select(func.count(Chat.ID)).where(*unread, Chat.ID > up_to_id).scalar_subquery()
+    counter = MatchThreadSummary.UnreadUser1 if reader_id == match.UserID1 else MatchThreadSummary.UnreadUser2
+    db.query(MatchThreadSummary).filter(MatchThreadSummary.MatchesID == match.ID).update(
+        {counter: remaining}, synchronize_session=False
+    )
+    left = db.query(counter).filter(MatchThreadSummary.MatchesID == match.ID).scalar()
+    return marked, left or 0
@@ -1,5 +1,6 @@
 # main.py  —  DuoFinder 
 
+import logging
 from datetime import datetime, timedelta
 from typing import Optional
 from os import getenv
@@ -29,6 +30,16 @@ from urllib.parse import quote_plus
 from app.routers import auth, user, match, chat, community
 
 from app.models.user import User
+from app.db.load_profiles import USER_FULL, USER_PRINCIPAL
+from app.db import connection as db_connection
+from app.db import async_connection as db_async
+from app.utils.candidate_index import candidate_index
+from app.utils.chat_search import chat_search
+from app.utils.principal_cache import Principal
+from app.utils.token_epochs import token_epochs
+from app.utils import security
+
+logger = logging.getLogger(__name__)
 
 # =========================
 # CONFIG
@@ -88,8 +99,52 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods including OPTIONS
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["X-Next-Cursor"],  # cursor de paginación (/matches/suggestions)
 )
 
+# ───────────────────────────
+# Startup: cachés en memoria
+# ───────────────────────────
+@app.on_event("startup")
+def warm_candidate_index():
+    db = db_connection.SessionLocal()
+    try:
+        candidate_index.load(db)
+    except Exception as e:
+        # si la DB no responde al arrancar, el índice se carga en el primer request
+        logger.warning("No se pudo precargar el índice de candidatos: %s", e)
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+def warm_chat_search():
+    db = db_connection.SessionLocal()
+    try:
+        chat_search.load(db)
+    except Exception as e:
+        logger.warning("No se pudo precargar el índice de búsqueda del chat: %s", e)
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+def warm_token_epochs():
+    db = db_connection.SessionLocal()
+    try:
+        if not token_epochs.load(db):
+            # los tokens con época reciben 503 hasta que alguna lectura funcione
+            logger.warning("No se pudo precargar la tabla de épocas de tokens")
+    finally:
+        db.close()
+
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    if db_async.async_engine is not None:
+        await db_async.async_engine.dispose()
+
+
 # =========================
 # UTILS
 # =========================
@@ -108,10 +163,10 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")  # /login devuelve token
 
 def hash_password(p: str) -> str:
-    return pwd_context.hash(p)
+    return security.hash_password(p)
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    return security.verify_password(plain, hashed)
 
 def create_access_token(data: dict, minutes: Optional[int] = None) -> str:
     to_encode = data.copy()
@@ -119,10 +174,10 @@ def create_access_token(data: dict, minutes: Optional[int] = None) -> str:
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-async def get_current_user(
+def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
-) -> User:
+) -> Principal:
     cred_exc = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No autenticado",
@@ -130,15 +185,12 @@ async def get_current_user(
     )
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email = payload.get("sub")
-        if email is None:
-            raise cred_exc
     except JWTError:
         raise cred_exc
-    user = db.execute(select(User).where(User.Mail == email)).scalar_one_or_none()
-    if not user or not user.IsActive:
+    principal = auth.principal_from_claims(db, payload)
+    if principal is None:
         raise cred_exc
-    return user
+    return principal
 
 # ───────────────────────────
 # Schemas Pydantic
@@ -152,10 +204,10 @@ class Token(BaseModel):
 
 # Helpers de acceso
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
-    return db.execute(select(User).where(User.Mail == email)).scalar_one_or_none()
+    return db.execute(select(User).options(*USER_PRINCIPAL).where(User.Mail == email)).scalar_one_or_none()
 
 def get_user_by_username(db: Session, username: str) -> Optional[User]:
-    return db.execute(select(User).where(User.Username == username)).scalar_one_or_none()
+    return db.execute(select(User).options(*USER_FULL).where(User.Username == username)).scalar_one_or_none()
 
 
 
@@ -3,4 +3,12 @@ from .chat import Chat
 from .user_images import UserImages
 from .user_game_skill import UserGamesSkill
 from .games import Games
-from .matches import Matches
\ No newline at end of file
+from .game_ranks import GameRanks
+from .matches import Matches
+from .swipes import Swipes
+from .match_thread_summary import MatchThreadSummary
+from .chat_segment import ChatSegment
+from .user_token_epoch import UserTokenEpoch
+from .community import Community
+from .communitys_games import CommunitysGames
+from .communitys_members import CommunitysMembers
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.connection import Base
 
 class Chat(Base):
     __tablename__ = "Chat"
-    __table_args__ = {"schema": "dbo"}
+    __table_args__ = (
+        # historial por match con cursores before_id / after_id
+        Index("IX_Chat_MatchesID_ID", "MatchesID", "ID"),
+        {"schema": "dbo"},
+    )
 
     ID = Column(Integer, primary_key=True, index=True)
     MatchesID = Column(Integer, ForeignKey("dbo.Matches.ID"), nullable=False, index=True)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, DateTime, LargeBinary, ForeignKey, PrimaryKeyConstraint
+from app.db.connection import Base
+
+class ChatSegment(Base):
+    """Mensajes viejos de un match, compactados en un blob JSON comprimido con zlib."""
+    __tablename__ = "ChatSegment"
+    __table_args__ = (
+        PrimaryKeyConstraint("MatchesID", "SegmentNo", name="PK_ChatSegment"),
+        {"schema": "dbo"},
+    )
+
+    MatchesID = Column(Integer, ForeignKey("dbo.Matches.ID"), nullable=False)
+    SegmentNo = Column(Integer, nullable=False)
+    FirstID = Column(Integer, nullable=False)   # Chat.ID del primer mensaje del segmento
+    LastID = Column(Integer, nullable=False)
+    MessageCount = Column(Integer, nullable=False)
+    FirstDate = Column(DateTime, nullable=True)
+    LastDate = Column(DateTime, nullable=True)
+    Payload = Column(LargeBinary, nullable=False)
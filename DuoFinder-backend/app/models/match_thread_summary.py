@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from app.db.connection import Base
+
+class MatchThreadSummary(Base):
+    """Resumen por match (último mensaje y no leídos por participante), mantenido al escribir."""
+    __tablename__ = "MatchThreadSummary"
+    __table_args__ = {"schema": "dbo"}
+
+    MatchesID = Column(Integer, ForeignKey("dbo.Matches.ID"), primary_key=True)
+    LastMessageID = Column(Integer, nullable=True)
+    LastSenderID = Column(Integer, nullable=True)
+    LastPreview = Column(String(200), nullable=True)
+    LastActivity = Column(DateTime, nullable=True)
+    UnreadUser1 = Column(Integer, nullable=False, server_default="0")  # no leídos de Matches.UserID1
+    UnreadUser2 = Column(Integer, nullable=False, server_default="0")
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, BigInteger, Integer, Boolean, DateTime, ForeignKey, Index, PrimaryKeyConstraint
+from app.db.connection import Base
+
+class Swipes(Base):
+    """Ledger append-only de swipes (like / dislike). Solo los likes mutuos pasan a Matches."""
+    __tablename__ = "Swipes"
+    __table_args__ = (
+        PrimaryKeyConstraint("ID", name="PK_Swipes", mssql_clustered=False),
+        # clustered por actor: "a quién ya swipeé" y el último swipe de una pareja son seeks
+        Index("CIX_Swipes_Actor", "ActorID", "TargetID", "ID", mssql_clustered=True),
+        # "quién me dio like" (cola de likes recibidos)
+        Index("IX_Swipes_Target", "TargetID", "ActorID", "ID", mssql_include=["Liked"]),
+        {"schema": "dbo"},
+    )
+
+    ID = Column(BigInteger, autoincrement=True)
+    ActorID = Column(Integer, ForeignKey("dbo.User.ID"), nullable=False)
+    TargetID = Column(Integer, ForeignKey("dbo.User.ID"), nullable=False)
+    Liked = Column(Boolean, nullable=False)
+    CreatedDate = Column(DateTime, nullable=False)
@@ -19,12 +19,13 @@ class User(Base):
     AgeMin = Column(SmallInteger, nullable=True)
     AgeMax = Column(SmallInteger, nullable=True)
 
-    # Relaciones
-    images = relationship("UserImages", back_populates="user", lazy="selectin", cascade="all, delete-orphan")
-    games_skills = relationship("UserGamesSkill", back_populates="user", lazy="selectin", cascade="all, delete-orphan")
-    community_memberships = relationship("CommunitysMembers", back_populates="user", lazy="selectin", cascade="all, delete-orphan")
-    owned_communities = relationship("Community", back_populates="owner", lazy="selectin")
-    matches_as_user1 = relationship("Matches", foreign_keys="Matches.UserID1", back_populates="user1", lazy="selectin")
-    matches_as_user2 = relationship("Matches", foreign_keys="Matches.UserID2", back_populates="user2", lazy="selectin")
-    sent_messages = relationship("Chat", foreign_keys="Chat.SenderID", back_populates="sender", lazy="selectin")
-
+    # Relaciones: todas lazy="select". Lo que se necesita cargado se pide con un
+    # perfil de app/db/load_profiles.py (antes eran selectin y cualquier SELECT de
+    # User traía todos sus matches y mensajes).
+    images = relationship("UserImages", back_populates="user", cascade="all, delete-orphan")
+    games_skills = relationship("UserGamesSkill", back_populates="user", cascade="all, delete-orphan")
+    community_memberships = relationship("CommunitysMembers", back_populates="user", cascade="all, delete-orphan")
+    owned_communities = relationship("Community", back_populates="owner")
+    matches_as_user1 = relationship("Matches", foreign_keys="Matches.UserID1", back_populates="user1")
+    matches_as_user2 = relationship("Matches", foreign_keys="Matches.UserID2", back_populates="user2")
+    sent_messages = relationship("Chat", foreign_keys="Chat.SenderID", back_populates="sender")
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from app.db.connection import Base
+
+class UserTokenEpoch(Base):
+    """Época de tokens por usuario: los JWT con una época menor quedan revocados. Sin fila = 0."""
+    __tablename__ = "UserTokenEpoch"
+    __table_args__ = {"schema": "dbo"}
+
+    UserID = Column(Integer, ForeignKey("dbo.User.ID"), primary_key=True)
+    Epoch = Column(Integer, nullable=False, server_default="0")
+    UpdatedAt = Column(DateTime, nullable=False, index=True)
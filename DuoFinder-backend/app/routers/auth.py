@@ -1,15 +1,26 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, EmailStr
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from app.db.connection import get_db
+from app.db.async_connection import get_async_db
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
-from app.utils.security import hash_password, verify_password, create_access_token
+from app.db.load_profiles import USER_FULL, USER_PRINCIPAL
+from app.utils.security import create_access_token
+from app.utils.password_hasher import password_hasher
 from datetime import date
+from typing import Optional
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from app.config import SECRET_KEY, ALGORITHM
+from app.utils.content_filter import content_filter
+from app.utils.principal_cache import Principal, principal_cache
+from app.utils.token_epochs import token_epochs
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # ----- Schemas -----
@@ -24,56 +35,125 @@ class LoginInput(BaseModel):
     password: str
 
 # ----- Endpoints -----
-@router.post("/register", status_code=201)
-def register_user(user_in: RegisterInput, db: Session = Depends(get_db)):
-    # validar email único
-    exists = db.execute(select(User).where(User.Mail == user_in.email)).scalar_one_or_none()
-    if exists:
-        raise HTTPException(status_code=400, detail="Email ya registrado")
+# register y login son async: bcrypt se espera en el pool de password_hasher
+# sin retener un thread del threadpool; la DB sí va por run_in_threadpool.
+def _user_by_mail(db: Session, email: str) -> Optional[User]:
+    return db.execute(
+        select(User).options(*USER_PRINCIPAL).where(User.Mail == email)
+    ).scalar_one_or_none()
 
-    # crear usuario
+def _create_user(db: Session, user_in: RegisterInput, hashed: str) -> User:
     user = User(
         Mail=user_in.email,
         Username=user_in.username,
-        Password=hash_password(user_in.password),
+        Password=hashed,
         BirthDate=user_in.birthdate,
         IsActive=True,
     )
     db.add(user)
     db.commit()
     db.refresh(user)
+    return user
+
+def _finish_login(db: Session, user: User, new_hash: Optional[str]) -> str:
+    if new_hash is not None:
+        # hash con otro costo que BCRYPT_ROUNDS: se reemplaza ahora que tenemos la contraseña
+        try:
+            user.Password = new_hash
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning("No se pudo actualizar el hash de la contraseña: %s", e)
+    return issue_token(db, user)
+
+@router.post("/register", status_code=201)
+async def register_user(user_in: RegisterInput, db: Session = Depends(get_db)):
+    # validar email único
+    if await run_in_threadpool(_user_by_mail, db, user_in.email):
+        raise HTTPException(status_code=400, detail="Email ya registrado")
+    await run_in_threadpool(content_filter.ensure_clean, user_in.username, "El nombre de usuario")
+
+    # crear usuario
+    hashed = await password_hasher.hash_async(user_in.password)
+    user = await run_in_threadpool(_create_user, db, user_in, hashed)
 
     return {"message": "User registered successfully", "id": user.ID, "email": user.Mail}
 
 @router.post("/login")
-def login_user(data: LoginInput, db: Session = Depends(get_db)):
-    user = db.execute(select(User).where(User.Mail == data.email)).scalar_one_or_none()
-    if not user or not verify_password(data.password, user.Password):
+async def login_user(data: LoginInput, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_user_by_mail, db, data.email)
+    if not user:
+        raise HTTPException(status_code=400, detail="Credenciales inválidas")
+    ok, new_hash = await password_hasher.verify_and_update_async(data.password, user.Password)
+    if not ok:
         raise HTTPException(status_code=400, detail="Credenciales inválidas")
     if not user.IsActive:
         raise HTTPException(status_code=403, detail="Usuario inactivo")
 
-    token = create_access_token({"sub": user.Mail})
+    token = await run_in_threadpool(_finish_login, db, user, new_hash)
     return {"access_token": token, "token_type": "bearer"}
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")  # o el path correcto a tu login
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def issue_token(db: Session, user: User) -> str:
+    """JWT con el usuario y su época actual: se valida sin ir a buscar al usuario."""
+    epoch = token_epochs.load_exact(db, user.ID)
+    return create_access_token({"sub": user.Mail, "uid": user.ID, "ep": epoch})
+
+def principal_from_claims(db: Session, payload: dict) -> Optional[Principal]:
+    email = payload.get("sub")
+    if email is None:
+        return None
+    uid, epoch = payload.get("uid"), payload.get("ep")
+    if isinstance(uid, int) and isinstance(epoch, int):
+        # baja de cuenta y cambio de contraseña suben la época: un token viejo queda revocado
+        if epoch != token_epochs.current(db, uid):
+            return None
+        return Principal(ID=uid, Mail=email, IsActive=True)
+    # tokens emitidos antes de llevar uid/ep: se resuelven contra la DB hasta que expiren
+    principal = principal_cache.get(db, email)
+    if principal is None or not principal.IsActive:
+        return None
+    return principal
+
+def principal_from_token(db: Session, token: str) -> Optional[Principal]:
+    """Usuario activo dueño del JWT, o None si el token no es válido (lo usa también /chats/ws)."""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    return principal_from_claims(db, payload)
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudo validar el token",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
+    principal = principal_from_token(db, token)
+    if principal is None:
         raise credentials_exception
 
-    user = db.query(User).filter(User.Mail == email).first()
-    if user is None:
-        raise credentials_exception
+    return principal
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme), adb: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """get_current_user para endpoints async (misma validación, sesión async)."""
+    principal = await adb.run_sync(principal_from_token, token)
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No se pudo validar el token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
 
+def get_current_user_row(
+    principal: Principal = Depends(get_current_user), db: Session = Depends(get_db)
+) -> User:
+    """Fila ORM del usuario, para los endpoints que lo modifican."""
+    user = db.get(User, principal.ID, options=USER_FULL)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="No se pudo validar el token")
     return user
@@ -1,17 +1,37 @@
 # app/routers/chat.py
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import asyncio
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
-from sqlalchemy import asc, desc, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, noload
+from sqlalchemy import asc, desc, and_, or_, case, func, literal, select, union_all
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
 from app.db.connection import get_db
-from app.routers.auth import get_current_user
+from app.db.async_connection import AsyncSessionLocal, get_async_db
+from app.routers.auth import get_current_user, get_current_user_async, principal_from_token, oauth2_scheme
+from app.utils.principal_cache import Principal
+from app.config import CHAT_LONGPOLL_MAX_TIMEOUT, CHAT_WS_REVALIDATE_SECONDS
 from app.models.user import User
 from app.models.chat import Chat
 from app.models.matches import Matches  
 from app.models.user_images import UserImages
+from app.models.match_thread_summary import MatchThreadSummary
+from app.db.thread_summary import mark_read, record_message
+from app.db.chat_archive import archived_after, archived_before, archived_by_ids
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.utils.exceptions import bad_request
+from app.utils.pubsub import hub
+from app.utils.chat_search import chat_search
+from app.utils.content_filter import content_filter
+from app.utils.match_cache import MatchMembership, match_cache
+from app.utils.candidate_index import candidate_index
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/chats", tags=["chats"])
 
@@ -40,6 +60,16 @@ class ChatMessageOut(BaseModel):
             read=bool(m.ReadChat),
         )
 
+class ReadIn(BaseModel):
+    up_to_id: int = Field(..., ge=1, description="ID del último mensaje visto (watermark)")
+
+
+class ReadOut(BaseModel):
+    match_id: int
+    up_to_id: int
+    marked: int
+    unread_count: int
+
 class ChatInfo(BaseModel):
     partner_id: int
     partner_username: str
@@ -47,40 +77,45 @@ class ChatInfo(BaseModel):
     unread_count: int
     partner_image: Optional[str] = None
 
+class InboxThreadOut(BaseModel):
+    match_id: int
+    partner_id: int
+    partner_username: str
+    partner_image: Optional[str] = None
+    last_message: Optional[ChatMessageOut] = None
+    unread_count: int
+    last_activity: datetime
+
+class ChatSearchHit(BaseModel):
+    message: ChatMessageOut
+    score: float
+
 class ChatThreadOut(BaseModel):
     partner_id: int
     partner_username: str
     messages: List[ChatMessageOut]
+    has_more: bool = False  # hay más en la dirección pedida (más viejos, o más nuevos con after_id)
 
 # ---------- Helpers ----------
-def _assert_user_in_match(db: Session, match_id: int, user_id: int) -> Matches:
-    match = db.query(Matches).filter(Matches.ID == match_id).first()
+def _assert_user_in_match(db: Session, match_id: int, user_id: int) -> MatchMembership:
+    match = match_cache.get(db, match_id)
     if not match:
         raise HTTPException(status_code=404, detail="Match no encontrado")
-    # Ajusta estos nombres si tu modelo difiere (UserID1 / UserID2)
-    if user_id not in {match.UserID1, match.UserID2}:
+    if not match.has(user_id):
         raise HTTPException(status_code=403, detail="No perteneces a este chat")
     return match
 
 
-# ---------- Endpoints ----------
-
-@router.get("/{match_id}/info", response_model=ChatInfo)
-def get_chat_info(
-    match_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    # 1) Verificar pertenencia y recuperar el match
-    match = _assert_user_in_match(db, match_id, current_user.ID)
-
-    # 2) Determinar el "otro" usuario
-    partner_id = match.UserID2 if current_user.ID == match.UserID1 else match.UserID1
-    partner = db.query(User.ID, User.Username).filter(User.ID == partner_id).first()
-    partner_username = partner.Username if partner else "(usuario)"
-
+def _partner_profile(db: Session, partner_id: int, with_image: bool = True) -> Tuple[str, Optional[str]]:
+    """(username, imagen principal) del partner; del índice de candidatos si está ahí."""
+    profile = candidate_index.profile(partner_id)
+    if profile is not None:
+        return profile.username, profile.image
+    partner = db.query(User.Username).filter(User.ID == partner_id).first()
+    if not with_image:
+        return (partner.Username if partner else "(usuario)"), None
     img_row = (
-        db.query(UserImages)
+        db.query(UserImages.ImageURL)
           .filter(
               and_(
                   UserImages.UserID == partner_id,
@@ -89,27 +124,309 @@ def get_chat_info(
           )
           .first()
     )
-    partner_image = img_row.ImageURL if img_row else None
+    return (partner.Username if partner else "(usuario)"), (img_row.ImageURL if img_row else None)
 
 
-    last_message_row = (
-        db.query(Chat)
-          .filter(Chat.MatchesID == match_id)
-          .order_by(desc(Chat.CreatedDate))
-          .first()
+def _inbox_query(user_id: int):
+    """
+    Todos los hilos del usuario en una sola query, leyendo el resumen por match
+    (MatchThreadSummary) en lugar de agregar sobre Chat.
+    Devuelve (select, expresión de última actividad, columna match_id) para paginar por cursor.
+    """
+    # mis matches (uno por lado de la pareja, sin OR); side = mi lado en la pareja
+    as_low = select(
+        Matches.ID.label("match_id"), Matches.UserID2.label("partner_id"),
+        Matches.MatchDate.label("matched_at"), literal(1).label("side"),
+    ).where(Matches.UserID1 == user_id, Matches.LikedByUser1 == True, Matches.LikedByUser2 == True)
+    as_high = select(
+        Matches.ID.label("match_id"), Matches.UserID1.label("partner_id"),
+        Matches.MatchDate.label("matched_at"), literal(2).label("side"),
+    ).where(Matches.UserID2 == user_id, Matches.LikedByUser1 == True, Matches.LikedByUser2 == True)
+    mine = union_all(as_low, as_high).subquery("mine")
+
+    images = (
+        select(UserImages.UserID.label("user_id"), func.min(UserImages.ImageURL).label("image"))
+        .join(mine, mine.c.partner_id == UserImages.UserID)
+        .where(UserImages.IsPrimary == True)
+        .group_by(UserImages.UserID)
+        .subquery("images")
     )
-    last_message_content = last_message_row.ContentChat if last_message_row else None
 
-    # 4) Mensajes no leídos para el usuario actual
-    unread_count = (
-        db.query(Chat)
-          .filter(
-              Chat.MatchesID == match_id,
-              Chat.ReadChat == False,
-              Chat.SenderID != current_user.ID,
-          )
-          .count()
+    mine_first = mine.c.side == 1
+    activity = func.coalesce(MatchThreadSummary.LastActivity, mine.c.matched_at, datetime(1900, 1, 1))
+    q = (
+        select(
+            mine.c.match_id,
+            mine.c.partner_id,
+            User.Username.label("partner_username"),
+            images.c.image,
+            MatchThreadSummary.LastMessageID.label("message_id"),
+            MatchThreadSummary.LastSenderID.label("sender_id"),
+            MatchThreadSummary.LastPreview.label("content"),
+            MatchThreadSummary.LastActivity.label("created_at"),
+            case((mine_first, MatchThreadSummary.UnreadUser1), else_=MatchThreadSummary.UnreadUser2).label("unread"),
+            case((mine_first, MatchThreadSummary.UnreadUser2), else_=MatchThreadSummary.UnreadUser1).label("partner_unread"),
+            activity.label("last_activity"),
+        )
+        .select_from(mine)
+        .outerjoin(User, User.ID == mine.c.partner_id)
+        .outerjoin(images, images.c.user_id == mine.c.partner_id)
+        .outerjoin(MatchThreadSummary, MatchThreadSummary.MatchesID == mine.c.match_id)
+    )
+    return q, activity, mine.c.match_id
+
+
+async def _messages_after(adb: AsyncSession, match_id: int, after_id: int, limit: int) -> List[Chat]:
+    rows = await adb.scalars(
+        select(Chat)
+        .options(noload(Chat.match), noload(Chat.sender))
+        .where(Chat.MatchesID == match_id, Chat.ID > after_id)
+        .order_by(asc(Chat.ID))
+        .limit(limit)
     )
+    return list(rows)
+
+
+def _user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+async def _ws_user_id(token: str) -> Optional[int]:
+    async with AsyncSessionLocal() as adb:
+        user = await adb.run_sync(principal_from_token, token)
+    return user.ID if user is not None and user.IsActive else None
+
+
+async def _longpoll_user_id(token: str, match_id: int) -> int:
+    """Auth + pertenencia con una sesión propia que se cierra antes de esperar."""
+    async with AsyncSessionLocal() as adb:
+        user = await adb.run_sync(principal_from_token, token)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="No se pudo validar el token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        await adb.run_sync(_assert_user_in_match, match_id, user.ID)
+        return user.ID
+
+
+async def _longpoll_fetch(match_id: int, after_id: int, limit: int) -> List[ChatMessageOut]:
+    async with AsyncSessionLocal() as adb:
+        return [ChatMessageOut.from_model(r) for r in await _messages_after(adb, match_id, after_id, limit)]
+
+
+# ---------- Endpoints ----------
+
+@router.websocket("/ws")
+async def chat_ws(websocket: WebSocket, token: str = Query(...)):
+    """
+    Eventos de todos mis matches en tiempo real:
+      - {"type": "message", "message": {...}}
+      - {"type": "read", "match_id", "reader_id", "up_to_id"} (read receipt)
+    Autentica con el mismo JWT por query param (?token=), porque el navegador no
+    permite headers en el handshake. El cliente puede mandar pings de texto; se ignoran.
+    Cada CHAT_WS_REVALIDATE_SECONDS se revalida el token: si venció o se revocó
+    (cambio de contraseña, baja) se cierra con 1008.
+    """
+    try:
+        user_id = await _ws_user_id(token)
+    except HTTPException:
+        # épocas de tokens todavía sin cargar (503): que el cliente reintente
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+    if user_id is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    sub = hub.subscribe(_user_channel(user_id))
+
+    async def forward():
+        while True:
+            await websocket.send_json(await sub.get())
+
+    async def receive():
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    async def revalidate():
+        while True:
+            await asyncio.sleep(CHAT_WS_REVALIDATE_SECONDS)
+            try:
+                if await _ws_user_id(token) != user_id:
+                    return
+            except HTTPException:
+                pass  # épocas sin poder leerse: se vuelve a probar en la próxima vuelta
+
+    forwarder = asyncio.create_task(forward())
+    receiver = asyncio.create_task(receive())
+    checker = asyncio.create_task(revalidate())
+    try:
+        done, _ = await asyncio.wait((forwarder, receiver, checker), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in (forwarder, receiver, checker):
+            task.cancel()
+        hub.unsubscribe(sub)
+
+    if checker in done:
+        code = status.WS_1008_POLICY_VIOLATION  # token vencido o revocado
+    elif forwarder in done:
+        logger.error("Falló el envío por /chats/ws", exc_info=forwarder.exception())
+        code = status.WS_1011_INTERNAL_ERROR
+    else:
+        return receiver.result()  # el cliente se desconectó (otros errores se propagan)
+    try:
+        await websocket.close(code=code)
+    except RuntimeError:
+        pass  # el socket ya estaba cerrado
+
+
+@router.get("/inbox", response_model=List[InboxThreadOut])
+async def get_inbox(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
+    limit: int = Query(30, ge=1, le=100),
+    adb: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async),
+):
+    """
+    Bandeja de chats (reemplaza /matches/matches + /{match_id}/info por match),
+    ordenada por última actividad (último mensaje o fecha del match).
+    El contenido del último mensaje es un preview (primeros 200 caracteres).
+    """
+    q, activity, match_id = _inbox_query(current_user.ID)
+
+    if cursor is not None:
+        payload = decode_cursor(cursor)
+        try:
+            after_activity = datetime.fromisoformat(payload["a"])
+            after_match = int(payload["m"])
+        except (KeyError, TypeError, ValueError):
+            bad_request("Cursor inválido")
+        q = q.where(or_(
+            activity < after_activity,
+            and_(activity == after_activity, match_id < after_match),
+        ))
+
+    rows = (await adb.execute(q.order_by(activity.desc(), match_id.desc()).limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    out = [
+        InboxThreadOut(
+            match_id=r.match_id,
+            partner_id=r.partner_id,
+            partner_username=r.partner_username or "(usuario)",
+            partner_image=r.image,
+            last_message=ChatMessageOut(
+                id=r.message_id,
+                match_id=r.match_id,
+                sender_id=r.sender_id,
+                content=r.content,
+                created_at=r.created_at,
+                # leído si el destinatario no tiene pendientes
+                read=not (r.unread if r.sender_id == r.partner_id else r.partner_unread),
+            ) if r.message_id is not None else None,
+            unread_count=r.unread or 0,
+            last_activity=r.last_activity,
+        )
+        for r in rows
+    ]
+
+    if has_more:
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor({
+            "a": last.last_activity.isoformat(),
+            "m": last.match_id,
+        })
+    return out
+
+
+# sync a propósito: el trabajo es CPU sobre el índice en memoria (y la primera carga lo
+# arma desde la DB), mejor en un thread del threadpool que trabando el event loop
+@router.get("/search", response_model=List[ChatSearchHit])
+def search_chats(
+    response: Response,
+    q: str = Query(..., min_length=2, max_length=100),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Busca en el historial de mis chats (todas las palabras de `q`, sin importar
+    mayúsculas ni tildes), usando el índice invertido de app/utils/chat_search.py.
+    Ordenado por relevancia y, a igual score, del mensaje más nuevo al más viejo.
+    """
+    after = None
+    if cursor is not None:
+        payload = decode_cursor(cursor)
+        try:
+            after = (float(payload["s"]), int(payload["i"]))
+        except (KeyError, TypeError, ValueError):
+            bad_request("Cursor inválido")
+
+    my_matches = {
+        mid for (mid,) in db.query(Matches.ID).filter(
+            or_(Matches.UserID1 == current_user.ID, Matches.UserID2 == current_user.ID)
+        )
+    }
+    chat_search.ensure_loaded(db)
+    chat_search.sync(db)
+    hits = chat_search.search(my_matches, q, limit + 1, after)
+    has_more = len(hits) > limit
+    hits = hits[:limit]
+
+    ids = [msg_id for _, msg_id, _ in hits]
+    found = {
+        r.ID: r for r in
+        db.query(Chat).options(noload(Chat.match), noload(Chat.sender)).filter(Chat.ID.in_(ids)).all()
+    } if ids else {}
+    # los que no están en dbo.Chat ya fueron compactados
+    cold: dict = {}
+    for _, msg_id, match_id in hits:
+        if msg_id not in found:
+            cold.setdefault(match_id, []).append(msg_id)
+    for match_id, msg_ids in cold.items():
+        found.update((r.ID, r) for r in archived_by_ids(db, match_id, msg_ids))
+
+    out = [
+        ChatSearchHit(message=ChatMessageOut.from_model(found[msg_id]), score=score)
+        for score, msg_id, _ in hits
+        if msg_id in found
+    ]
+    if has_more:
+        score, msg_id, _ = hits[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor({"s": score, "i": msg_id})
+    return out
+
+
+@router.get("/{match_id}/info", response_model=ChatInfo)
+async def get_chat_info(
+    match_id: int,
+    adb: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async),
+):
+    # 1) Verificar pertenencia y recuperar el match
+    match = await adb.run_sync(_assert_user_in_match, match_id, current_user.ID)
+
+    # 2) Determinar el "otro" usuario
+    partner_id = match.partner_of(current_user.ID)
+    partner_username, partner_image = await adb.run_sync(_partner_profile, partner_id)
+
+    # 3) Último mensaje y no leídos desde el resumen del match
+    summary = await adb.get(MatchThreadSummary, match_id)
+    last_message_content = summary.LastPreview if summary else None
+    if summary is None:
+        unread_count = 0
+    elif current_user.ID == match.UserID1:
+        unread_count = summary.UnreadUser1
+    else:
+        unread_count = summary.UnreadUser2
 
     return ChatInfo(
         partner_id=partner_id,
@@ -122,50 +439,143 @@ def get_chat_info(
 
 
 @router.get("/{match_id}", response_model=ChatThreadOut)
-def get_chat(
+async def get_chat(
     match_id: int,
     limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    offset: Optional[int] = Query(None, ge=0, description="Deprecado: usar before_id / after_id"),
+    before_id: Optional[int] = Query(None, description="Mensajes anteriores a este ID (scroll hacia atrás)"),
+    after_id: Optional[int] = Query(None, description="Solo mensajes nuevos posteriores a este ID (sync)"),
+    adb: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async),
 ):
     """
     Devuelve el hilo de chat con:
       - partner_id y partner_username (el otro usuario del match)
       - messages: lista paginada de mensajes (ascendente por fecha)
+    Sin cursores ni `offset` trae los `limit` más recientes. Los cursores usan el índice
+    (MatchesID, ID), así que cada página cuesta O(limit) y no O(largo del hilo).
+    Los mensajes viejos compactados (app/db/chat_archive.py) se leen de sus
+    segmentos sin que el cliente note la diferencia. Con `offset` explícito (incluido 0)
+    se mantiene el paginado viejo desde el primer mensaje; solo ve filas calientes.
     """
-    match = _assert_user_in_match(db, match_id, current_user.ID)
+    if before_id is not None and after_id is not None:
+        bad_request("Usar before_id o after_id, no ambos")
+
+    match = await adb.run_sync(_assert_user_in_match, match_id, current_user.ID)
 
     # Determinar el "otro" usuario del match
-    partner_id = match.UserID2 if current_user.ID == match.UserID1 else match.UserID1
-    partner = db.query(User.ID, User.Username).filter(User.ID == partner_id).first()
-    partner_username = partner.Username if partner else "(usuario)"
-
-    # Traer mensajes
-    rows = (
-        db.query(Chat)
-        .filter(Chat.MatchesID == match_id)
-        .order_by(asc(Chat.CreatedDate))
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
+    partner_id = match.partner_of(current_user.ID)
+    partner_username, _ = await adb.run_sync(_partner_profile, partner_id, False)
+
+    # Traer mensajes (sin los joins de match / sender, no hacen falta acá)
+    q = select(Chat).options(noload(Chat.match), noload(Chat.sender)).where(Chat.MatchesID == match_id)
+    if after_id is not None:
+        # si after_id cae en la parte compactada, primero los segmentos y después las filas calientes
+        rows = await adb.run_sync(archived_after, match_id, after_id, limit + 1)
+        if len(rows) <= limit:
+            rows += await _messages_after(adb, match_id, rows[-1].ID if rows else after_id, limit + 1 - len(rows))
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+    elif before_id is not None or offset is None:
+        if before_id is not None:
+            q = q.where(Chat.ID < before_id)
+        rows = list(await adb.scalars(q.order_by(desc(Chat.ID)).limit(limit + 1)))
+        if len(rows) <= limit:
+            # se acabaron las filas calientes: seguir por los segmentos comprimidos
+            rows += await adb.run_sync(
+                archived_before, match_id, rows[-1].ID if rows else before_id, limit + 1 - len(rows)
+            )
+        has_more = len(rows) > limit
+        rows = rows[:limit][::-1]
+    else:
+        rows = list(await adb.scalars(q.order_by(asc(Chat.CreatedDate)).offset(offset).limit(limit + 1)))
+        has_more = len(rows) > limit
+        rows = rows[:limit]
 
     return ChatThreadOut(
         partner_id=partner_id,
         partner_username=partner_username,
         messages=[ChatMessageOut.from_model(r) for r in rows],
+        has_more=has_more,
     )
 
 
+@router.get("/{match_id}/updates", response_model=List[ChatMessageOut])
+async def get_chat_updates(
+    match_id: int,
+    after_id: int = Query(..., ge=0, description="ID del último mensaje que ya tiene el cliente"),
+    timeout: float = Query(25, ge=0, le=CHAT_LONGPOLL_MAX_TIMEOUT),
+    limit: int = Query(50, ge=1, le=200),
+    token: str = Depends(oauth2_scheme),
+):
+    """
+    Long-poll para clientes sin WebSocket: devuelve apenas hay mensajes con ID > after_id,
+    o [] si pasa `timeout` segundos. No usa threads del threadpool (sesiones async) y
+    mientras espera tampoco tiene sesión de DB: queda suscripto al hub, que send_message señala.
+    """
+    user_id = await _longpoll_user_id(token, match_id)
+
+    # suscribirse antes de mirar la DB, así no se pierde un mensaje que llegue entre medio
+    sub = hub.subscribe(_user_channel(user_id))
+    try:
+        rows = await _longpoll_fetch(match_id, after_id, limit)
+        if rows:
+            return rows
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return []
+            try:
+                event = await asyncio.wait_for(sub.get(), remaining)
+            except asyncio.TimeoutError:
+                return []
+            if event.get("type") == "message" and event["message"]["match_id"] == match_id:
+                break
+    finally:
+        hub.unsubscribe(sub)
+
+    return await _longpoll_fetch(match_id, after_id, limit)
+
+
+@router.post("/{match_id}/read", response_model=ReadOut)
+async def mark_chat_read(
+    match_id: int,
+    data: ReadIn,
+    adb: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async),
+):
+    """Marca como leído todo lo recibido hasta `up_to_id` y avisa al partner (read receipt)."""
+    match = await adb.run_sync(_assert_user_in_match, match_id, current_user.ID)
+
+    marked, unread_count = await adb.run_sync(mark_read, match, current_user.ID, data.up_to_id)
+    await adb.commit()
+
+    event = {
+        "type": "read",
+        "match_id": match_id,
+        "reader_id": current_user.ID,
+        "up_to_id": data.up_to_id,
+    }
+    # al partner (read receipt) y a mis otras sesiones (contador en 0)
+    for user_id in (match.UserID1, match.UserID2):
+        await hub.publish_async(_user_channel(user_id), event)
+
+    return ReadOut(match_id=match_id, up_to_id=data.up_to_id, marked=marked, unread_count=unread_count)
+
+
 @router.post("/{match_id}", response_model=ChatMessageOut, status_code=status.HTTP_201_CREATED)
-def send_message(
+async def send_message(
     match_id: int,
     message: ChatMessageIn,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    adb: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user_async),
 ):
-    _assert_user_in_match(db, match_id, current_user.ID)
+    match = await adb.run_sync(_assert_user_in_match, match_id, current_user.ID)
+    # puede recompilar la lista de términos si cambió el archivo: fuera del event loop
+    await run_in_threadpool(content_filter.ensure_clean, message.content, "El mensaje")
 
     row = Chat(
         MatchesID=match_id,
@@ -175,7 +585,15 @@ def send_message(
         Status=True,          # <-- boolean si tu columna es bit/bool
         ReadChat=False,
     )
-    db.add(row)
-    db.commit()
-    db.refresh(row)
-    return ChatMessageOut.from_model(row)
\ No newline at end of file
+    adb.add(row)
+    await adb.flush()
+    await adb.run_sync(record_message, match, row)  # misma transacción que el INSERT del mensaje
+    await adb.commit()
+    await adb.refresh(row)
+    await run_in_threadpool(chat_search.add, row.ID, row.MatchesID, row.ContentChat)  # escribe el journal
+
+    out = ChatMessageOut.from_model(row)
+    event = {"type": "message", "message": out.model_dump(mode="json")}
+    for user_id in (match.UserID1, match.UserID2):
+        await hub.publish_async(_user_channel(user_id), event)
+    return out
\ No newline at end of file
@@ -6,13 +6,13 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 
 from app.db.connection import get_db
-from app.models.user import User
 from app.models.community import Community
 from app.models.communitys_members import CommunitysMembers
 from app.models.communitys_games import CommunitysGames
 
 from app.models.games import Games
 from app.routers.auth import get_current_user
+from app.utils.principal_cache import Principal
 
 router = APIRouter(prefix="/communities", tags=["communities"])
 
@@ -83,7 +83,7 @@ def _is_owner(user_id: int, community: Community) -> bool:
 def create_community(
     payload: CommunityCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     # nombre único
     exists = db.query(Community).filter(
@@ -129,7 +129,7 @@ def update_community(
     community_id: int,
     payload: CommunityUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     c: Community | None = db.query(Community).filter(Community.ID == community_id).first()
     if not c:
@@ -174,7 +174,7 @@ def update_community(
 def delete_community(
     community_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     c: Community | None = db.query(Community).filter(Community.ID == community_id).first()
     if not c:
@@ -221,7 +221,7 @@ def get_all_communities(
 @router.get("/my", response_model=List[MyCommunityOut])
 def get_my_communities(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     rows = (
         db.query(Community, CommunitysMembers.Role)
@@ -247,7 +247,7 @@ def get_my_communities(
 def join_community(
     community_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     # Verificar si la comunidad existe
     community = db.query(Community).filter(Community.ID == community_id).first()
@@ -279,7 +279,7 @@ def join_community(
 def leave_community(
     community_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     # Verificar si la comunidad existe
     community = db.query(Community).filter(Community.ID == community_id).first()
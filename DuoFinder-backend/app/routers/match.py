@@ -1,24 +1,35 @@
-from fastapi import APIRouter, Query, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from sqlalchemy.exc import IntegrityError
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi import APIRouter, Query, Depends, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, noload
+from sqlalchemy import or_
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Tuple
 from datetime import date, datetime
 
-from app.db.connection import get_db
-from app.routers.auth import get_current_user
+from app.db.connection import get_db, SessionLocal
+from app.db.async_connection import get_async_db
+from app.db.swipe_merge import SwipeOutcome, merge_swipes
+from app.routers.auth import get_current_user, get_current_user_async
+from app.utils.principal_cache import Principal
 from app.models.user import User
-from app.models.user_images import UserImages
+from app.db.load_profiles import USER_PROFILE_CARD
 from app.models.user_game_skill import UserGamesSkill
-from app.models.games import Games
 from app.models.matches import Matches
-from app.models.chat import Chat
+from app.utils.candidate_index import AgeFilter, age_on, candidate_index
+from app.utils.swipe_cache import swiped_cache
+from app.utils.incoming_likes import incoming_likes
+from app.utils.cursor import encode_cursor, decode_cursor, filter_hash
+from app.utils.exceptions import bad_request
+from app.utils.scoring import score_candidates, top_k
+from app.utils.suggestion_deck import DeckEntry, suggestion_decks
+from app.utils.match_cache import match_cache
 
 router = APIRouter()
 
 DISLIKE = 0
 LIKE = 1
+MAX_SWIPE_BATCH = 100
 
 
 # -------------------- Schemas --------------------
@@ -36,12 +47,39 @@ class Suggestion(BaseModel):
         from_attributes = True
 
 
+class IncomingLike(BaseModel):
+    id: int
+    username: str
+    age: int
+    image: Optional[str] = None
+    bio: Optional[str] = None
+
+
 class SwipeInput(BaseModel):
     target_user_id: int
     like: bool
     game_id: Optional[int] = None  # opcional: si no viene, se infiere
 
 
+class SwipeBatchInput(BaseModel):
+    swipes: List[SwipeInput] = Field(..., min_length=1, max_length=MAX_SWIPE_BATCH)
+
+
+class SwipeBatchItemOut(BaseModel):
+    target_user_id: int
+    ok: bool
+    match: bool = False
+    match_id: Optional[int] = None
+    chat_id: Optional[int] = None
+    game_id: Optional[int] = None
+    is_ranked: Optional[bool] = None
+    error: Optional[str] = None
+
+
+class SwipeBatchOut(BaseModel):
+    results: List[SwipeBatchItemOut]
+
+
 class Match(BaseModel):
     match_id: int
     user1_id: int
@@ -57,151 +95,216 @@ class Match(BaseModel):
 
 
 # -------------------- Util --------------------
-def calculate_age(birthdate: date) -> int:
-    today = date.today()
-    return today.year - birthdate.year - ((today.month, today.day) < (birthdate.month, birthdate.day))
+def _active_skills_by_user(db: Session, user_ids: List[int]) -> Dict[int, Dict[int, bool]]:
+    """
+    Como _skills_by_user pero desde dbo.User: solo aparecen los usuarios que
+    existen y están activos (los demás no tienen clave), en la misma query.
+    """
+    out: Dict[int, Dict[int, bool]] = {}
+    rows = db.query(User.ID, UserGamesSkill.GameId, UserGamesSkill.IsRanked)\
+             .outerjoin(UserGamesSkill, UserGamesSkill.UserID == User.ID)\
+             .filter(User.ID.in_(user_ids), User.IsActive == True).all()
+    for uid, gid, ranked in rows:
+        games = out.setdefault(uid, {})
+        if gid is not None:
+            games[gid] = bool(ranked)
+    return out
+
+
+def _skills_by_user(db: Session, user_ids: List[int]) -> Dict[int, Dict[int, bool]]:
+    """{UserID: {GameId: IsRanked}} para varios usuarios en una sola query."""
+    out: Dict[int, Dict[int, bool]] = {uid: {} for uid in user_ids}
+    rows = db.query(UserGamesSkill.UserID, UserGamesSkill.GameId, UserGamesSkill.IsRanked)\
+             .filter(UserGamesSkill.UserID.in_(user_ids)).all()
+    for uid, gid, ranked in rows:
+        out.setdefault(uid, {})[gid] = bool(ranked)
+    return out
+
+
+def _resolve_game(
+    my_games: Dict[int, bool], other_games: Dict[int, bool], game_id: Optional[int]
+) -> Tuple[int, int]:
+    """
+    (game_id, match_is_ranked). Si no viene game_id se infiere:
+    el único juego en común, o mi único juego.
+    """
+    if game_id is None:
+        common = my_games.keys() & other_games.keys()
+        if len(common) == 1:
+            game_id = next(iter(common))
+        elif len(my_games) == 1:
+            game_id = next(iter(my_games))
+        else:
+            raise HTTPException(status_code=400, detail="No se pudo inferir el juego. Enviá game_id.")
+    match_is_ranked = 1 if (my_games.get(game_id) and other_games.get(game_id)) else 0
+    return game_id, match_is_ranked
+
+
+def _my_skills(db: Session, user_id: int) -> List[Tuple[int, Optional[bool], Optional[int]]]:
+    """(GameId, IsRanked, Game_rank_local_id) de todos los juegos del usuario."""
+    return db.query(
+        UserGamesSkill.GameId,
+        UserGamesSkill.IsRanked,
+        UserGamesSkill.Game_rank_local_id
+    ).filter(UserGamesSkill.UserID == user_id).all()
+
+
+def _rank_candidates(
+    db: Session,
+    my_id: int,
+    my_skills: List[Tuple[int, Optional[bool], Optional[int]]],
+    server: Optional[str],
+    is_ranked: Optional[bool],
+    after: Optional[Tuple[float, int]],
+    k: int,
+) -> Tuple[List[DeckEntry], bool]:
+    """Los k mejores candidatos después del cursor y si ya no quedan más."""
+    # candidatos desde el índice en memoria (juego / ranked / rango ±3 / server), filtrando
+    # por preferencias de edad mutuas con rangos de BirthDate calculados una sola vez
+    candidate_index.ensure_loaded(db)
+    me = candidate_index.profile(my_id)
+    candidates = candidate_index.find_candidates(
+        my_skills, server=server, is_ranked=is_ranked, ages=AgeFilter.for_viewer(me),
+    )
+    candidates.pop(my_id, None)
+
+    # sacar a los que ya swipeé (set compacto en memoria, O(1) por candidato)
+    swiped = swiped_cache.get(db, my_id)
+    candidates = {uid: games for uid, games in candidates.items() if uid not in swiped}
+
+    # puntaje de compatibilidad vectorizado + top-k después del cursor
+    scored = score_candidates(
+        candidate_index,
+        candidates,
+        {g: (bool(r), candidate_index.rank_order(g, lr)) for g, r, lr in my_skills},
+        me,
+        liked_me=incoming_likes.likers(db, my_id),
+    )
+    top = top_k(scored, k, after)
+    entries = [
+        DeckEntry(int(scored.user_ids[i]), int(scored.game_ids[i]), float(scored.scores[i]))
+        for i in top
+    ]
+    return entries, len(entries) < k
+
+
+def _deck_compute(
+    my_id: int,
+    my_skills: List[Tuple[int, Optional[bool], Optional[int]]],
+    server: Optional[str],
+    is_ranked: Optional[bool],
+):
+    """Cálculo en un thread (refill o mazo inicial), con su propia sesión y los juegos ya leídos."""
+    def compute(after, k):
+        db = SessionLocal()
+        try:
+            return _rank_candidates(db, my_id, my_skills, server, is_ranked, after, k)
+        finally:
+            db.close()
+    return compute
+
+
+def _track_swipe(me: int, outcome: SwipeOutcome, game_id: int) -> None:
+    """Actualiza los cachés en memoria después de un swipe ya commiteado."""
+    other = outcome.target_id
+    swiped_cache.add(me, other)
+    incoming_likes.discard(me, other)
+    if outcome.match_id is not None:
+        match_cache.invalidate(outcome.match_id)
+
+    my_side, other_side = (0, 1) if me < other else (1, 0)
+    if outcome.new_liked[my_side] and outcome.new_liked[other_side] is None:
+        # like sin respuesta: entra en su cola y al frente de su mazo de sugerencias
+        incoming_likes.push(other, me, outcome.swipe_id)
+        suggestion_decks.prepend(other, DeckEntry(me, game_id, 0.0, pinned=True))
+    else:
+        incoming_likes.discard(other, me)
+
+
+def _to_suggestion(entry: DeckEntry) -> Optional[Suggestion]:
+    profile = candidate_index.profile(entry.user_id)
+    skill = candidate_index.skill(entry.user_id, entry.game_id)
+    game_name = candidate_index.game_name(entry.game_id)
+    if profile is None or skill is None or game_name is None:
+        return None  # se actualizó/borró entre medio
+    return Suggestion(
+        id=entry.user_id,
+        username=profile.username,
+        age=age_on(profile.birthdate, date.today()) if profile.birthdate else 0,
+        image=profile.image,
+        bio=profile.bio,
+        game=game_name,
+        skill=skill.skill_level or "",
+        isRanked=skill.is_ranked,
+    )
 
 
 # -------------------- Endpoints --------------------
 @router.get("/suggestions", response_model=List[Suggestion])
-def get_match_suggestions(
+async def get_match_suggestions(
+    response: Response,
     server: Optional[str] = Query(None),
     is_ranked: Optional[bool] = Query(None),
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
     limit: int = Query(5, ge=1, le=50),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user_async),
+    adb: AsyncSession = Depends(get_async_db),
 ):
-    
     my_id = current_user.ID
 
-    from sqlalchemy import or_, and_, exists
-
-    not_swiped = ~exists().where(
-        or_(
-            and_(
-                Matches.UserID1 == my_id,
-                Matches.UserID2 == User.ID,     # <- correlacionado correctamente
-                Matches.LikedByUser1.isnot(None)
-            ),
-            and_(
-                Matches.UserID2 == my_id,
-                Matches.UserID1 == User.ID,     # <- correlacionado correctamente
-                Matches.LikedByUser2.isnot(None)
-            )
-        )
-    )
-
     # 1) Traer TODOS los juegos del usuario actual
-    my_skills = db.query(
-        UserGamesSkill.GameId,
-        UserGamesSkill.IsRanked,
-        UserGamesSkill.Game_rank_local_id
-    ).filter(UserGamesSkill.UserID == current_user.ID).all()
-
+    my_skills = await adb.run_sync(_my_skills, my_id)
     if not my_skills:
         return []  # sin juegos, no hay sugerencias
 
-    # 2) Query base de candidatos - SIMPLIFICADA para evitar problemas de SQL Server
-    # En lugar de hacer joins complejos, hagamos una query más simple
-    q = (
-        db.query(
-            User.ID,
-            User.Username,
-            User.BirthDate,
-            User.Bio,
-            UserGamesSkill.GameId,
-            UserGamesSkill.SkillLevel,
-            UserGamesSkill.IsRanked,
-            Games.GameName,
-            UserImages.ImageURL,
-        )
-        .join(UserGamesSkill, User.ID == UserGamesSkill.UserID)
-        .join(Games, UserGamesSkill.GameId == Games.ID)
-        .outerjoin(UserImages, and_(UserImages.UserID == User.ID, UserImages.IsPrimary == True))
-        .filter(
-            User.ID != current_user.ID,
-            User.IsActive == True,
-            not_swiped
+    # 2) Cursor: (score, User.ID) del último visto + huella de los filtros con que se generó
+    fhash = filter_hash(server, is_ranked, sorted(tuple(s) for s in my_skills))
+    after = None
+    if cursor is not None:
+        payload = decode_cursor(cursor)
+        if payload.get("f") != fhash:
+            bad_request("El cursor no corresponde a estos filtros")
+        try:
+            after = (float(payload["s"]), int(payload["u"]))
+        except (KeyError, TypeError, ValueError):
+            bad_request("Cursor inválido")
+
+    # 3) Servir desde el mazo precalculado; si no está alineado con el cursor,
+    #    calcular ahora una página + un mazo completo para las siguientes
+    swiped = await adb.run_sync(swiped_cache.get, my_id)
+    taken = suggestion_decks.take(my_id, fhash, after, limit, skip=swiped)
+    if taken is not None:
+        page, next_after, has_more = taken
+    else:
+        # el ranking es CPU (numpy): va a un thread con su propia sesión, no al event loop.
+        # Antes se suelta la conexión de la sesión async (solo hubo lecturas), para no
+        # tener dos conexiones tomadas por el mismo request mientras se calcula.
+        await adb.rollback()
+        entries, exhausted = await run_in_threadpool(
+            _deck_compute(my_id, my_skills, server, is_ranked), after, limit + suggestion_decks.size
         )
-        .distinct()
-    )
+        page, rest = entries[:limit], entries[limit:]
+        next_after = page[-1].cursor if page else after
+        has_more = bool(rest) or not exhausted
+        suggestion_decks.seed(my_id, fhash, next_after, rest, exhausted)
 
-    # 3) Armar condiciones dinámicas por cada juego propio
-    conds = []
-    for (g_id, my_ranked, my_local_rank_id) in my_skills:
-        if my_ranked and my_local_rank_id is not None:
-            # Ambos ranked y dentro de ±3
-            conds.append(
-                and_(
-                    UserGamesSkill.GameId == g_id,
-                    UserGamesSkill.IsRanked == True,
-                    UserGamesSkill.Game_rank_local_id.between(
-                        int(my_local_rank_id) - 3, int(my_local_rank_id) + 3
-                    ),
-                )
-            )
-        else:
-            # Al menos uno no ranked: basta con compartir el juego
-            conds.append(UserGamesSkill.GameId == g_id)
-
-    q = q.filter(or_(*conds))
-
-    # 4) Filtros opcionales
-    if server is not None:
-        q = q.filter(User.Server == server)
-    if is_ranked is not None:
-        q = q.filter(UserGamesSkill.IsRanked == is_ranked)
-
-    # 5) ORDER BY y paginación
-    q = q.order_by(User.ID)
-    rows = q.offset(skip).limit(limit).all()
-
-    # 6) Armar respuesta - ahora necesitamos agrupar por usuario
-    user_cache = {}
-    for row in rows:
-        user_id = row.ID
-        if user_id not in user_cache:
-            user_cache[user_id] = {
-                'id': user_id,
-                'username': row.Username,
-                'age': calculate_age(row.BirthDate),
-                'image': row.ImageURL,
-                'bio': row.Bio,
-                'games': []
-            }
-        
-        user_cache[user_id]['games'].append({
-            'game': row.GameName,
-            'skill': row.SkillLevel,
-            'isRanked': bool(row.IsRanked)
-        })
+    suggestion_decks.maybe_refill(my_id, _deck_compute(my_id, my_skills, server, is_ranked))
 
-    # 7) Convertir a formato de respuesta
-    out: List[Suggestion] = []
-    for user_data in user_cache.values():
-        # Tomar el primer juego para la respuesta (puedes ajustar esta lógica)
-        primary_game = user_data['games'][0]
-        out.append(
-            Suggestion(
-                id=user_data['id'],
-                username=user_data['username'],
-                age=user_data['age'],
-                image=user_data['image'],
-                bio=user_data['bio'],
-                game=primary_game['game'],
-                skill=primary_game['skill'],
-                isRanked=primary_game['isRanked'],
-            )
-        )
+    out = [sug for sug in map(_to_suggestion, page) if sug is not None]
 
+    if has_more and next_after is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor({
+            "s": next_after[0],
+            "u": next_after[1],
+            "f": fhash,
+        })
     return out
 
 
 @router.post("/swipe")
 def swipe_user(
     data: SwipeInput,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     me = current_user.ID
@@ -210,123 +313,161 @@ def swipe_user(
     if me == other:
         raise HTTPException(status_code=400, detail="No podés hacer swipe contra vos mismo")
 
-    # pareja canónica
-    u_low, u_high = (me, other) if me < other else (other, me)
-
-    # juego
-    selected_game_id: Optional[int] = data.game_id
-    if selected_game_id is None:
-        my_skills = db.query(UserGamesSkill.GameId, UserGamesSkill.IsRanked)\
-                      .filter(UserGamesSkill.UserID == me).all()
-        ot_skills = db.query(UserGamesSkill.GameId, UserGamesSkill.IsRanked)\
-                      .filter(UserGamesSkill.UserID == other).all()
-        my_ids = {g for g, _ in my_skills}
-        ot_ids = {g for g, _ in ot_skills}
-        common = my_ids & ot_ids
-        if len(common) == 1:
-            selected_game_id = next(iter(common))
-        elif len(my_ids) == 1:
-            selected_game_id = next(iter(my_ids))
-        else:
-            raise HTTPException(status_code=400, detail="No se pudo inferir el juego. Enviá game_id.")
-
-    my_ranked = db.query(UserGamesSkill.IsRanked).filter(
-        UserGamesSkill.UserID == me, UserGamesSkill.GameId == selected_game_id
-    ).scalar() or 0
-    ot_ranked = db.query(UserGamesSkill.IsRanked).filter(
-        UserGamesSkill.UserID == other, UserGamesSkill.GameId == selected_game_id
-    ).scalar() or 0
-    match_is_ranked = 1 if (my_ranked and ot_ranked) else 0
-
-    # buscar match existente
-    row = db.query(Matches).filter(Matches.UserID1 == u_low, Matches.UserID2 == u_high).first()
-
-    if not row:
-        # crear sin pisar el lado del otro: queda None
-        row = Matches(
-            UserID1=u_low,
-            UserID2=u_high,
-            MatchDate=datetime.utcnow(),
-            Status=True,
-            IsRanked=match_is_ranked,
-            LikedByUser1=None,
-            LikedByUser2=None,
-        )
-        db.add(row)
-        # todavía no seteamos likes, lo hacemos abajo
-
-    # estado previo (permitir None)
-    prev_l1 = row.LikedByUser1
-    prev_l2 = row.LikedByUser2
-
-    # aplicar mi swipe SOLO a mi lado
-    if me == u_low:
-        row.LikedByUser1 = bool(data.like)
-    else:
-        row.LikedByUser2 = bool(data.like)
-
-    row.IsRanked = match_is_ranked
+    # juego (skills de ambos en una sola query)
+    skills = _skills_by_user(db, [me, other])
+    selected_game_id, match_is_ranked = _resolve_game(skills[me], skills[other], data.game_id)
 
+    # MERGE sobre la pareja canónica + mensaje de sistema si hay match, en un solo batch
     try:
+        (outcome,) = merge_swipes(db, me, [(other, data.like, match_is_ranked)])
         db.commit()
-        db.refresh(row)
-
-        # evaluar match (None no cuenta)
-        now_l1 = row.LikedByUser1 is True
-        now_l2 = row.LikedByUser2 is True
-        prev_is_match = (prev_l1 is True) and (prev_l2 is True)
-        now_is_match  = now_l1 and now_l2
-
-        if now_is_match and not prev_is_match:
-            # crear mensaje sistema si no existe
-            exists_chat = db.query(Chat).filter(Chat.MatchesID == row.ID, Chat.Status == True).first()
-            if not exists_chat:
-                sysmsg = Chat(
-                    MatchesID=row.ID,
-                    SenderID=me,
-                    ContentChat="¡Se creó el chat por match!",
-                    CreatedDate=datetime.utcnow(),
-                    Status=True,
-                    ReadChat=False,
-                )
-                db.add(sysmsg)
-                db.commit()
-                db.refresh(sysmsg)
-                return {
-                    "message": "¡Es un match!",
-                    "match": True,
-                    "chat_id": sysmsg.ID,
-                    "match_id": row.ID,
-                    "game_id": selected_game_id,
-                    "is_ranked": bool(match_is_ranked),
-                }
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error al procesar el swipe: {e}")
+
+    _track_swipe(me, outcome, selected_game_id)
 
+    if outcome.chat_id is not None:
         return {
-            "message": "Swipe registrado/actualizado",
-            "match": now_is_match,
-            "match_id": row.ID,
-            "liked_by_low_high": [
-                bool(row.LikedByUser1) if row.LikedByUser1 is not None else None,
-                bool(row.LikedByUser2) if row.LikedByUser2 is not None else None,
-            ],
+            "message": "¡Es un match!",
+            "match": True,
+            "chat_id": outcome.chat_id,
+            "match_id": outcome.match_id,
             "game_id": selected_game_id,
             "is_ranked": bool(match_is_ranked),
         }
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Error al procesar el swipe: {e}")
+
+    return {
+        "message": "Swipe registrado/actualizado",
+        "match": outcome.is_match,
+        "match_id": outcome.match_id,
+        "liked_by_low_high": list(outcome.new_liked),
+        "game_id": selected_game_id,
+        "is_ranked": bool(match_is_ranked),
+    }
+
+
+@router.post("/swipe/batch", response_model=SwipeBatchOut)
+def swipe_batch(
+    data: SwipeBatchInput,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Varios swipes en una sola transacción (p. ej. la cola offline del cliente).
+    Si el mismo target aparece más de una vez gana el último.
+    Los errores por ítem (juego ambiguo, swipe a uno mismo, usuario inexistente
+    o inactivo) no cortan el lote.
+    """
+    me = current_user.ID
+
+    swipes: Dict[int, SwipeInput] = {}
+    for item in data.swipes:
+        swipes.pop(item.target_user_id, None)
+        swipes[item.target_user_id] = item
+
+    results: Dict[int, SwipeBatchItemOut] = {}
+
+    # 1) skills de todos los targets + las mías, una sola query que además dice quién existe:
+    #    un target borrado haría fallar por FK el MERGE de todo el lote
+    skills = _active_skills_by_user(db, [me, *swipes])
+    resolved: Dict[int, Tuple[int, int]] = {}
+    for target, item in swipes.items():
+        if target == me:
+            results[target] = SwipeBatchItemOut(
+                target_user_id=target, ok=False, error="No podés hacer swipe contra vos mismo"
+            )
+            continue
+        if target not in skills:
+            results[target] = SwipeBatchItemOut(target_user_id=target, ok=False, error="Usuario no encontrado")
+            continue
+        try:
+            resolved[target] = _resolve_game(skills.get(me, {}), skills[target], item.game_id)
+        except HTTPException as e:
+            results[target] = SwipeBatchItemOut(target_user_id=target, ok=False, error=e.detail)
+
+    if resolved:
+        # 2) un único MERGE para todas las parejas (+ mensajes de sistema de los matches nuevos)
+        try:
+            outcomes = merge_swipes(
+                db, me,
+                [(t, swipes[t].like, ranked) for t, (_, ranked) in resolved.items()],
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=500, detail=f"Error al procesar los swipes: {e}")
+
+        for outcome in outcomes:
+            game_id, match_is_ranked = resolved[outcome.target_id]
+            results[outcome.target_id] = SwipeBatchItemOut(
+                target_user_id=outcome.target_id,
+                ok=True,
+                match=outcome.is_match,
+                match_id=outcome.match_id,
+                chat_id=outcome.chat_id,
+                game_id=game_id,
+                is_ranked=bool(match_is_ranked),
+            )
+            _track_swipe(me, outcome, game_id)
+
+    return SwipeBatchOut(results=[results[t] for t in swipes])
+
+
+@router.get("/incoming", response_model=List[IncomingLike])
+def get_incoming_likes(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Usuarios que me dieron like y a los que todavía no les hice swipe, más recientes primero."""
+    before = None
+    if cursor is not None:
+        try:
+            before = int(decode_cursor(cursor)["q"])
+        except (KeyError, TypeError, ValueError):
+            bad_request("Cursor inválido")
+
+    items, has_more = incoming_likes.page(db, current_user.ID, before, limit)
+    if not items:
+        return []
+
+    users = {
+        u.ID: u for u in db.query(User).options(*USER_PROFILE_CARD)
+        .filter(User.ID.in_([liker for _, liker in items]), User.IsActive == True)
+        .all()
+    }
+    out = []
+    for _, liker in items:
+        user = users.get(liker)
+        if user is None:
+            continue  # dado de baja
+        image = next((img.ImageURL for img in user.images if img.IsPrimary), None)
+        out.append(IncomingLike(
+            id=user.ID,
+            username=user.Username,
+            age=age_on(user.BirthDate, date.today()) if user.BirthDate else 0,
+            image=image,
+            bio=user.Bio,
+        ))
+
+    if has_more:
+        response.headers["X-Next-Cursor"] = encode_cursor({"q": items[-1][0]})
+    return out
 
 
 @router.get("/matches", response_model=List[Match])
 def get_all_matches(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     # ID del usuario actual
     my_id = current_user.ID
 
     # Traer todos los matchs en los que el usuario está involucrado, ya sea como UserID1 o UserID2
-    matches = db.query(Matches).filter(
+    matches = db.query(Matches).options(noload("*")).filter(
         or_(
             Matches.UserID1 == my_id,
             Matches.UserID2 == my_id
@@ -359,10 +500,10 @@ def get_all_matches(
 def get_match_details(
     match_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     # Verificar si el match existe
-    match = db.query(Matches).filter(Matches.ID == match_id).first()
+    match = db.query(Matches).options(noload("*")).filter(Matches.ID == match_id).first()
     if not match:
         raise HTTPException(status_code=404, detail="Match not found")
 
@@ -1,18 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, EmailStr, Field
 from sqlalchemy.orm import Session
 from datetime import date, datetime
 from typing import List, Optional
 
-from app.utils.security import hash_password
+from app.utils.security import hash_password, create_access_token
 from app.db.connection import get_db
 from app.models.user import User
+from app.db.load_profiles import USER_FULL
 from app.models.user_images import UserImages
 from app.models.user_game_skill import UserGamesSkill
 from app.models.game_ranks import GameRanks
 from sqlalchemy import and_
 from app.models.games import Games
-from app.routers.auth import get_current_user
+from app.routers.auth import get_current_user, get_current_user_row
+from app.utils.principal_cache import Principal, principal_cache
+from app.utils.token_epochs import token_epochs
+from app.utils.candidate_index import candidate_index
+from app.utils.swipe_cache import swiped_cache
+from app.utils.incoming_likes import incoming_likes
+from app.utils.suggestion_deck import suggestion_decks
+from app.utils.content_filter import content_filter
 import os
 from sqlalchemy.orm import noload
 
@@ -57,6 +65,8 @@ class UserProfile(BaseModel):
     discord: Optional[str] = None
     tracker: Optional[str] = None
     birthdate: Optional[date] = None
+    age_min: Optional[int] = Field(default=None, ge=18, le=99)  # preferencia de edad del match
+    age_max: Optional[int] = Field(default=None, ge=18, le=99)
     games: Optional[List[GameSkillUpdate]] = None
     images: Optional[List[ProfileImage]] = None  # Lista de URLs de imágenes
 
@@ -68,6 +78,8 @@ class UserProfileOut(BaseModel):
     discord: Optional[str] = None
     tracker: Optional[str] = None
     age: int
+    age_min: Optional[int] = None
+    age_max: Optional[int] = None
     games: List[GameSkillUpdate] = []
     images: List[UserImageOut]
 
@@ -77,9 +89,9 @@ class UserProfileOut(BaseModel):
 @router.get("/me", response_model=UserProfileOut)
 def get_my_profile(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
-    user = db.query(User).filter(User.ID == current_user.ID).first()
+    user = db.query(User).options(*USER_FULL).filter(User.ID == current_user.ID).first()
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
@@ -139,6 +151,8 @@ def get_my_profile(
         discord=user.Discord,
         tracker=user.Tracker,
         age=calculate_age(user.BirthDate),
+        age_min=user.AgeMin,
+        age_max=user.AgeMax,
         games=games_payload,
         images=images_payload,
     )
@@ -147,14 +161,17 @@ def get_my_profile(
 @router.put("/me")
 def update_profile(
     profile: UserProfile,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_row),
     db: Session = Depends(get_db)
 ):
+    content_filter.ensure_clean(profile.username, "El nombre de usuario")
+    content_filter.ensure_clean(profile.bio, "La bio")
     if profile.username is not None:
         current_user.Username = profile.username
     if profile.password is not None:
         UpdatedPassword = hash_password(profile.password)
         current_user.Password = UpdatedPassword
+        new_epoch = token_epochs.bump(db, current_user.ID)  # revoca los tokens anteriores
     if profile.bio is not None:
         current_user.Bio = profile.bio
     if profile.server is not None:
@@ -165,6 +182,16 @@ def update_profile(
         current_user.Tracker = profile.tracker
     if profile.birthdate is not None:
         current_user.BirthDate = profile.birthdate
+    if profile.age_min is not None:
+        current_user.AgeMin = profile.age_min
+    if profile.age_max is not None:
+        current_user.AgeMax = profile.age_max
+    if (
+        current_user.AgeMin is not None
+        and current_user.AgeMax is not None
+        and current_user.AgeMin > current_user.AgeMax
+    ):
+        raise HTTPException(status_code=400, detail="age_min no puede ser mayor que age_max")
 
     if profile.games is not None:
         # 1) Borrar skills previas del usuario (sin sincronizar sesión para evitar flushes intermedios)
@@ -247,6 +274,18 @@ def update_profile(
 
     db.commit()
     db.refresh(current_user)
+    principal_cache.invalidate_user(current_user.ID)
+    access_token = None
+    if profile.password is not None:
+        token_epochs.note(current_user.ID, new_epoch)
+        access_token = create_access_token({"sub": current_user.Mail, "uid": current_user.ID, "ep": new_epoch})
+    candidate_index.refresh_user(db, current_user.ID)
+    # cambian los filtros/puntaje de mis sugerencias: el mazo precalculado ya no sirve
+    if any(
+        v is not None
+        for v in (profile.games, profile.server, profile.birthdate, profile.age_min, profile.age_max)
+    ):
+        suggestion_decks.invalidate(current_user.ID)
 
     user_images = (
         db.query(UserImages)
@@ -263,6 +302,7 @@ def update_profile(
 
     return {
         "message": "Perfil actualizado",
+        "access_token": access_token,  # solo si cambió la contraseña: el token anterior ya no sirve
         "new_profile": {
             "username": current_user.Username,
             "email": current_user.Mail,
@@ -279,17 +319,24 @@ def update_profile(
 
 @router.delete("/me")
 def delete_my_account(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_row),
     db: Session = Depends(get_db)
 ):
     current_user.IsActive = False
+    epoch = token_epochs.bump(db, current_user.ID)
     db.commit()
+    token_epochs.note(current_user.ID, epoch)
+    principal_cache.invalidate_user(current_user.ID)
+    candidate_index.remove_user(current_user.ID)
+    swiped_cache.forget(current_user.ID)
+    incoming_likes.forget(current_user.ID)
+    suggestion_decks.invalidate(current_user.ID)
     return {"message": "Cuenta eliminada exitosamente"}
 
 
 @router.get("/{user_id}", response_model=UserProfileOut)
 def get_user_profile(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.ID == user_id).first()
+    user = db.query(User).options(*USER_FULL).filter(User.ID == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
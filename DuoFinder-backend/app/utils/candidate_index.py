@@ -0,0 +1,314 @@
+# app/utils/candidate_index.py
+"""
+Índice en memoria de candidatos para /matches/suggestions.
+
+Agrupa a los usuarios activos por (GameId, IsRanked, bucket de Game_rank_local_id, Server)
+para que buscar candidatos sea un lookup de sets + filtrado en Python, sin pegarle
+a SQL Server en cada request. Se carga al arrancar y se actualiza por usuario
+cuando cambia su perfil (update_profile) o se da de baja (delete_my_account).
+"""
+import threading
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import CANDIDATE_RANK_BUCKET_SIZE, CANDIDATE_RANK_WINDOW
+from app.models.user import User
+from app.models.user_images import UserImages
+from app.models.user_game_skill import UserGamesSkill
+from app.models.games import Games
+from app.models.game_ranks import GameRanks
+
+# (GameId, IsRanked, bucket)  ->  {Server: {UserID, ...}}
+BucketKey = Tuple[int, bool, Optional[int]]
+
+
+@dataclass(frozen=True)
+class CandidateProfile:
+    username: str
+    birthdate: Optional[date]
+    bio: Optional[str]
+    server: Optional[str]
+    image: Optional[str]
+    age_min: Optional[int]
+    age_max: Optional[int]
+
+
+@dataclass(frozen=True)
+class CandidateSkill:
+    game_id: int
+    is_ranked: bool
+    local_rank_id: Optional[int]
+    skill_level: Optional[str]
+    rank_order: Optional[int] = None  # Game_ranks.Rank_order del rango local
+
+
+def _years_ago(today: date, years: int) -> date:
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:  # 29/02
+        return today.replace(year=today.year - years, day=28)
+
+
+def age_on(birthdate: date, today: date) -> int:
+    return today.year - birthdate.year - ((today.month, today.day) < (birthdate.month, birthdate.day))
+
+
+@dataclass(frozen=True)
+class AgeFilter:
+    """
+    Preferencias de edad mutuas, precalculadas una vez por request:
+    el candidato cae en mi AgeMin/AgeMax (como rango de BirthDate) y yo en el suyo.
+    """
+    born_after: Optional[date]   # el candidato nació después de esta fecha...
+    born_until: Optional[date]   # ...y hasta esta fecha inclusive
+    viewer_age: Optional[int]    # mi edad, contra AgeMin/AgeMax del candidato
+
+    @classmethod
+    def for_viewer(cls, viewer: Optional["CandidateProfile"], today: Optional[date] = None) -> "AgeFilter":
+        if viewer is None:
+            return cls(None, None, None)
+        today = today or date.today()
+        return cls(
+            born_after=_years_ago(today, viewer.age_max + 1) if viewer.age_max is not None else None,
+            born_until=_years_ago(today, viewer.age_min) if viewer.age_min is not None else None,
+            viewer_age=age_on(viewer.birthdate, today) if viewer.birthdate else None,
+        )
+
+    def accepts(self, p: "CandidateProfile") -> bool:
+        if self.born_after is not None or self.born_until is not None:
+            if p.birthdate is None:
+                return False
+            if self.born_after is not None and p.birthdate <= self.born_after:
+                return False
+            if self.born_until is not None and p.birthdate > self.born_until:
+                return False
+        if self.viewer_age is not None:
+            if p.age_min is not None and self.viewer_age < p.age_min:
+                return False
+            if p.age_max is not None and self.viewer_age > p.age_max:
+                return False
+        return True
+
+
+def rank_bucket(local_rank_id: Optional[int]) -> Optional[int]:
+    if local_rank_id is None:
+        return None
+    return int(local_rank_id) // CANDIDATE_RANK_BUCKET_SIZE
+
+
+class CandidateIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._profiles: Dict[int, CandidateProfile] = {}
+        self._skills: Dict[int, Dict[int, CandidateSkill]] = {}
+        self._buckets: Dict[BucketKey, Dict[Optional[str], Set[int]]] = {}
+        self._keys_by_game: Dict[int, Set[BucketKey]] = {}
+        self._game_names: Dict[int, str] = {}
+        self._rank_orders: Dict[Tuple[int, int], Optional[int]] = {}
+
+    # -------------------- Carga --------------------
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, db: Session) -> None:
+        """Carga completa desde User / User_Games_Skill / User_Images / Games / Game_ranks."""
+        game_names = {gid: name for gid, name in db.query(Games.ID, Games.GameName).all()}
+        rank_orders = {
+            (gid, local_id): order
+            for gid, local_id, order in db.query(
+                GameRanks.Game_id, GameRanks.Local_rank_id, GameRanks.Rank_order
+            ).all()
+        }
+        with self._lock:
+            self._rank_orders = rank_orders  # _fetch lo usa para resolver Rank_order
+        profiles, skills = self._fetch(db)
+
+        with self._lock:
+            self._profiles = {}
+            self._skills = {}
+            self._buckets = {}
+            self._keys_by_game = {}
+            self._game_names = game_names
+            for user_id, profile in profiles.items():
+                self._put(user_id, profile, skills.get(user_id, []))
+            self._loaded = True
+
+    def ensure_loaded(self, db: Session) -> None:
+        if not self._loaded:
+            self.load(db)
+
+    def refresh_user(self, db: Session, user_id: int) -> None:
+        """Vuelve a leer un usuario (perfil, juegos e imagen principal) y reemplaza su entrada."""
+        if not self._loaded:
+            return
+        profiles, skills = self._fetch(db, user_id)
+        missing_games = {
+            s.game_id for s in skills.get(user_id, []) if s.game_id not in self._game_names
+        }
+        if missing_games:
+            extra = db.query(Games.ID, Games.GameName).filter(Games.ID.in_(missing_games)).all()
+        else:
+            extra = []
+
+        with self._lock:
+            self._game_names.update({gid: name for gid, name in extra})
+            self._drop(user_id)
+            if user_id in profiles:
+                self._put(user_id, profiles[user_id], skills.get(user_id, []))
+
+    def remove_user(self, user_id: int) -> None:
+        with self._lock:
+            self._drop(user_id)
+
+    # -------------------- Consultas --------------------
+    def find_candidates(
+        self,
+        my_skills: Iterable[Tuple[int, Optional[bool], Optional[int]]],
+        server: Optional[str] = None,
+        is_ranked: Optional[bool] = None,
+        ages: Optional[AgeFilter] = None,
+    ) -> Dict[int, List[int]]:
+        """
+        Devuelve {UserID: [GameId, ...]} con los juegos (en el orden de my_skills)
+        por los que cada candidato es compatible:
+          - si yo juego ranked con rango: el otro ranked y dentro de ±CANDIDATE_RANK_WINDOW
+          - si no: basta con compartir el juego
+        Con `ages` se descartan los que no cumplen las preferencias de edad mutuas.
+        """
+        out: Dict[int, List[int]] = {}
+        age_ok: Dict[int, bool] = {}
+        with self._lock:
+            for game_id, my_ranked, my_rank in my_skills:
+                if my_ranked and my_rank is not None:
+                    lo = int(my_rank) - CANDIDATE_RANK_WINDOW
+                    hi = int(my_rank) + CANDIDATE_RANK_WINDOW
+                    if is_ranked is False:
+                        continue
+                    keys = [(game_id, True, b) for b in range(rank_bucket(lo), rank_bucket(hi) + 1)]
+                else:
+                    lo = hi = None
+                    keys = [
+                        k for k in self._keys_by_game.get(game_id, ())
+                        if is_ranked is None or k[1] == is_ranked
+                    ]
+
+                for key in keys:
+                    by_server = self._buckets.get(key)
+                    if not by_server:
+                        continue
+                    if server is not None:
+                        groups = [by_server.get(server, ())]
+                    else:
+                        groups = by_server.values()
+                    for group in groups:
+                        for user_id in group:
+                            if lo is not None:
+                                rank = self._skills[user_id][game_id].local_rank_id
+                                if rank is None or not (lo <= rank <= hi):
+                                    continue
+                            if ages is not None:
+                                ok = age_ok.get(user_id)
+                                if ok is None:
+                                    ok = age_ok[user_id] = ages.accepts(self._profiles[user_id])
+                                if not ok:
+                                    continue
+                            games = out.setdefault(user_id, [])
+                            if game_id not in games:
+                                games.append(game_id)
+        return out
+
+    def profile(self, user_id: int) -> Optional[CandidateProfile]:
+        return self._profiles.get(user_id)
+
+    def skill(self, user_id: int, game_id: int) -> Optional[CandidateSkill]:
+        return self._skills.get(user_id, {}).get(game_id)
+
+    def game_name(self, game_id: int) -> Optional[str]:
+        return self._game_names.get(game_id)
+
+    def rank_order(self, game_id: int, local_rank_id: Optional[int]) -> Optional[int]:
+        if local_rank_id is None:
+            return None
+        return self._rank_orders.get((game_id, local_rank_id))
+
+    # -------------------- Internos --------------------
+    def _fetch(
+        self, db: Session, user_id: Optional[int] = None
+    ) -> Tuple[Dict[int, CandidateProfile], Dict[int, List[CandidateSkill]]]:
+        users_q = db.query(
+            User.ID, User.Username, User.BirthDate, User.Bio, User.Server,
+            User.AgeMin, User.AgeMax,
+        ).filter(User.IsActive == True)
+        skills_q = db.query(
+            UserGamesSkill.UserID,
+            UserGamesSkill.GameId,
+            UserGamesSkill.IsRanked,
+            UserGamesSkill.Game_rank_local_id,
+            UserGamesSkill.SkillLevel,
+        )
+        images_q = db.query(UserImages.UserID, UserImages.ImageURL).filter(UserImages.IsPrimary == True)
+
+        if user_id is not None:
+            users_q = users_q.filter(User.ID == user_id)
+            skills_q = skills_q.filter(UserGamesSkill.UserID == user_id)
+            images_q = images_q.filter(UserImages.UserID == user_id)
+
+        images: Dict[int, str] = {}
+        for uid, url in images_q.all():
+            images.setdefault(uid, url)
+
+        skills: Dict[int, List[CandidateSkill]] = {}
+        for uid, gid, ranked, local_rank, level in skills_q.all():
+            skills.setdefault(uid, []).append(
+                CandidateSkill(gid, bool(ranked), local_rank, level, self.rank_order(gid, local_rank))
+            )
+
+        profiles: Dict[int, CandidateProfile] = {}
+        for row in users_q.all():
+            if row.ID not in skills:
+                continue  # sin juegos nunca es candidato
+            profiles[row.ID] = CandidateProfile(
+                username=row.Username,
+                birthdate=row.BirthDate,
+                bio=row.Bio,
+                server=row.Server,
+                image=images.get(row.ID),
+                age_min=row.AgeMin,
+                age_max=row.AgeMax,
+            )
+        return profiles, skills
+
+    def _put(self, user_id: int, profile: CandidateProfile, skills: List[CandidateSkill]) -> None:
+        self._profiles[user_id] = profile
+        self._skills[user_id] = {s.game_id: s for s in skills}
+        for s in skills:
+            key = (s.game_id, s.is_ranked, rank_bucket(s.local_rank_id) if s.is_ranked else None)
+            self._buckets.setdefault(key, {}).setdefault(profile.server, set()).add(user_id)
+            self._keys_by_game.setdefault(s.game_id, set()).add(key)
+
+    def _drop(self, user_id: int) -> None:
+        profile = self._profiles.pop(user_id, None)
+        skills = self._skills.pop(user_id, {})
+        if profile is None:
+            return
+        for s in skills.values():
+            key = (s.game_id, s.is_ranked, rank_bucket(s.local_rank_id) if s.is_ranked else None)
+            by_server = self._buckets.get(key)
+            if not by_server:
+                continue
+            group = by_server.get(profile.server)
+            if group is not None:
+                group.discard(user_id)
+                if not group:
+                    del by_server[profile.server]
+            if not by_server:
+                del self._buckets[key]
+                self._keys_by_game.get(s.game_id, set()).discard(key)
+
+
+candidate_index = CandidateIndex()
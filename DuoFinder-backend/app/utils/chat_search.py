@@ -0,0 +1,427 @@
+# app/utils/chat_search.py
+"""
+Índice invertido en memoria para GET /chats/search.
+
+token -> {MatchesID: {Chat.ID: frecuencia}}, así una búsqueda solo mira las
+postings de los matches de quien busca, sin LIKE '%...%' sobre dbo.Chat.
+
+Persistencia: cada mensaje indexado se agrega como una línea JSON a
+CHAT_SEARCH_INDEX_PATH; al arrancar se reproduce el archivo y después se
+indexa lo que falte desde la DB (sync). La primera vez, sin archivo, se arma
+completo desde dbo.Chat y dbo.ChatSegment en un archivo temporal que recién
+se renombra (y el índice se marca cargado) cuando el armado terminó bien: si
+la DB falla a mitad de camino, el próximo intento vuelve a empezar.
+
+Varios workers comparten el archivo. Cada escritura y cada reemplazo se hacen
+con un lock de archivo (`path`.lock, fcntl); antes de escribir, un worker
+revisa si el archivo fue reemplazado por otro (compactación) y en ese caso
+reproduce el nuevo y sigue escribiendo ahí, así no agrega líneas a un archivo
+que ya nadie va a leer. Cada proceso arma en su propio temporal.
+
+Marca de sync: junto con los mensajes se guardan líneas {"w": N} que dicen
+"todos los Chat.ID <= N están en el archivo". sync relee desde la marca, no
+desde el último ID visto: un hueco de IDs (transacción sin commit, rollback,
+salto de IDENTITY) frena la marca hasta que el mensaje siguiente tiene más de
+SYNC_GRACE, así un commit tardío no queda afuera del índice.
+
+Compactación: cuando el journal crece más del doble de lo que medía después
+del último armado (y pasa CHAT_SEARCH_COMPACT_MIN_MB), se rearma desde la DB
+en segundo plano y se reemplazan archivo e índice de una vez. Así el archivo
+queda acotado a los mensajes que existen (los borrados desaparecen).
+"""
+import json
+import logging
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows (desarrollo, un solo proceso): alcanza con el lock del thread
+    fcntl = None
+
+from sqlalchemy.orm import Session
+
+from app.config import CHAT_SEARCH_COMPACT_MIN_MB, CHAT_SEARCH_INDEX_PATH
+from app.db.chat_archive import decode_segment
+from app.db.connection import SessionLocal
+from app.models.chat import Chat
+from app.models.chat_segment import ChatSegment
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+")
+MIN_TOKEN_LEN = 2
+MAX_TOKEN_LEN = 40
+BM25_K1 = 1.2
+SYNC_BATCH = 5000
+# un hueco de IDs se da por definitivo cuando el mensaje siguiente es más viejo que esto
+SYNC_GRACE = timedelta(minutes=2)
+# el journal se compacta al superar este múltiplo de su tamaño después del último armado
+COMPACT_GROWTH = 2.0
+
+Hit = Tuple[float, int, int]  # (score, Chat.ID, MatchesID)
+Message = Tuple[int, int, Optional[str]]  # (Chat.ID, MatchesID, contenido)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Minúsculas, sin tildes, solo palabras de MIN..MAX caracteres."""
+    if not text:
+        return []
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return [t for t in _TOKEN_RE.findall(folded) if MIN_TOKEN_LEN <= len(t) <= MAX_TOKEN_LEN]
+
+
+def _journal_line(msg_id: int, match_id: int, tfs: Dict[str, int]) -> str:
+    return json.dumps([msg_id, match_id, tfs], ensure_ascii=False, separators=(",", ":"))
+
+
+def _watermark_line(watermark: int) -> str:
+    return json.dumps({"w": watermark})
+
+
+def _advance(watermark: int, contiguous: bool, rows, cutoff: datetime) -> Tuple[int, bool]:
+    """
+    Corre la marca sobre `rows` (ordenadas por ID) mientras no haya huecos, o el
+    hueco sea viejo (el mensaje que lo sigue es anterior a `cutoff`).
+    Devuelve (marca, si todavía no se cortó).
+    """
+    for row in rows:
+        if not contiguous:
+            break
+        if row.ID == watermark + 1 or row.CreatedDate is None or row.CreatedDate <= cutoff:
+            watermark = row.ID
+        else:
+            contiguous = False
+    return watermark, contiguous
+
+
+class _State:
+    """Postings + contadores; se reemplaza entero al compactar."""
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, Dict[int, int]]] = {}
+        self.df: Dict[str, int] = {}
+        self.docs: Dict[int, int] = {}   # Chat.ID -> MatchesID
+        self.watermark = 0               # todos los Chat.ID <= watermark están indexados
+
+    def put(self, msg_id: int, match_id: int, tfs: Dict[str, int]) -> bool:
+        if msg_id in self.docs:
+            return False
+        self.docs[msg_id] = match_id
+        for token, tf in tfs.items():
+            self.postings.setdefault(token, {}).setdefault(match_id, {})[msg_id] = tf
+            self.df[token] = self.df.get(token, 0) + 1
+        return True
+
+
+class ChatSearchIndex:
+    def __init__(self, path: str = CHAT_SEARCH_INDEX_PATH, compact_min_bytes: int = CHAT_SEARCH_COMPACT_MIN_MB << 20):
+        self.path = path
+        self.compact_min_bytes = compact_min_bytes
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._state = _State()
+        self._journal: Optional[IO[str]] = None
+        self._journal_bytes = 0
+        self._compact_at = compact_min_bytes
+        self._compacting = False
+
+    # -------------------- Carga --------------------
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, db: Session) -> None:
+        """Reproduce el archivo del índice (o lo arma desde la DB) y completa lo que falte."""
+        with self._lock:
+            if self._loaded:
+                return
+            with self._file_lock():
+                exists = os.path.exists(self.path)
+                if exists:
+                    self._install(self._replay())
+            if not exists:
+                # sin archivo: armado completo (sin el lock de archivo, tarda); si falla no
+                # queda nada a medias. Si otro worker instala el suyo antes, gana el último
+                # y el otro lo nota en su próxima escritura.
+                state, tmp = self._build(db)
+                with self._file_lock():
+                    self._install(state, tmp)
+            self._loaded = True
+        self.sync(db)
+
+    def ensure_loaded(self, db: Session) -> None:
+        if not self._loaded:
+            self.load(db)
+
+    def sync(self, db: Session) -> int:
+        """Indexa los mensajes de dbo.Chat posteriores a la marca (p. ej. de otro worker)."""
+        added = 0
+        watermark = after = self._state.watermark
+        contiguous = True
+        cutoff = datetime.utcnow() - SYNC_GRACE
+        while True:
+            rows = self._hot_batch(db, after)
+            watermark, contiguous = _advance(watermark, contiguous, rows, cutoff)
+            added += self.add_many(((r.ID, r.MatchesID, r.ContentChat) for r in rows), watermark)
+            if len(rows) < SYNC_BATCH:
+                return added
+            after = rows[-1].ID
+
+    # -------------------- Escritura --------------------
+    def add(self, msg_id: int, match_id: int, content: Optional[str]) -> None:
+        self.add_many([(msg_id, match_id, content)])
+
+    def add_many(self, messages: Iterable[Message], watermark: Optional[int] = None) -> int:
+        """
+        Indexa y persiste `messages`. `watermark` (de sync) se guarda solo si el
+        archivo no cambió desde que se calculó: si otro worker lo reemplazó, la
+        marca vale para el archivo viejo y se descarta.
+        """
+        if not self._loaded:
+            return 0  # se indexa en el sync de la carga
+        messages = list(messages)
+        added = 0
+        with self._lock:
+            if not self._loaded:
+                return 0
+            try:
+                with self._file_lock():
+                    if self._replaced():
+                        self._reopen()
+                        watermark = None
+                        if not self._loaded:
+                            return 0
+                    lines = []
+                    for msg_id, match_id, content in messages:
+                        if msg_id in self._state.docs:
+                            continue
+                        tfs = dict(Counter(tokenize(content)))
+                        self._state.put(msg_id, match_id, tfs)
+                        lines.append(_journal_line(msg_id, match_id, tfs))
+                    added = len(lines)
+                    if watermark is not None and watermark > self._state.watermark:
+                        self._state.watermark = watermark
+                        lines.append(_watermark_line(watermark))
+                    if lines:
+                        self._write(lines)
+            except OSError as e:
+                logger.warning("No se pudo persistir el índice de búsqueda del chat: %s", e)
+            start_compaction = self._journal_bytes > self._compact_at and not self._compacting
+            if start_compaction:
+                self._compacting = True
+        if start_compaction:
+            threading.Thread(target=self._compact, name="chat-search-compact", daemon=True).start()
+        return added
+
+    def compact(self, db: Session) -> None:
+        """Rearma índice y archivo desde la DB y los reemplaza de una vez."""
+        before = self._file_id()
+        state, tmp = self._build(db)
+        with self._lock, self._file_lock():
+            if self._file_id() != before:
+                # otro worker compactó mientras armábamos: se usa el suyo
+                os.remove(tmp)
+                self._reopen()
+            else:
+                self._install(state, tmp)
+                self._loaded = True
+        self.sync(db)  # lo que llegó mientras se armaba
+
+    # -------------------- Consultas --------------------
+    def search(
+        self,
+        match_ids: Set[int],
+        query: str,
+        n: int,
+        after: Optional[Tuple[float, int]] = None,
+    ) -> List[Hit]:
+        """
+        Mensajes de `match_ids` que contienen todos los términos de `query`,
+        ordenados por (score BM25 desc, Chat.ID desc) y empezando después de `after`.
+        """
+        terms = set(tokenize(query))
+        if not terms or not match_ids:
+            return []
+
+        with self._lock:
+            state = self._state
+            total = len(state.docs) or 1
+            per_term: List[Tuple[float, Dict[int, int], Dict[int, int]]] = []
+            for term in terms:
+                by_match = state.postings.get(term)
+                if not by_match:
+                    return []
+                tfs: Dict[int, int] = {}
+                owner: Dict[int, int] = {}
+                for match_id in match_ids & by_match.keys():
+                    docs = by_match[match_id]
+                    tfs.update(docs)
+                    owner.update(dict.fromkeys(docs, match_id))
+                if not tfs:
+                    return []
+                df = state.df[term]
+                idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+                per_term.append((idf, tfs, owner))
+
+        # intersección arrancando por el término más raro
+        per_term.sort(key=lambda t: len(t[1]))
+        candidates = set(per_term[0][1])
+        for _, tfs, _ in per_term[1:]:
+            candidates &= tfs.keys()
+        owner = per_term[0][2]
+
+        hits: List[Hit] = []
+        for msg_id in candidates:
+            score = sum(
+                idf * tfs[msg_id] * (BM25_K1 + 1) / (tfs[msg_id] + BM25_K1) for idf, tfs, _ in per_term
+            )
+            hit = (round(score, 6), msg_id, owner[msg_id])
+            if after is not None and not (hit[0] < after[0] or (hit[0] == after[0] and msg_id < after[1])):
+                continue
+            hits.append(hit)
+        hits.sort(key=lambda h: (-h[0], -h[1]))
+        return hits[:n]
+
+    # -------------------- Internos --------------------
+    @staticmethod
+    def _hot_batch(db: Session, after: int):
+        return (
+            db.query(Chat.ID, Chat.MatchesID, Chat.ContentChat, Chat.CreatedDate)
+            .filter(Chat.ID > after)
+            .order_by(Chat.ID)
+            .limit(SYNC_BATCH)
+            .all()
+        )
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Exclusión entre procesos para escribir o reemplazar el archivo."""
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _file_id(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_dev, st.st_ino
+
+    def _replaced(self) -> bool:
+        """Con el lock de archivo tomado: el archivo abierto ya no es el de `path`."""
+        st = os.fstat(self._journal.fileno())
+        return self._file_id() != (st.st_dev, st.st_ino)
+
+    def _reopen(self) -> None:
+        """Con los locks tomados: pasa al archivo actual (reemplazado por otro worker)."""
+        if os.path.exists(self.path):
+            self._install(self._replay())
+            return
+        # alguien lo borró: se vuelve a armar en la próxima búsqueda
+        self._journal.close()
+        self._journal = None
+        self._state = _State()
+        self._loaded = False
+
+    def _replay(self) -> _State:
+        state = _State()
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # línea cortada por un corte abrupto (la marca siguiente no la cubre)
+                if isinstance(entry, dict):
+                    state.watermark = max(state.watermark, entry["w"])
+                else:
+                    state.put(*entry)
+        return state
+
+    def _write(self, lines: List[str]) -> None:
+        """Con el lock de archivo tomado."""
+        chunk = "\n".join(lines) + "\n"
+        fd = self._journal.fileno()
+        size = os.fstat(fd).st_size
+        if size and hasattr(os, "pread") and os.pread(fd, 1, size - 1) != b"\n":
+            chunk = "\n" + chunk  # la última línea quedó cortada: no pegarse a ella
+        self._journal.write(chunk)
+        self._journal.flush()
+        self._journal_bytes = os.fstat(fd).st_size
+
+    def _build(self, db: Session) -> Tuple[_State, str]:
+        """Índice completo (segmentos + dbo.Chat) en un temporal propio; no toca el índice actual."""
+        state = _State()
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        cutoff = datetime.utcnow() - SYNC_GRACE
+        try:
+            with open(tmp, "w", encoding="utf-8") as out:
+                def index(messages: Iterable[Message]) -> None:
+                    for msg_id, match_id, content in messages:
+                        tfs = dict(Counter(tokenize(content)))
+                        if state.put(msg_id, match_id, tfs):
+                            out.write(_journal_line(msg_id, match_id, tfs) + "\n")
+
+                for segment in db.query(ChatSegment).yield_per(100):
+                    index((m.ID, m.MatchesID, m.ContentChat) for m in decode_segment(segment))
+                after, contiguous = 0, True
+                while True:
+                    rows = self._hot_batch(db, after)
+                    index((r.ID, r.MatchesID, r.ContentChat) for r in rows)
+                    state.watermark, contiguous = _advance(state.watermark, contiguous, rows, cutoff)
+                    if len(rows) < SYNC_BATCH:
+                        break
+                    after = rows[-1].ID
+                out.write(_watermark_line(state.watermark) + "\n")
+                out.flush()
+                os.fsync(out.fileno())
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        return state, tmp
+
+    def _install(self, state: _State, tmp: Optional[str] = None) -> None:
+        """Con los locks tomados: activa `state` y su archivo (el temporal recién armado, si hay)."""
+        if tmp is not None:
+            os.replace(tmp, self.path)
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self.path, "a+", encoding="utf-8")
+        self._journal_bytes = os.path.getsize(self.path)
+        self._compact_at = max(self.compact_min_bytes, int(self._journal_bytes * COMPACT_GROWTH))
+        self._state = state
+
+    def _compact(self) -> None:
+        db = SessionLocal()
+        try:
+            self.compact(db)
+        except Exception:
+            logger.exception("No se pudo compactar el índice de búsqueda del chat")
+            with self._lock:
+                # reintentar recién cuando vuelva a crecer, no en cada mensaje
+                self._compact_at = int(self._journal_bytes * COMPACT_GROWTH)
+        finally:
+            db.close()
+            self._compacting = False
+
+
+chat_search = ChatSearchIndex()
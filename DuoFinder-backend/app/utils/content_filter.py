@@ -0,0 +1,188 @@
+# app/utils/content_filter.py
+"""
+Filtro de términos prohibidos para mensajes de chat, Bio y Username.
+
+Los términos se compilan una vez en un autómata Aho-Corasick, así revisar un
+texto es una sola pasada lineal sin importar cuántos términos haya. Texto y
+términos pasan por la misma normalización (minúsculas, sin tildes, leetspeak),
+de modo que "P4$$w0rd", "pássword" y "PASSWORD" terminan iguales.
+
+El archivo de términos (CONTENT_FILTER_TERMS_PATH) tiene un término por línea;
+'#' comenta. Por defecto se busca la palabra completa; con '*' al final (o al
+principio) también matchea como prefijo (o sufijo). Si el archivo cambia, se
+recompila solo, como mucho cada CONTENT_FILTER_RELOAD_SECONDS.
+"""
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.config import CONTENT_FILTER_RELOAD_SECONDS, CONTENT_FILTER_TERMS_PATH
+from app.utils.exceptions import bad_request
+
+logger = logging.getLogger(__name__)
+
+_LEET = str.maketrans({
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "8": "b",
+    "@": "a", "$": "s", "!": "i", "|": "l", "€": "e",
+})
+_LEET_CHARS_RE = re.compile(r"[0-9@$€!|]")
+_NON_LETTERS_RE = re.compile(r"[\W\d_]+")
+
+
+def _fold_word(word: str) -> str:
+    if not any(ch.isalpha() for ch in word):
+        return word  # números sueltos no son leetspeak
+    end = len(word)
+    while end and (word[end - 1] in "!|" or not (word[end - 1].isalnum() or word[end - 1] in "@$€")):
+        end -= 1  # "hola!" es puntuación, "h!jo" es leet
+    return word[:end].translate(_LEET) + word[end:]
+
+
+def normalize(text: str) -> str:
+    """Forma canónica para comparar: minúsculas, sin tildes, leet resuelto, palabras separadas por un espacio."""
+    folded = text.lower()
+    if not folded.isascii():
+        folded = "".join(ch for ch in unicodedata.normalize("NFKD", folded) if not unicodedata.combining(ch))
+    if _LEET_CHARS_RE.search(folded):
+        folded = " ".join(_fold_word(w) if _LEET_CHARS_RE.search(w) else w for w in folded.split())
+    return _NON_LETTERS_RE.sub(" ", folded)
+
+
+@dataclass(frozen=True)
+class _Term:
+    text: str          # término tal cual en el archivo
+    length: int        # largo ya normalizado
+    whole_start: bool  # exige borde de palabra a la izquierda
+    whole_end: bool    # ...y a la derecha
+
+
+class Automaton:
+    """Aho-Corasick sobre caracteres: transiciones en dicts, fallos precalculados."""
+
+    def __init__(self, terms: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[_Term, ...]] = [()]
+        self.size = 0
+
+        for raw in terms:
+            raw = raw.strip()
+            prefix, suffix = raw.endswith("*"), raw.startswith("*")
+            key = normalize(raw.strip("*")).strip()
+            if not key:
+                continue
+            term = _Term(raw, len(key), whole_start=not suffix, whole_end=not prefix)
+            state = 0
+            for ch in key:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            self._out[state] += (term,)
+            self.size += 1
+
+        # BFS: fallo de cada estado = sufijo propio más largo que también es prefijo de algún término
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def find(self, text: str, first_only: bool = False) -> List[str]:
+        """Términos presentes en `text` (ya normalizado), en orden de aparición."""
+        goto, fail, out = self._goto, self._fail, self._out
+        n = len(text)
+        hits: List[str] = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for term in out[state]:
+                start = i - term.length + 1
+                if term.whole_start and start > 0 and text[start - 1] != " ":
+                    continue
+                if term.whole_end and i + 1 < n and text[i + 1] != " ":
+                    continue
+                hits.append(term.text)
+                if first_only:
+                    return hits
+        return hits
+
+
+class ContentFilter:
+    def __init__(self, path: str = CONTENT_FILTER_TERMS_PATH, reload_seconds: float = CONTENT_FILTER_RELOAD_SECONDS):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self._lock = threading.Lock()
+        self._automaton = Automaton(())
+        self._mtime: Optional[float] = None
+        self._checked = float("-inf")
+
+    def load_terms(self, terms: Iterable[str]) -> None:
+        """Reemplaza la lista de términos (se compila antes del swap; las lecturas no se bloquean)."""
+        self._automaton = Automaton(terms)
+
+    def reload(self) -> None:
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            if self._mtime is not None:
+                logger.warning("No se encontró la lista de términos prohibidos: %s", self.path)
+            self._mtime = None
+            return
+        if mtime == self._mtime:
+            return
+        with open(self.path, encoding="utf-8") as f:
+            terms = [line for line in f if line.strip() and not line.lstrip().startswith("#")]
+        self.load_terms(terms)
+        self._mtime = mtime
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now - self._checked < self.reload_seconds:
+            return
+        if not self._lock.acquire(blocking=False):
+            return  # otro thread ya está recargando; se usa el autómata actual
+        try:
+            self._checked = now
+            self.reload()
+        except Exception:
+            logger.exception("No se pudo recargar la lista de términos prohibidos")
+        finally:
+            self._lock.release()
+
+    def find(self, text: Optional[str]) -> List[str]:
+        if not text:
+            return []
+        self._maybe_reload()
+        return self._automaton.find(normalize(text))
+
+    def is_clean(self, text: Optional[str]) -> bool:
+        if not text:
+            return True
+        self._maybe_reload()
+        return not self._automaton.find(normalize(text), first_only=True)
+
+    def ensure_clean(self, text: Optional[str], field: str) -> None:
+        """400 si `text` tiene algún término prohibido (no dice cuál)."""
+        if not self.is_clean(text):
+            bad_request(f"{field} contiene términos no permitidos")
+
+
+content_filter = ContentFilter()
@@ -0,0 +1,28 @@
+# app/utils/cursor.py
+import base64
+import hashlib
+import json
+from typing import Any, Dict
+
+from app.utils.exceptions import bad_request
+
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        bad_request("Cursor inválido")
+    if not isinstance(payload, dict):
+        bad_request("Cursor inválido")
+    return payload
+
+
+def filter_hash(*parts: Any) -> str:
+    """Huella corta de los filtros con los que se generó un cursor."""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:12]
@@ -29,3 +29,10 @@ def conflict(detail: str = "Conflict"):
         status_code=status.HTTP_409_CONFLICT,
         detail=detail
     )
+
+def service_unavailable(detail: str = "Service unavailable", retry_after: int = 1):
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=detail,
+        headers={"Retry-After": str(retry_after)},
+    )
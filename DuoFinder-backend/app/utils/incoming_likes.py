@@ -0,0 +1,106 @@
+# app/utils/incoming_likes.py
+"""
+Cola de "likes recibidos" por usuario, con desalojo LRU y TTL.
+
+Para /matches/incoming: usuarios que me dieron like y a los que todavía no les hice
+swipe. Se reconstruye desde el ledger dbo.Swipes la primera vez que se necesita
+(IX_Swipes_Target) y los swipes la mantienen al día; los que atiende otro worker
+se ven cuando vence el TTL.
+Cada entrada guarda el ID del swipe como secuencia: más alto = más reciente.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import INCOMING_LIKES_MAX_USERS, INCOMING_LIKES_TTL_SECONDS
+from app.models.swipes import Swipes
+
+
+def load_incoming(db: Session, user_id: int) -> Dict[int, int]:
+    """{liker_id: Swipes.ID} de los likes que user_id todavía no respondió."""
+    # último swipe de cada actor hacia mí
+    latest = db.query(
+        Swipes.ActorID,
+        Swipes.ID,
+        Swipes.Liked,
+        func.row_number().over(partition_by=Swipes.ActorID, order_by=Swipes.ID.desc()).label("rn"),
+    ).filter(Swipes.TargetID == user_id).subquery()
+    answered = db.query(Swipes.TargetID).filter(Swipes.ActorID == user_id)
+    rows = db.query(latest.c.ActorID, latest.c.ID).filter(
+        latest.c.rn == 1,
+        latest.c.Liked == True,
+        latest.c.ActorID.notin_(answered),
+    ).all()
+    return {liker: seq for liker, seq in rows}
+
+
+class IncomingLikes:
+    def __init__(self, max_users: int = INCOMING_LIKES_MAX_USERS, ttl: float = INCOMING_LIKES_TTL_SECONDS):
+        self._lock = threading.Lock()
+        self._max_users = max_users
+        self._ttl = ttl
+        self._queues: "OrderedDict[int, Tuple[float, Dict[int, int]]]" = OrderedDict()
+
+    def _queue(self, db: Session, user_id: int) -> Dict[int, int]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._queues.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._queues.move_to_end(user_id)
+                return entry[1]
+
+        queue = load_incoming(db, user_id)
+
+        with self._lock:
+            # si otro request la recargó mientras tanto, nos quedamos con esa
+            entry = self._queues.get(user_id)
+            if entry is None or entry[0] <= now:
+                entry = self._queues[user_id] = (now + self._ttl, queue)
+            self._queues.move_to_end(user_id)
+            while len(self._queues) > self._max_users:
+                self._queues.popitem(last=False)
+            return entry[1]
+
+    def likers(self, db: Session, user_id: int) -> frozenset:
+        queue = self._queue(db, user_id)
+        with self._lock:
+            return frozenset(queue)
+
+    def page(
+        self, db: Session, user_id: int, before: Optional[int], n: int
+    ) -> Tuple[List[Tuple[int, int]], bool]:
+        """
+        Hasta n (seq, liker_id) del más reciente al más viejo, con seq < before.
+        Devuelve (ítems, hay_más).
+        """
+        queue = self._queue(db, user_id)
+        with self._lock:
+            items = sorted(
+                ((seq, liker) for liker, seq in queue.items() if before is None or seq < before),
+                reverse=True,
+            )
+        return items[:n], len(items) > n
+
+    def push(self, user_id: int, liker_id: int, seq: int) -> None:
+        # si no está en caché no hace falta: se reconstruye desde la DB al pedirla
+        with self._lock:
+            entry = self._queues.get(user_id)
+            if entry is not None:
+                entry[1][liker_id] = seq
+
+    def discard(self, user_id: int, liker_id: int) -> None:
+        with self._lock:
+            entry = self._queues.get(user_id)
+            if entry is not None:
+                entry[1].pop(liker_id, None)
+
+    def forget(self, user_id: int) -> None:
+        with self._lock:
+            self._queues.pop(user_id, None)
+
+
+incoming_likes = IncomingLikes()
@@ -0,0 +1,80 @@
+# app/utils/match_cache.py
+"""
+Caché LRU con TTL de match_id -> (UserID1, UserID2, like mutuo).
+
+Los endpoints de /chats solo necesitan saber quiénes son los dos usuarios del
+match; cargar la fila de Matches trae además user1/user2 (joined) y todos los
+mensajes (selectin). Los miembros de un match no cambian nunca, solo el like
+mutuo: swipe_user invalida la entrada y el TTL acota lo que puede tardar en
+verse un cambio hecho por otro worker.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import MATCH_CACHE_MAX, MATCH_CACHE_TTL_SECONDS
+from app.models.matches import Matches
+
+
+@dataclass(frozen=True)
+class MatchMembership:
+    """Mismos nombres que el modelo Matches para lo que usan record_message / mark_read."""
+    ID: int
+    UserID1: int
+    UserID2: int
+    IsMutual: bool
+
+    def has(self, user_id: int) -> bool:
+        return user_id == self.UserID1 or user_id == self.UserID2
+
+    def partner_of(self, user_id: int) -> int:
+        return self.UserID2 if user_id == self.UserID1 else self.UserID1
+
+
+def load_membership(db: Session, match_id: int) -> Optional[MatchMembership]:
+    row = (
+        db.query(Matches.ID, Matches.UserID1, Matches.UserID2, Matches.LikedByUser1, Matches.LikedByUser2)
+        .filter(Matches.ID == match_id)
+        .first()
+    )
+    if row is None:
+        return None
+    return MatchMembership(row.ID, row.UserID1, row.UserID2, bool(row.LikedByUser1 and row.LikedByUser2))
+
+
+class MatchCache:
+    def __init__(self, max_size: int = MATCH_CACHE_MAX, ttl: float = MATCH_CACHE_TTL_SECONDS):
+        self._lock = threading.Lock()
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: "OrderedDict[int, Tuple[float, MatchMembership]]" = OrderedDict()
+
+    def get(self, db: Session, match_id: int) -> Optional[MatchMembership]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(match_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(match_id)
+                return entry[1]
+
+        membership = load_membership(db, match_id)
+        if membership is None:
+            return None  # los inexistentes no se cachean: el match puede crearse en cualquier momento
+
+        with self._lock:
+            self._entries[match_id] = (now + self._ttl, membership)
+            self._entries.move_to_end(match_id)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+        return membership
+
+    def invalidate(self, match_id: int) -> None:
+        with self._lock:
+            self._entries.pop(match_id, None)
+
+
+match_cache = MatchCache()
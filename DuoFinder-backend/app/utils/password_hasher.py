@@ -0,0 +1,82 @@
+# app/utils/password_hasher.py
+"""
+Pool acotado para bcrypt (registro, login y cambio de contraseña).
+
+Un hash con costo 12 tarda cientos de ms de CPU; hecho inline ocupa un thread
+del threadpool de FastAPI y una ráfaga de logins deja sin threads al resto de
+los endpoints sync. Acá el trabajo va a PASSWORD_HASH_WORKERS threads propios
+(bcrypt suelta el GIL mientras calcula, no hace falta un pool de procesos) y
+como mucho PASSWORD_HASH_MAX_PENDING pedidos esperan en cola: el siguiente
+recibe 503 con Retry-After en vez de encolarse sin límite.
+
+El costo sale de BCRYPT_ROUNDS. Los hashes con otro costo se rehacen en el
+próximo login correcto (verify_and_update), así subir o bajar el costo no
+requiere migrar nada.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.config import BCRYPT_ROUNDS, PASSWORD_HASH_MAX_PENDING, PASSWORD_HASH_WORKERS
+from app.utils.exceptions import service_unavailable
+
+
+def make_context(rounds: int = BCRYPT_ROUNDS) -> CryptContext:
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+class PasswordHasher:
+    def __init__(
+        self,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_pending: int = PASSWORD_HASH_MAX_PENDING,
+        rounds: int = BCRYPT_ROUNDS,
+    ):
+        self.context = make_context(rounds)
+        self.workers = max(1, workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwd-hash")
+        # en ejecución + en cola; sin lugar se rechaza enseguida
+        self._slots = threading.BoundedSemaphore(self.workers + max(0, max_pending))
+
+    # -------------------- Sync (endpoints def) --------------------
+    def hash(self, password: str) -> str:
+        return self._submit(self.context.hash, password).result()
+
+    def verify_and_update(self, password: str, hashed: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """(ok, hash nuevo si hay que reemplazar el guardado por tener otro costo)."""
+        if not hashed:
+            return False, None
+        return self._submit(self._verify_and_update, password, hashed).result()
+
+    # -------------------- Async (no ocupan threads del request) --------------------
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(self.context.hash, password))
+
+    async def verify_and_update_async(self, password: str, hashed: Optional[str]) -> Tuple[bool, Optional[str]]:
+        if not hashed:
+            return False, None
+        return await asyncio.wrap_future(self._submit(self._verify_and_update, password, hashed))
+
+    # -------------------- Internos --------------------
+    def _verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        try:
+            return self.context.verify_and_update(password, hashed)
+        except ValueError:
+            return False, None  # hash guardado con formato inválido
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            service_unavailable("Servidor ocupado, reintentá en unos segundos", retry_after=1)
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,77 @@
+# app/utils/principal_cache.py
+"""
+Caché LRU con TTL de usuarios autenticados, por `sub` del JWT (el Mail).
+
+get_current_user devuelve un Principal inmutable en vez de la fila ORM de User.
+Con los tokens que llevan uid/ep (ver app/utils/token_epochs.py) ni siquiera hace
+falta esta caché; queda para los tokens emitidos antes, hasta que expiren. Los endpoints que
+modifican al usuario (update_profile, delete_my_account) invalidan su entrada;
+el TTL acota lo que tarda otro worker en ver el cambio.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import PRINCIPAL_CACHE_MAX, PRINCIPAL_CACHE_TTL_SECONDS
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    ID: int
+    Mail: str
+    IsActive: bool
+
+
+def load_principal(db: Session, subject: str) -> Optional[Principal]:
+    row = (
+        db.query(User.ID, User.Mail, User.IsActive)
+        .filter(User.Mail == subject)
+        .first()
+    )
+    if row is None:
+        return None
+    return Principal(row.ID, row.Mail, bool(row.IsActive))
+
+
+class PrincipalCache:
+    def __init__(self, max_size: int = PRINCIPAL_CACHE_MAX, ttl: float = PRINCIPAL_CACHE_TTL_SECONDS):
+        self._lock = threading.Lock()
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        self._subjects: Dict[int, str] = {}  # User.ID -> sub, para invalidar por usuario
+
+    def get(self, db: Session, subject: str) -> Optional[Principal]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(subject)
+                return entry[1]
+
+        principal = load_principal(db, subject)
+        if principal is None:
+            return None
+
+        with self._lock:
+            self._entries[subject] = (now + self._ttl, principal)
+            self._entries.move_to_end(subject)
+            self._subjects[principal.ID] = subject
+            while len(self._entries) > self._max_size:
+                _, (_, old) = self._entries.popitem(last=False)
+                self._subjects.pop(old.ID, None)
+        return principal
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            subject = self._subjects.pop(user_id, None)
+            if subject is not None:
+                self._entries.pop(subject, None)
+
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,345 @@
+# app/utils/pubsub.py
+"""
+Hub pub/sub en proceso para el chat en tiempo real (/chats/ws).
+
+Los endpoints publican con hub.publish(canal, payload) (sync, desde el
+threadpool) o con `await hub.publish_async(canal, payload)` (endpoints async:
+send_message, mark_chat_read); cada WebSocket se suscribe con hub.subscribe(canal)
+y consume una asyncio.Queue en su propio event loop. Nada de lo que se llama
+desde el event loop bloquea: con el broker, el envío por socket va a un thread
+y la conexión inicial se hace en segundo plano.
+
+Backends (PUBSUB_BACKEND):
+  - "memory": un solo worker, entrega directa dentro del proceso.
+  - "broker": varios workers. Cada publish va a un broker TCP local que lo
+    reenvía a los workers suscriptos a ese canal, y cada uno lo entrega a sus
+    suscriptores. Si el broker se cae, cada worker reconecta con backoff y
+    vuelve a mandar sus canales activos. El broker se levanta aparte con:
+        python -m app.utils.pubsub --host 127.0.0.1 --port 8765
+"""
+import argparse
+import asyncio
+import json
+import logging
+import socket
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+from app.config import (
+    PUBSUB_BACKEND,
+    PUBSUB_BROKER_HOST,
+    PUBSUB_BROKER_PORT,
+    PUBSUB_QUEUE_SIZE,
+    PUBSUB_RECONNECT_MAX_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+Payload = Dict[str, Any]
+Deliver = Callable[[str, Payload], None]
+
+
+class Subscription:
+    """Cola de un suscriptor, atada al event loop donde se creó."""
+
+    def __init__(self, channel: str, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.channel = channel
+        self._loop = loop
+        self._queue: "asyncio.Queue[Payload]" = asyncio.Queue(maxsize=maxsize)
+
+    def _deliver(self, payload: Payload) -> None:
+        # se llama desde cualquier thread
+        try:
+            self._loop.call_soon_threadsafe(self._put, payload)
+        except RuntimeError:
+            pass  # el loop ya cerró
+
+    def _put(self, payload: Payload) -> None:
+        try:
+            self._queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            pass  # cliente lento: se descarta, puede re-sincronizar con GET /chats/{match_id}
+
+    async def get(self) -> Payload:
+        return await self._queue.get()
+
+
+class MemoryBackend:
+    def __init__(self, deliver: Deliver):
+        self._deliver = deliver
+
+    blocking = False
+
+    def publish(self, channel: str, payload: Payload) -> None:
+        self._deliver(channel, payload)
+
+
+class BrokerBackend:
+    """
+    Cliente del broker local: una conexión TCP por worker con líneas JSON.
+    Hacia el broker van {"sub": [canales]}, {"unsub": [canales]} y
+    {"ch": canal, "p": payload}; el broker devuelve solo los {"ch", "p"} de los
+    canales suscriptos (incluido lo publicado por este mismo worker).
+
+    Un thread mantiene la conexión: conecta con backoff, manda los canales
+    activos y lee hasta que se corta; entonces vuelve a empezar. publish() y
+    send_interest() usan sockets bloqueantes: desde el event loop, en un thread.
+    """
+
+    blocking = True
+    RECONNECT_MIN_SECONDS = 0.5
+    PUBLISH_WAIT_SECONDS = 2.0  # cuánto espera un publish a que haya conexión
+
+    def __init__(self, deliver: Deliver, host: str, port: int):
+        self._deliver = deliver
+        self._addr = (host, port)
+        self._lock = threading.Lock()  # socket actual y escrituras
+        self._sock: Optional[socket.socket] = None
+        self._connected = threading.Event()
+        self._channels_lock = threading.Lock()  # nunca se toma escribiendo: no bloquea el event loop
+        self._channels: Set[str] = set()
+        self._runner: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+
+    def start(self) -> None:
+        """Arranca (una sola vez) el thread de conexión; no bloquea."""
+        with self._channels_lock:
+            if self._runner is None:
+                self._runner = threading.Thread(target=self._run, name="pubsub-broker", daemon=True)
+                self._runner.start()
+
+    def close(self) -> None:
+        """Corta la conexión y frena los reintentos."""
+        self._closed.set()
+        with self._lock:
+            sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)  # destraba al thread de lectura
+            except OSError:
+                pass
+
+    def watch(self, channel: str, active: bool) -> None:
+        """Marca el canal como activo o no; el aviso al broker va por send_interest()."""
+        with self._channels_lock:
+            if active:
+                self._channels.add(channel)
+            else:
+                self._channels.discard(channel)
+
+    def send_interest(self, channel: str) -> None:
+        """
+        Avisa al broker el estado del canal al momento del envío, así un sub y
+        un unsub que se ejecutan en otro orden igual terminan en el estado final.
+        Sin conexión no hace nada: al reconectar se mandan todos los canales.
+        """
+        self.start()
+        with self._lock:
+            if self._sock is None:
+                return
+            with self._channels_lock:
+                key = "sub" if channel in self._channels else "unsub"
+            try:
+                self._sock.sendall(_encode({key: [channel]}))
+            except OSError:
+                pass  # el thread de lectura ve el corte y reconecta
+
+    def _run(self) -> None:
+        delay = self.RECONNECT_MIN_SECONDS
+        while not self._closed.is_set():
+            sock = None
+            try:
+                sock = socket.create_connection(self._addr, timeout=5)
+                sock.settimeout(None)
+                with self._lock:
+                    with self._channels_lock:
+                        channels = sorted(self._channels)
+                    if channels:
+                        sock.sendall(_encode({"sub": channels}))
+                    self._sock = sock
+                    self._connected.set()
+            except OSError as e:
+                if sock is not None:
+                    sock.close()
+                logger.warning("No se pudo conectar al broker pub/sub (reintento en %.1f s): %s", delay, e)
+                self._closed.wait(delay)
+                delay = min(delay * 2, PUBSUB_RECONNECT_MAX_SECONDS)
+                continue
+            delay = self.RECONNECT_MIN_SECONDS
+            self._read_loop(sock)
+            if not self._closed.is_set():
+                logger.warning("Se cortó la conexión con el broker pub/sub; reconectando")
+                self._closed.wait(delay)
+
+    def _drop(self, sock: socket.socket) -> None:
+        with self._lock:
+            if self._sock is sock:
+                self._sock = None
+                self._connected.clear()
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+    def _read_loop(self, sock: socket.socket) -> None:
+        try:
+            for line in sock.makefile("rb"):
+                try:
+                    msg = json.loads(line)
+                    self._deliver(msg["ch"], msg["p"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+        except OSError:
+            pass
+        self._drop(sock)
+
+    def publish(self, channel: str, payload: Payload) -> None:
+        line = _encode({"ch": channel, "p": payload})
+        self.start()
+        last_error: Optional[OSError] = None
+        for _ in range(2):  # un reintento si la conexión se había caído
+            if not self._connected.wait(self.PUBLISH_WAIT_SECONDS):
+                break
+            with self._lock:
+                sock = self._sock
+                if sock is None:
+                    continue
+                try:
+                    sock.sendall(line)
+                    return
+                except OSError as e:
+                    last_error = e
+            self._drop(sock)  # el thread de conexión reconecta
+        logger.warning("No se pudo publicar en el broker pub/sub (canal %s): %s", channel, last_error or "sin conexión")
+
+
+def _encode(msg: Dict[str, Any]) -> bytes:
+    return (json.dumps(msg, default=str) + "\n").encode()
+
+
+class PubSubHub:
+    def __init__(self, backend: str = PUBSUB_BACKEND, queue_size: int = PUBSUB_QUEUE_SIZE):
+        self._lock = threading.Lock()
+        self._queue_size = queue_size
+        self._subs: Dict[str, Set[Subscription]] = {}
+        if backend == "broker":
+            self._backend = BrokerBackend(self._deliver, PUBSUB_BROKER_HOST, PUBSUB_BROKER_PORT)
+        else:
+            self._backend = MemoryBackend(self._deliver)
+
+    def _deliver(self, channel: str, payload: Payload) -> None:
+        with self._lock:
+            subs = list(self._subs.get(channel, ()))
+        for sub in subs:
+            sub._deliver(payload)
+
+    def subscribe(self, channel: str) -> Subscription:
+        """Llamar desde el event loop del suscriptor (p. ej. un endpoint WebSocket)."""
+        sub = Subscription(channel, asyncio.get_running_loop(), self._queue_size)
+        with self._lock:
+            first = channel not in self._subs
+            self._subs.setdefault(channel, set()).add(sub)
+            if first:
+                self._watch(channel, True)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.channel)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.channel]
+                    self._watch(sub.channel, False)
+
+    def _watch(self, channel: str, active: bool) -> None:
+        # bajo self._lock: los cambios del set de canales quedan en el mismo orden que _subs
+        if not isinstance(self._backend, BrokerBackend):
+            return
+        self._backend.watch(channel, active)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            threading.Thread(target=self._backend.send_interest, args=(channel,), daemon=True).start()
+        else:
+            loop.run_in_executor(None, self._backend.send_interest, channel)
+
+    def publish(self, channel: str, payload: Payload) -> None:
+        self._backend.publish(channel, payload)
+
+    async def publish_async(self, channel: str, payload: Payload) -> None:
+        """publish() para endpoints async: con el broker, el envío va a un thread."""
+        if self._backend.blocking:
+            await asyncio.get_running_loop().run_in_executor(None, self._backend.publish, channel, payload)
+        else:
+            self._backend.publish(channel, payload)
+
+
+hub = PubSubHub()
+
+
+# -------------------- Broker local (multi-worker) --------------------
+async def run_broker(host: str, port: int) -> None:
+    """Reenvía cada publicación a los workers suscriptos a su canal."""
+    routes: Dict[str, Set[asyncio.StreamWriter]] = {}
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        channels: Set[str] = set()
+
+        def update(names: Iterable[str], add: bool) -> None:
+            for name in names:
+                if add:
+                    channels.add(name)
+                    routes.setdefault(name, set()).add(writer)
+                else:
+                    channels.discard(name)
+                    _discard_route(routes, name, writer)
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    msg = json.loads(line)
+                    if "ch" in msg:
+                        targets = list(routes.get(msg["ch"], ()))
+                    else:
+                        update(msg.get("sub", ()), True)
+                        update(msg.get("unsub", ()), False)
+                        continue
+                except (ValueError, TypeError, AttributeError):
+                    continue
+                for client in targets:
+                    try:
+                        client.write(line)
+                    except (ConnectionError, RuntimeError):
+                        pass  # su propio handler lo saca al cortarse
+        except ConnectionError:
+            pass
+        finally:
+            for name in channels:
+                _discard_route(routes, name, writer)
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info("Broker pub/sub escuchando en %s:%s", host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def _discard_route(routes: Dict[str, Set[asyncio.StreamWriter]], channel: str, writer: asyncio.StreamWriter) -> None:
+    writers = routes.get(channel)
+    if writers is not None:
+        writers.discard(writer)
+        if not writers:
+            del routes[channel]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Broker pub/sub local para varios workers.")
+    parser.add_argument("--host", default=PUBSUB_BROKER_HOST)
+    parser.add_argument("--port", type=int, default=PUBSUB_BROKER_PORT)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    asyncio.run(run_broker(args.host, args.port))
@@ -0,0 +1,137 @@
+# app/utils/scoring.py
+"""
+Puntaje de compatibilidad para ordenar sugerencias, vectorizado con NumPy.
+
+Cada fila es un par (candidato, juego compatible). Se puntúa la cercanía de rango
+(Game_ranks.Rank_order) y si ambos juegan en el mismo modo (ranked / no ranked);
+por candidato se toma su mejor juego y se suman la cantidad de juegos compatibles,
+mismo server y cercanía de edad (la ventana AgeMin/AgeMax ya se filtró antes,
+en CandidateIndex.find_candidates). Los que ya me dieron like van siempre primero.
+"""
+from dataclasses import dataclass
+from typing import Collection, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.utils.candidate_index import CandidateIndex, CandidateProfile
+
+W_RANK = 4.0      # cercanía de Rank_order en el mejor juego
+W_RANKED = 1.0    # mismo modo (ranked / no ranked)
+W_SHARED = 1.5    # por cada juego compatible adicional
+W_SERVER = 2.0    # mismo server
+W_AGE = 1.0       # cercanía de edad
+RANK_SPAN = 10    # distancia de Rank_order a partir de la cual la cercanía vale 0
+AGE_SPAN = 10     # diferencia de edad (años) a partir de la cual la cercanía vale 0
+W_LIKED_ME = 100.0  # ya me dio like: por encima de cualquier combinación de lo anterior
+
+
+@dataclass
+class ScoredCandidates:
+    user_ids: np.ndarray   # int64
+    game_ids: np.ndarray   # int64, mejor juego de cada candidato
+    scores: np.ndarray     # float64, redondeado para que el cursor sea estable
+
+
+def score_candidates(
+    index: CandidateIndex,
+    candidates: Dict[int, List[int]],
+    my_skills: Dict[int, Tuple[bool, Optional[int]]],
+    me: Optional[CandidateProfile],
+    liked_me: Collection[int] = (),
+) -> ScoredCandidates:
+    """
+    candidates: {UserID: [GameId compatibles]} (salida de CandidateIndex.find_candidates)
+    my_skills:  {GameId: (IsRanked, Rank_order)} del usuario que pide sugerencias
+    liked_me:   UserIDs que ya me dieron like y todavía no respondí
+    """
+    n_users = len(candidates)
+    if n_users == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return ScoredCandidates(empty, empty.copy(), np.empty(0, dtype=np.float64))
+
+    uids = np.fromiter(candidates.keys(), dtype=np.int64, count=n_users)
+    counts = np.fromiter((len(g) for g in candidates.values()), dtype=np.int64, count=n_users)
+    n_rows = int(counts.sum())
+
+    # ---- features por fila (candidato, juego) ----
+    row_user = np.repeat(np.arange(n_users), counts)
+    row_game_list = [g for games in candidates.values() for g in games]
+    row_game = np.fromiter(row_game_list, dtype=np.int64, count=n_rows)
+    skills = [index.skill(uid, g) for uid, games in candidates.items() for g in games]
+    c_ranked = np.fromiter((bool(s and s.is_ranked) for s in skills), dtype=bool, count=n_rows)
+    c_order = np.fromiter(
+        (s.rank_order if s and s.rank_order is not None else np.nan for s in skills),
+        dtype=np.float64, count=n_rows,
+    )
+    my_ranked = {g: bool(r) for g, (r, _) in my_skills.items()}
+    my_order = {g: (np.nan if o is None else o) for g, (_, o) in my_skills.items()}
+    m_ranked = np.fromiter((my_ranked.get(g, False) for g in row_game_list), dtype=bool, count=n_rows)
+    m_order = np.fromiter((my_order.get(g, np.nan) for g in row_game_list), dtype=np.float64, count=n_rows)
+
+    both_ranked = c_ranked & m_ranked & ~np.isnan(c_order) & ~np.isnan(m_order)
+    distance = np.abs(np.where(both_ranked, c_order - m_order, 0.0))
+    closeness = np.where(both_ranked, 1.0 - np.clip(distance / RANK_SPAN, 0.0, 1.0), 0.5)
+    row_score = W_RANK * closeness + W_RANKED * (c_ranked == m_ranked)
+
+    # ---- mejor juego por candidato (las filas de cada candidato son contiguas) ----
+    order = np.lexsort((-row_score, row_user))
+    first = np.ones(n_rows, dtype=bool)
+    first[1:] = row_user[order][1:] != row_user[order][:-1]
+    best_rows = order[first]  # una por candidato, en orden de row_user
+
+    # ---- features por candidato ----
+    profiles = [index.profile(int(uid)) for uid in uids]
+    my_server = me.server if me else None
+    same_server = np.fromiter(
+        (my_server is not None and p is not None and p.server == my_server for p in profiles),
+        dtype=bool, count=n_users,
+    )
+    birth = np.fromiter(
+        (p.birthdate.toordinal() if p and p.birthdate else 0 for p in profiles),
+        dtype=np.int64, count=n_users,
+    )
+    my_birth = me.birthdate.toordinal() if me and me.birthdate else 0
+    known = (birth > 0) & (my_birth > 0)
+    gap_years = np.abs(birth - my_birth) / 365.25
+    age_closeness = np.where(known, 1.0 - np.clip(gap_years / AGE_SPAN, 0.0, 1.0), 0.5)
+    if liked_me:
+        liked = np.isin(uids, np.fromiter(liked_me, dtype=np.int64, count=len(liked_me)))
+    else:
+        liked = np.zeros(n_users, dtype=bool)
+
+    scores = (
+        row_score[best_rows]
+        + W_SHARED * (counts - 1)
+        + W_SERVER * same_server
+        + W_AGE * age_closeness
+        + W_LIKED_ME * liked
+    )
+    return ScoredCandidates(
+        user_ids=uids,
+        game_ids=row_game[best_rows],
+        scores=np.round(scores, 6),
+    )
+
+
+def top_k(
+    scored: ScoredCandidates, k: int, after: Optional[Tuple[float, int]] = None
+) -> np.ndarray:
+    """
+    Posiciones de los k mejores en orden (score desc, UserID asc), empezando
+    después de `after` = (score, UserID) del último ítem ya entregado.
+    """
+    scores, uids = scored.scores, scored.user_ids
+    if after is not None:
+        last_score, last_uid = after
+        pos = np.flatnonzero((scores < last_score) | ((scores == last_score) & (uids > last_uid)))
+    else:
+        pos = np.arange(scores.size)
+
+    if pos.size > k:
+        sub = scores[pos]
+        kth = np.argpartition(-sub, k - 1)[:k]
+        # incluir empates con el k-ésimo para que el desempate por UserID sea exacto
+        pos = pos[sub >= sub[kth].min()]
+
+    ranked = pos[np.lexsort((uids[pos], -scores[pos]))]
+    return ranked[:k]
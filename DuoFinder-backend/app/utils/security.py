@@ -3,7 +3,7 @@ from datetime import datetime, timedelta
 from os import getenv
 from dotenv import load_dotenv
 from jose import jwt
-from passlib.context import CryptContext
+from app.utils.password_hasher import password_hasher
 
 load_dotenv()
 
@@ -11,13 +11,12 @@ SECRET_KEY = getenv("SECRET_KEY", "dev-inseguro")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
 
-_pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
+# bcrypt corre en el pool acotado de password_hasher (503 si está saturado)
 def hash_password(password: str) -> str:
-    return _pwd.hash(password)
+    return password_hasher.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return _pwd.verify(plain_password, hashed_password)
+    return password_hasher.verify_and_update(plain_password, hashed_password)[0]
 
 def create_access_token(data: dict, minutes: int | None = None) -> str:
     to_encode = data.copy()
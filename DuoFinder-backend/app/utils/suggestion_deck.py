@@ -0,0 +1,168 @@
+# app/utils/suggestion_deck.py
+"""
+Mazo precalculado de sugerencias por usuario.
+
+Cada mazo guarda los próximos candidatos ya rankeados para una combinación de
+filtros (fhash) a partir de un cursor. /matches/suggestions consume del frente
+y, cuando quedan menos de SUGGESTION_DECK_LOW_WATER, un worker en segundo plano
+calcula la tanda siguiente a partir del cursor de la cola.
+
+Los likes recibidos mientras tanto se insertan al frente como entradas fijadas
+(pinned): se entregan primero y no mueven el cursor. Como el cursor no las
+saltea, el mazo recuerda las ya entregadas para que un refill no las repita.
+"""
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Container, Deque, List, Optional, Set, Tuple
+
+from app.config import (
+    SUGGESTION_DECK_LOW_WATER,
+    SUGGESTION_DECK_MAX_USERS,
+    SUGGESTION_DECK_SIZE,
+    SUGGESTION_DECK_WORKERS,
+)
+
+logger = logging.getLogger(__name__)
+
+Cursor = Optional[Tuple[float, int]]  # (score, UserID) del último ítem entregado
+
+
+@dataclass(frozen=True)
+class DeckEntry:
+    user_id: int
+    game_id: int
+    score: float
+    pinned: bool = False  # insertada al frente (like recibido), fuera del orden por score
+
+    @property
+    def cursor(self) -> Tuple[float, int]:
+        return (self.score, self.user_id)
+
+
+@dataclass
+class _Deck:
+    fhash: str
+    head: Cursor                      # cursor justo antes del primer ítem
+    tail: Cursor                      # cursor del último ítem calculado
+    items: Deque[DeckEntry] = field(default_factory=deque)
+    exhausted: bool = False           # el último cálculo trajo menos de lo pedido
+    refilling: bool = False
+    generation: int = 0
+    served_pinned: Set[int] = field(default_factory=set)  # fijadas ya entregadas
+
+
+# compute(after, k) -> (entries, exhausted)
+Compute = Callable[[Cursor, int], Tuple[List[DeckEntry], bool]]
+
+
+class SuggestionDecks:
+    def __init__(
+        self,
+        size: int = SUGGESTION_DECK_SIZE,
+        low_water: int = SUGGESTION_DECK_LOW_WATER,
+        max_users: int = SUGGESTION_DECK_MAX_USERS,
+        workers: int = SUGGESTION_DECK_WORKERS,
+    ):
+        self.size = size
+        self.low_water = low_water
+        self._max_users = max_users
+        self._lock = threading.Lock()
+        self._decks: "OrderedDict[int, _Deck]" = OrderedDict()
+        self._generation = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="deck-refill")
+
+    def take(
+        self, user_id: int, fhash: str, after: Cursor, n: int, skip: Container[int] = ()
+    ) -> Optional[Tuple[List[DeckEntry], Cursor, bool]]:
+        """
+        Saca hasta n ítems del mazo si está alineado con (fhash, after), salteando
+        los que estén en `skip` (p. ej. ya swipeados).
+        Devuelve (ítems, cursor_siguiente, hay_más) o None si hay que calcular en el momento.
+        """
+        with self._lock:
+            deck = self._decks.get(user_id)
+            if deck is None or deck.fhash != fhash or deck.head != after:
+                return None
+            if len(deck.items) < n and not deck.exhausted:
+                return None  # el refill no llegó a tiempo
+
+            out: List[DeckEntry] = []
+            while deck.items and len(out) < n:
+                entry = deck.items.popleft()
+                if entry.pinned:
+                    deck.served_pinned.add(entry.user_id)
+                else:
+                    deck.head = entry.cursor
+                if entry.user_id not in skip:
+                    out.append(entry)
+            self._decks.move_to_end(user_id)
+            return out, deck.head, bool(deck.items) or not deck.exhausted
+
+    def seed(
+        self, user_id: int, fhash: str, head: Cursor, entries: List[DeckEntry], exhausted: bool
+    ) -> None:
+        """Arma un mazo nuevo con lo que sobró de un cálculo sincrónico."""
+        with self._lock:
+            self._generation += 1
+            tail = entries[-1].cursor if entries else head
+            self._decks[user_id] = _Deck(
+                fhash=fhash, head=head, tail=tail, items=deque(entries),
+                exhausted=exhausted, generation=self._generation,
+            )
+            self._decks.move_to_end(user_id)
+            while len(self._decks) > self._max_users:
+                self._decks.popitem(last=False)
+
+    def maybe_refill(self, user_id: int, compute: Compute) -> None:
+        """Si el mazo bajó del mínimo, programa el cálculo de la tanda siguiente."""
+        with self._lock:
+            deck = self._decks.get(user_id)
+            if (
+                deck is None
+                or deck.exhausted
+                or deck.refilling
+                or len(deck.items) >= self.low_water
+            ):
+                return
+            deck.refilling = True
+            generation, tail = deck.generation, deck.tail
+        self._executor.submit(self._refill, user_id, generation, tail, compute)
+
+    def prepend(self, user_id: int, entry: DeckEntry) -> None:
+        """Pone `entry` al frente del mazo (si el usuario tiene uno armado)."""
+        with self._lock:
+            deck = self._decks.get(user_id)
+            if deck is None:
+                return
+            rest = [e for e in deck.items if e.user_id != entry.user_id]
+            deck.items = deque([entry, *rest])
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._decks.pop(user_id, None)
+
+    def _refill(self, user_id: int, generation: int, tail: Cursor, compute: Compute) -> None:
+        try:
+            entries, exhausted = compute(tail, self.size)
+        except Exception:
+            logger.exception("No se pudo recargar el mazo de sugerencias")
+            entries, exhausted = None, False
+
+        with self._lock:
+            deck = self._decks.get(user_id)
+            if deck is None or deck.generation != generation:
+                return  # invalidado o reemplazado mientras calculábamos
+            deck.refilling = False
+            if entries is None:
+                return
+            known = {e.user_id for e in deck.items} | deck.served_pinned
+            deck.items.extend(e for e in entries if e.user_id not in known)
+            if entries:
+                deck.tail = entries[-1].cursor
+            deck.exhausted = exhausted
+
+
+suggestion_decks = SuggestionDecks()
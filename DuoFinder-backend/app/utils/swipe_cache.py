@@ -0,0 +1,122 @@
+# app/utils/swipe_cache.py
+"""
+Set compacto de "ya swipeados" por usuario, con desalojo LRU y TTL.
+
+Reemplaza el NOT EXISTS correlacionado contra el historial de swipes en
+/matches/suggestions: se reconstruye desde el ledger dbo.Swipes la primera vez
+que se necesita y swipe_user lo mantiene al día. Los swipes que atiende otro
+worker no llegan a este caché: el TTL acota cuánto tarda en verlos.
+"""
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, Iterable, Tuple, Union
+
+from sqlalchemy.orm import Session
+
+from app.config import SWIPED_CACHE_MAX_USERS, SWIPED_CACHE_TTL_SECONDS
+from app.models.swipes import Swipes
+
+# Contenedores estilo roaring: los 16 bits altos eligen el contenedor y los 16 bajos
+# van en un array ordenado (pocos valores) o en un bitmap de 8 KB (muchos valores).
+_ARRAY_LIMIT = 4096
+_BITMAP_BYTES = 1 << 13
+
+Container = Union[array, bytearray]
+
+
+class CompactIdSet:
+    __slots__ = ("_containers", "_size")
+
+    def __init__(self, ids: Iterable[int] = ()):
+        self._containers: Dict[int, Container] = {}
+        self._size = 0
+        for x in sorted(set(ids)):
+            self.add(x)
+
+    def add(self, x: int) -> None:
+        high, low = x >> 16, x & 0xFFFF
+        c = self._containers.get(high)
+        if c is None:
+            self._containers[high] = array("H", [low])
+            self._size += 1
+            return
+        if isinstance(c, bytearray):
+            byte, bit = low >> 3, 1 << (low & 7)
+            if not c[byte] & bit:
+                c[byte] |= bit
+                self._size += 1
+            return
+        i = bisect_left(c, low)
+        if i < len(c) and c[i] == low:
+            return
+        c.insert(i, low)
+        self._size += 1
+        if len(c) > _ARRAY_LIMIT:
+            bitmap = bytearray(_BITMAP_BYTES)
+            for v in c:
+                bitmap[v >> 3] |= 1 << (v & 7)
+            self._containers[high] = bitmap
+
+    def __contains__(self, x: int) -> bool:
+        c = self._containers.get(x >> 16)
+        if c is None:
+            return False
+        low = x & 0xFFFF
+        if isinstance(c, bytearray):
+            return bool(c[low >> 3] & (1 << (low & 7)))
+        i = bisect_left(c, low)
+        return i < len(c) and c[i] == low
+
+    def __len__(self) -> int:
+        return self._size
+
+
+def load_swiped_ids(db: Session, user_id: int) -> CompactIdSet:
+    """Usuarios sobre los que user_id ya hizo swipe (like o dislike)."""
+    rows = db.query(Swipes.TargetID).filter(Swipes.ActorID == user_id).distinct().all()
+    return CompactIdSet(uid for (uid,) in rows)
+
+
+class SwipedCache:
+    def __init__(self, max_users: int = SWIPED_CACHE_MAX_USERS, ttl: float = SWIPED_CACHE_TTL_SECONDS):
+        self._lock = threading.Lock()
+        self._max_users = max_users
+        self._ttl = ttl
+        self._sets: "OrderedDict[int, Tuple[float, CompactIdSet]]" = OrderedDict()
+
+    def get(self, db: Session, user_id: int) -> CompactIdSet:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sets.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._sets.move_to_end(user_id)
+                return entry[1]
+
+        ids = load_swiped_ids(db, user_id)
+
+        with self._lock:
+            # si otro request lo recargó mientras tanto, nos quedamos con ese
+            entry = self._sets.get(user_id)
+            if entry is None or entry[0] <= now:
+                entry = self._sets[user_id] = (now + self._ttl, ids)
+            self._sets.move_to_end(user_id)
+            while len(self._sets) > self._max_users:
+                self._sets.popitem(last=False)
+            return entry[1]
+
+    def add(self, user_id: int, target_id: int) -> None:
+        # si no está en caché no hace falta: se reconstruye desde la DB al pedirlo
+        with self._lock:
+            entry = self._sets.get(user_id)
+            if entry is not None:
+                entry[1].add(target_id)
+
+    def forget(self, user_id: int) -> None:
+        with self._lock:
+            self._sets.pop(user_id, None)
+
+
+swiped_cache = SwipedCache()
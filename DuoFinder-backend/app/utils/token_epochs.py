@@ -0,0 +1,128 @@
+# app/utils/token_epochs.py
+"""
+Tabla en memoria de épocas de tokens (dbo.UserTokenEpoch).
+
+Los JWT llevan `uid` y `ep`; un token es válido mientras `ep` sea la época
+actual del usuario. Cambiar la contraseña o dar de baja la cuenta sube la
+época (bump) y revoca todos los tokens anteriores: en este worker al instante
+y en los demás en cuanto relean la tabla (cada TOKEN_EPOCH_REFRESH_SECONDS,
+solo las filas con UpdatedAt posterior a la última lectura).
+
+Hasta que la tabla se lee una vez no hay forma de saber qué está revocado: los
+tokens con época se rechazan con 503 (nunca se aceptan como época 0). La
+carga no espera el lock: corre en el event loop vía run_sync y esperar a otro
+request del mismo loop lo trabaría. main.py la hace al arrancar.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import TOKEN_EPOCH_REFRESH_SECONDS
+from app.models.user_token_epoch import UserTokenEpoch
+from app.utils.exceptions import service_unavailable
+
+logger = logging.getLogger(__name__)
+
+# margen al releer por UpdatedAt: commits fuera de orden y relojes un poco corridos
+_REFRESH_OVERLAP = timedelta(seconds=30)
+
+
+class TokenEpochs:
+    def __init__(self, refresh_seconds: float = TOKEN_EPOCH_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self._epochs: Dict[int, int] = {}
+        self._since: Optional[datetime] = None
+        self._checked = float("-inf")
+
+    @property
+    def loaded(self) -> bool:
+        return self._since is not None
+
+    def load(self, db: Session) -> bool:
+        """Primera lectura de la tabla (startup). True si quedó cargada."""
+        self._maybe_refresh(db)
+        return self.loaded
+
+    def current(self, db: Session, user_id: int) -> int:
+        self._maybe_refresh(db)
+        if not self.loaded:
+            service_unavailable("No se pudo validar la sesión, reintentá en unos segundos", retry_after=1)
+        return self._epochs.get(user_id, 0)
+
+    def load_exact(self, db: Session, user_id: int) -> int:
+        """Época leída de la DB (para emitir tokens en el login)."""
+        row = db.get(UserTokenEpoch, user_id)
+        epoch = row.Epoch if row is not None else 0
+        self.note(user_id, epoch)
+        return epoch
+
+    def bump(self, db: Session, user_id: int) -> int:
+        """
+        Sube la época del usuario en una sola sentencia (UPDATE ... OUTPUT), sin
+        leer y reescribir: dos bumps concurrentes dan dos épocas distintas.
+        No hace commit: llamar a note() después del commit.
+        """
+        epoch = self._increment(db, user_id)
+        if epoch is None:
+            try:
+                with db.begin_nested():
+                    db.add(UserTokenEpoch(UserID=user_id, Epoch=1, UpdatedAt=datetime.utcnow()))
+                return 1
+            except IntegrityError:
+                epoch = self._increment(db, user_id)  # otro request insertó la fila primero
+        return epoch
+
+    @staticmethod
+    def _increment(db: Session, user_id: int) -> Optional[int]:
+        return db.execute(
+            update(UserTokenEpoch)
+            .where(UserTokenEpoch.UserID == user_id)
+            .values(Epoch=UserTokenEpoch.Epoch + 1, UpdatedAt=datetime.utcnow())
+            .returning(UserTokenEpoch.Epoch)
+        ).scalar()
+
+    def note(self, user_id: int, epoch: int) -> None:
+        with self._lock:
+            if epoch > self._epochs.get(user_id, 0):
+                self._epochs[user_id] = epoch
+
+    def _maybe_refresh(self, db: Session) -> None:
+        now = time.monotonic()
+        if now - self._checked < self.refresh_seconds:
+            return
+        # sin esperar: si otro ya está releyendo se usa la tabla conocida (o 503 si nunca cargó)
+        if not self._refreshing.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() - self._checked < self.refresh_seconds:
+                return  # la terminó otro thread entre el chequeo y el lock
+            q = db.query(UserTokenEpoch.UserID, UserTokenEpoch.Epoch, UserTokenEpoch.UpdatedAt)
+            if self._since is not None:
+                q = q.filter(UserTokenEpoch.UpdatedAt > self._since - _REFRESH_OVERLAP)
+            rows = q.all()
+            with self._lock:
+                for user_id, epoch, _ in rows:
+                    if epoch > self._epochs.get(user_id, 0):
+                        self._epochs[user_id] = epoch
+            if rows:
+                newest = max(updated for _, _, updated in rows)
+                self._since = max(self._since, newest) if self._since else newest
+            elif self._since is None:
+                self._since = datetime.utcnow()
+            self._checked = now
+        except Exception as e:
+            # sin DB se siguen validando con la última tabla conocida (si hubo una)
+            logger.warning("No se pudo releer las épocas de tokens: %s", e)
+        finally:
+            self._refreshing.release()
+
+
+token_epochs = TokenEpochs()
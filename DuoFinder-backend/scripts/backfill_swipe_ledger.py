@@ -0,0 +1,92 @@
+"""
+Migración única: pasa los swipes que hoy viven en dbo.Matches al ledger dbo.Swipes
+y deja en Matches solo las parejas con like mutuo (o con chat asociado).
+
+Requiere haber corrido Scripts/migrations/002_swipes_ledger.sql.
+Es idempotente: no duplica swipes ya migrados y se puede cortar y volver a correr.
+
+Uso (desde DuoFinder-backend/):
+    python -m scripts.backfill_swipe_ledger --dry-run
+    python -m scripts.backfill_swipe_ledger --batch-size 5000
+"""
+import argparse
+
+from sqlalchemy import text
+
+from app.db.connection import engine
+
+_PENDING_SQL = """
+SELECT
+    (SELECT COUNT(*) FROM dbo.Matches m WHERE m.LikedByUser1 IS NOT NULL
+        AND NOT EXISTS (SELECT 1 FROM dbo.Swipes s WHERE s.ActorID = m.UserID1 AND s.TargetID = m.UserID2))
+  + (SELECT COUNT(*) FROM dbo.Matches m WHERE m.LikedByUser2 IS NOT NULL
+        AND NOT EXISTS (SELECT 1 FROM dbo.Swipes s WHERE s.ActorID = m.UserID2 AND s.TargetID = m.UserID1))
+    AS PendingSwipes,
+    (SELECT COUNT(*) FROM dbo.Matches m
+     WHERE NOT (ISNULL(m.LikedByUser1, 0) = 1 AND ISNULL(m.LikedByUser2, 0) = 1)
+       AND NOT EXISTS (SELECT 1 FROM dbo.Chat c WHERE c.MatchesID = m.ID))
+    AS PrunableMatches
+"""
+
+# MatchDate es la fecha del primer swipe de la pareja: es lo más cercano que hay
+_COPY_SQL = """
+INSERT INTO dbo.Swipes (ActorID, TargetID, Liked, CreatedDate)
+SELECT TOP (:batch) x.ActorID, x.TargetID, x.Liked, x.CreatedDate
+FROM (
+    SELECT m.UserID1 AS ActorID, m.UserID2 AS TargetID, m.LikedByUser1 AS Liked,
+           ISNULL(m.MatchDate, SYSUTCDATETIME()) AS CreatedDate
+    FROM dbo.Matches m
+    WHERE m.LikedByUser1 IS NOT NULL
+    UNION ALL
+    SELECT m.UserID2, m.UserID1, m.LikedByUser2, ISNULL(m.MatchDate, SYSUTCDATETIME())
+    FROM dbo.Matches m
+    WHERE m.LikedByUser2 IS NOT NULL
+) x
+WHERE NOT EXISTS (SELECT 1 FROM dbo.Swipes s WHERE s.ActorID = x.ActorID AND s.TargetID = x.TargetID)
+ORDER BY x.CreatedDate;
+"""
+
+_PRUNE_SQL = """
+DELETE TOP (:batch) m
+FROM dbo.Matches m
+WHERE NOT (ISNULL(m.LikedByUser1, 0) = 1 AND ISNULL(m.LikedByUser2, 0) = 1)
+  AND NOT EXISTS (SELECT 1 FROM dbo.Chat c WHERE c.MatchesID = m.ID)
+  AND (m.LikedByUser1 IS NULL OR EXISTS (
+        SELECT 1 FROM dbo.Swipes s WHERE s.ActorID = m.UserID1 AND s.TargetID = m.UserID2))
+  AND (m.LikedByUser2 IS NULL OR EXISTS (
+        SELECT 1 FROM dbo.Swipes s WHERE s.ActorID = m.UserID2 AND s.TargetID = m.UserID1));
+"""
+
+
+def _run_batches(sql: str, batch: int) -> int:
+    total = 0
+    while True:
+        # una transacción por lote para no inflar el log
+        with engine.begin() as conn:
+            n = conn.execute(text(sql), {"batch": batch}).rowcount
+        total += n
+        if n < batch:
+            return total
+        print(f"   … {total}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Migra los swipes de dbo.Matches al ledger dbo.Swipes.")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--dry-run", action="store_true", help="Solo muestra cuánto hay para migrar")
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        pending = conn.execute(text(_PENDING_SQL)).one()
+    print(f"🔎 Swipes por copiar: {pending.PendingSwipes} | filas de Matches a podar: {pending.PrunableMatches}")
+    if args.dry_run:
+        return
+
+    copied = _run_batches(_COPY_SQL, args.batch_size)
+    print(f"✅ Swipes copiados al ledger: {copied}")
+    pruned = _run_batches(_PRUNE_SQL, args.batch_size)
+    print(f"✅ Filas sin match borradas de Matches: {pruned}")
+
+
+if __name__ == "__main__":
+    main()
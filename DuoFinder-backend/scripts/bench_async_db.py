@@ -0,0 +1,134 @@
+"""
+Benchmark de la capa de DB: requests concurrentes por el camino sync
+(`def` + Session en el threadpool de Starlette, como get_db) contra el async
+(`async def` + AsyncSession, como get_async_db), con la misma query lenta.
+
+Con una query de `--delay-ms`, el camino sync queda topeado por los threads
+del threadpool (40 por defecto) aunque el pool de conexiones tenga más; el
+async solo por el pool de conexiones.
+
+Usa DATABASE_URL (o --url) y su equivalente async de app/db/async_connection.py.
+Localmente alcanza con sqlite (hace falta aiosqlite):
+    python -m scripts.bench_async_db --url sqlite:///bench.db
+    python -m scripts.bench_async_db --concurrency 50 200 --requests 2000 --delay-ms 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.db.async_connection import async_url
+from app.config import DATABASE_URL
+
+
+def _slow_query(backend: str, delay_ms: int):
+    if backend == "mssql":
+        return text(f"WAITFOR DELAY '00:00:{delay_ms / 1000:06.3f}'")
+    return text(f"SELECT sleep_ms({delay_ms})")  # función registrada al conectar (sqlite)
+
+
+def _sqlite_sleep(dbapi_conn, _):
+    dbapi_conn.create_function("sleep_ms", 1, lambda ms: time.sleep(ms / 1000) or 0)
+
+
+def _build_app(url: str, pool: int, delay_ms: int) -> FastAPI:
+    backend = make_url(url).get_backend_name()
+    # mismo tipo y tamaño de pool en los dos (aiosqlite usa NullPool por defecto)
+    engine = create_engine(url, poolclass=QueuePool, pool_size=pool, max_overflow=0)
+    aengine = create_async_engine(async_url(url), poolclass=AsyncAdaptedQueuePool, pool_size=pool, max_overflow=0)
+    if backend == "sqlite":
+        event.listen(engine, "connect", _sqlite_sleep)
+        event.listen(aengine.sync_engine, "connect", _sqlite_sleep)
+    SessionBench = sessionmaker(bind=engine, autoflush=False)
+    AsyncSessionBench = async_sessionmaker(bind=aengine, autoflush=False, expire_on_commit=False)
+    query = _slow_query(backend, delay_ms)
+
+    def get_db():
+        db = SessionBench()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSessionBench() as adb:
+            yield adb
+
+    app = FastAPI()
+
+    @app.get("/sync")
+    def sync_endpoint(db: Session = Depends(get_db)):
+        db.execute(query)
+        return {"ok": True}
+
+    @app.get("/async")
+    async def async_endpoint(adb: AsyncSession = Depends(get_async_db)):
+        await adb.execute(query)
+        return {"ok": True}
+
+    return app
+
+
+async def _run(app: FastAPI, path: str, concurrency: int, requests: int):
+    latencies = []
+    errors = 0
+    remaining = requests
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+
+        async def worker() -> None:
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                t0 = time.perf_counter()
+                r = await client.get(path)
+                if r.status_code != 200:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - t0)
+
+        await client.get(path)  # calentar el pool
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+    return elapsed, latencies, errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Throughput sync (threadpool) vs async de la capa de DB.")
+    parser.add_argument("--url", default=DATABASE_URL)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--requests", type=int, default=1000, help="Requests por corrida")
+    parser.add_argument("--delay-ms", type=int, default=20, help="Duración de la query simulada")
+    parser.add_argument("--pool", type=int, default=200, help="Conexiones por engine (iguales en ambos)")
+    args = parser.parse_args()
+    if not args.url:
+        parser.error("Falta --url o DATABASE_URL")
+
+    app = _build_app(args.url, args.pool, args.delay_ms)
+    print(f"{make_url(args.url).get_backend_name()} | query {args.delay_ms} ms | pool {args.pool} | {args.requests} requests")
+    print(f"{'camino':>6} {'conc':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errores':>8}")
+
+    async def run_all() -> None:
+        # un solo event loop: las conexiones del pool async quedan atadas al loop que las abrió
+        for concurrency in args.concurrency:
+            for path in ("/sync", "/async"):
+                elapsed, latencies, errors = await _run(app, path, concurrency, args.requests)
+                latencies.sort()
+                p50 = statistics.median(latencies) * 1000
+                p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+                print(f"{path[1:]:>6} {concurrency:>5} {len(latencies) / elapsed:>8.1f} {p50:>8.1f} {p95:>8.1f} {errors:>8}")
+
+    asyncio.run(run_all())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark del hash de contraseñas: logins/seg que aguanta el pool de
+password_hasher con cada costo de bcrypt, para elegir BCRYPT_ROUNDS y
+PASSWORD_HASH_WORKERS según la CPU del servidor.
+
+Cada "login" es un verify_and_update contra un hash guardado con el mismo
+costo (lo que hace POST /auth/login). Los clientes que no entran en el pool
+reciben 503 y se cuentan como rechazados.
+
+Uso (desde DuoFinder-backend/):
+    python -m scripts.bench_password_hash
+    python -m scripts.bench_password_hash --rounds 10 12 14 --workers 4 --clients 64 --logins 200
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from fastapi import HTTPException
+
+from app.config import PASSWORD_HASH_MAX_PENDING, PASSWORD_HASH_WORKERS
+from app.utils.password_hasher import PasswordHasher
+
+
+def _run(hasher: PasswordHasher, hashed: str, clients: int, logins: int):
+    latencies = []
+    rejected = 0
+    lock = threading.Lock()
+    remaining = [logins]
+
+    def client() -> None:
+        nonlocal rejected
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            t0 = time.perf_counter()
+            try:
+                ok, _ = hasher.verify_and_update("hunter22", hashed)
+                assert ok
+            except HTTPException:
+                with lock:
+                    rejected += 1
+                time.sleep(0.01)  # como un cliente que respeta Retry-After, pero corto
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - t0, latencies, rejected
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Logins/seg del pool de bcrypt por costo.")
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("--workers", type=int, default=PASSWORD_HASH_WORKERS)
+    parser.add_argument("--max-pending", type=int, default=PASSWORD_HASH_MAX_PENDING)
+    parser.add_argument("--clients", type=int, default=16, help="Requests de login simultáneos")
+    parser.add_argument("--logins", type=int, default=48, help="Logins correctos a medir por costo")
+    args = parser.parse_args()
+
+    print(f"workers={args.workers} max_pending={args.max_pending} clients={args.clients} logins={args.logins}")
+    print(f"{'costo':>5} {'hash ms':>8} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'503s':>6}")
+    for rounds in args.rounds:
+        hasher = PasswordHasher(workers=args.workers, max_pending=args.max_pending, rounds=rounds)
+        t0 = time.perf_counter()
+        hashed = hasher.hash("hunter22")
+        single = (time.perf_counter() - t0) * 1000
+
+        elapsed, latencies, rejected = _run(hasher, hashed, args.clients, args.logins)
+        latencies.sort()
+        p50 = statistics.median(latencies) * 1000
+        p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+        print(f"{rounds:>5} {single:>8.1f} {len(latencies) / elapsed:>9.1f} {p50:>8.1f} {p95:>8.1f} {rejected:>6}")
+
+
+if __name__ == "__main__":
+    main()
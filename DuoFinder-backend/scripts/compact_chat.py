@@ -0,0 +1,61 @@
+"""
+Compactación periódica del chat: mueve los mensajes con más de N días de dbo.Chat
+a segmentos comprimidos en dbo.ChatSegment (ver app/db/chat_archive.py), para que
+la tabla caliente y su índice (MatchesID, ID) sigan entrando en memoria.
+
+Requiere haber corrido Scripts/migrations/005_chat_segments.sql.
+Cada match se compacta en su propia transacción: se puede cortar y volver a correr.
+
+Uso (desde DuoFinder-backend/), p. ej. desde un cron diario:
+    python -m scripts.compact_chat --dry-run
+    python -m scripts.compact_chat --older-than-days 90 --segment-size 500
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from app.config import CHAT_COLD_AFTER_DAYS, CHAT_SEGMENT_SIZE
+from app.db.chat_archive import compact_match
+from app.db.connection import SessionLocal
+from app.models.chat import Chat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compacta los mensajes viejos del chat en segmentos.")
+    parser.add_argument("--older-than-days", type=int, default=CHAT_COLD_AFTER_DAYS)
+    parser.add_argument("--segment-size", type=int, default=CHAT_SEGMENT_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Solo muestra cuánto hay para compactar")
+    args = parser.parse_args()
+
+    cutoff = datetime.utcnow() - timedelta(days=args.older_than_days)
+    db = SessionLocal()
+    try:
+        pending = (
+            db.query(Chat.MatchesID, func.count(Chat.ID))
+            .filter(Chat.CreatedDate < cutoff)
+            .group_by(Chat.MatchesID)
+            .all()
+        )
+        print(f"🔎 Matches con mensajes anteriores a {cutoff:%Y-%m-%d}: {len(pending)} "
+              f"| mensajes: {sum(n for _, n in pending)}")
+        if args.dry_run:
+            return
+
+        total = 0
+        for i, (match_id, _) in enumerate(pending, 1):
+            try:
+                total += compact_match(db, match_id, cutoff, args.segment_size)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                print(f"⚠️ No se pudo compactar el match {match_id}:", e)
+            if i % 500 == 0:
+                print(f"   … {i} matches, {total} mensajes")
+        print(f"✅ Mensajes movidos a segmentos: {total}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
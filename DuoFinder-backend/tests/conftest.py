@@ -0,0 +1,78 @@
+"""
+Fixtures comunes: la API sobre un sqlite temporal (con el schema dbo adjuntado),
+sin SQL Server. Correr desde DuoFinder-backend/:
+
+    pip install pytest
+    python -m pytest -q tests
+
+Los endpoints de chat usan el engine async: hace falta aiosqlite (requirements.txt).
+"""
+import os
+import tempfile
+
+_TMP = tempfile.mkdtemp(prefix="duofinder-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP}/main.db"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["SECRET_KEY"] = "tests"
+os.environ["TOKEN_EPOCH_REFRESH_SECONDS"] = "3600"
+os.environ["CHAT_SEARCH_INDEX_PATH"] = f"{_TMP}/chat_search.idx"
+os.environ["BCRYPT_ROUNDS"] = "4"
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import app.models  # noqa: F401  (registra todos los modelos)
+from app.db import async_connection, connection
+from app.routers import auth, chat, community, games, match, user
+
+_DBO = f"{_TMP}/dbo.db"
+
+
+@event.listens_for(connection.engine, "connect")
+def _attach_dbo(dbapi_conn, _):
+    dbapi_conn.execute(f"ATTACH DATABASE '{_DBO}' AS dbo")
+
+
+@event.listens_for(async_connection.async_engine.sync_engine, "connect")
+def _attach_dbo_async(dbapi_conn, _):
+    cursor = dbapi_conn.cursor()
+    cursor.execute(f"ATTACH DATABASE '{_DBO}' AS dbo")
+    cursor.close()
+
+
+@pytest.fixture(scope="session")
+def db_schema():
+    connection.Base.metadata.create_all(connection.engine)
+    yield
+    connection.engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def api(db_schema) -> TestClient:
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/auth")
+    app.include_router(user.router, prefix="/users")
+    app.include_router(match.router, prefix="/matches")
+    app.include_router(chat.router, prefix="/chats")
+    app.include_router(community.router, prefix="/communities")
+    app.include_router(games.router, prefix="/api")
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def statements():
+    """Lista con cada sentencia SQL ejecutada (engine sync y async) mientras dura el test."""
+    seen = []
+
+    def record(conn, cursor, statement, *args):
+        seen.append(statement)
+
+    engines = (connection.engine, async_connection.async_engine.sync_engine)
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", record)
+    yield seen
+    for engine in engines:
+        event.remove(engine, "before_cursor_execute", record)
@@ -0,0 +1,51 @@
+"""
+Compactación del chat (app/db/chat_archive.py): los no leídos que pasan a
+segmentos quedan leídos y salen de los contadores del resumen del match.
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.db import chat_archive
+from app.db.connection import SessionLocal
+from app.models import Chat, ChatSegment, Matches, MatchThreadSummary, User
+
+ME, PARTNER, MATCH = 6001, 6002, 6100
+OLD = datetime(2020, 1, 1)
+
+
+@pytest.fixture
+def db(db_schema):
+    session = SessionLocal()
+    for uid in (ME, PARTNER):
+        session.add(User(ID=uid, Mail=f"a{uid}@x.com", Password="x", Username=f"a{uid}",
+                         BirthDate=date(1995, 1, 1), IsActive=True))
+    session.add(Matches(ID=MATCH, UserID1=ME, UserID2=PARTNER, Status=True, IsRanked=False,
+                        LikedByUser1=True, LikedByUser2=True, MatchDate=OLD))
+    # 6 viejos del partner sin leer, 2 viejos míos sin leer y 3 recientes del partner sin leer
+    for k, (sender, created) in enumerate([(PARTNER, OLD)] * 6 + [(ME, OLD)] * 2 + [(PARTNER, datetime.utcnow())] * 3):
+        session.add(Chat(MatchesID=MATCH, SenderID=sender, ContentChat=f"m{k}",
+                         CreatedDate=created + timedelta(seconds=k), Status=True, ReadChat=False))
+    session.add(MatchThreadSummary(MatchesID=MATCH, UnreadUser1=9, UnreadUser2=2))
+    session.commit()
+    yield session
+    session.rollback()
+    for model in (Chat, ChatSegment, MatchThreadSummary):
+        session.query(model).filter(model.MatchesID == MATCH).delete()
+    session.query(Matches).filter(Matches.ID == MATCH).delete()
+    session.query(User).filter(User.ID.in_([ME, PARTNER])).delete()
+    session.commit()
+    session.close()
+
+
+def test_compacted_messages_are_read_and_discounted(db):
+    moved = chat_archive.compact_match(db, MATCH, datetime.utcnow() - timedelta(days=1), segment_size=3)
+    db.commit()
+
+    assert moved == 8
+    archived = chat_archive.archived_after(db, MATCH, 0, 100)
+    assert len(archived) == 8 and all(m.ReadChat for m in archived)
+
+    summary = db.get(MatchThreadSummary, MATCH)
+    db.refresh(summary)
+    assert (summary.UnreadUser1, summary.UnreadUser2) == (3, 0)
@@ -0,0 +1,158 @@
+"""
+Índice de búsqueda del chat (app/utils/chat_search.py): el armado inicial es
+atómico y el journal se compacta desde la DB.
+"""
+import os
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.db import chat_archive
+from app.db.connection import SessionLocal
+from app.models import Chat
+from app.utils import chat_search as chat_search_module
+from app.utils.chat_search import ChatSearchIndex
+
+MATCH = 7001
+OLD = datetime(2020, 1, 1)
+
+
+@pytest.fixture(scope="module")
+def thread(db_schema):
+    """Un hilo con la primera mitad compactada a segmentos y la otra en dbo.Chat."""
+    db = SessionLocal()
+    try:
+        for k in range(20):
+            db.add(Chat(MatchesID=MATCH, SenderID=1, ContentChat=f"zanahoria {k}",
+                        CreatedDate=OLD + timedelta(minutes=k) if k < 10 else datetime.utcnow(),
+                        Status=True, ReadChat=False))
+        db.flush()
+        chat_archive.compact_match(db, MATCH, datetime.utcnow() - timedelta(days=1), segment_size=4)
+        db.commit()
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def _hits(index, query="zanahoria"):
+    return index.search({MATCH}, query, 100)
+
+
+def _files(path):
+    """Archivos del índice, sin el lock (que queda siempre)."""
+    return sorted(f for f in os.listdir(path) if not f.endswith(".lock"))
+
+
+def test_failed_build_leaves_nothing_half_loaded(thread, db, tmp_path, monkeypatch):
+    index = ChatSearchIndex(path=str(tmp_path / "idx"))
+
+    def broken(segment):
+        raise OperationalError("SELECT", {}, Exception("conexión perdida"))
+
+    with monkeypatch.context() as m:
+        m.setattr(chat_search_module, "decode_segment", broken)
+        with pytest.raises(OperationalError):
+            index.load(db)
+
+    assert not index.loaded
+    assert _files(tmp_path) == []
+
+    index.load(db)
+
+    assert index.loaded
+    assert len(_hits(index)) == 20
+    assert _files(tmp_path) == ["idx"]
+
+
+def test_reload_replays_journal_and_ignores_stale_tmp(thread, db, tmp_path):
+    path = str(tmp_path / "idx")
+    ChatSearchIndex(path=path).load(db)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write("[1,1,{\"basura\":1}]\n")
+
+    index = ChatSearchIndex(path=path)
+    index.load(db)
+
+    assert len(_hits(index)) == 20
+    assert _hits(index, "basura") == []
+
+
+def test_compaction_drops_deleted_messages(thread, db, tmp_path):
+    index = ChatSearchIndex(path=str(tmp_path / "idx"))
+    index.load(db)
+    extra = Chat(MatchesID=MATCH, SenderID=1, ContentChat="zanahoria borrada", CreatedDate=datetime.utcnow(),
+                 Status=True, ReadChat=False)
+    db.add(extra)
+    db.commit()
+    index.sync(db)
+    assert len(_hits(index)) == 21
+    grown = os.path.getsize(index.path)
+
+    db.delete(extra)
+    db.commit()
+    index.compact(db)
+
+    assert len(_hits(index)) == 20
+    assert _hits(index, "borrada") == []
+    assert os.path.getsize(index.path) < grown
+    assert not os.path.exists(index.path + ".tmp")
+
+
+def test_journal_growth_triggers_background_compaction(thread, db, tmp_path, monkeypatch):
+    index = ChatSearchIndex(path=str(tmp_path / "idx"), compact_min_bytes=1)
+    index.load(db)
+    compacted = threading.Event()
+    monkeypatch.setattr(index, "_compact", compacted.set)
+
+    built = os.path.getsize(index.path)
+    index.add(10**9, MATCH, " ".join(f"palabra{k}" for k in range(built // 10)))
+
+    assert compacted.wait(2)
+
+
+def test_writer_follows_journal_replaced_by_another_worker(thread, db, tmp_path):
+    path = str(tmp_path / "idx")
+    mine, other = ChatSearchIndex(path=path), ChatSearchIndex(path=path)
+    mine.load(db)
+    other.load(db)
+
+    other.compact(db)
+    mine.add(10**8, MATCH, "zanahoria perdida")
+
+    fresh = ChatSearchIndex(path=path)
+    fresh.load(db)
+    assert [h[1] for h in _hits(fresh, "perdida")] == [10**8]
+
+
+def test_late_commit_below_the_newest_ids_is_indexed(thread, db, tmp_path):
+    """Un hueco reciente frena la marca: el mensaje que llega tarde se indexa aunque haya cientos detrás."""
+    path = str(tmp_path / "idx")
+    index = ChatSearchIndex(path=path)
+    index.load(db)
+    base, match = 900_000, MATCH + 1
+    now = datetime.utcnow()
+
+    def message(msg_id, content):
+        return Chat(ID=msg_id, MatchesID=match, SenderID=1, ContentChat=content, CreatedDate=now,
+                    Status=True, ReadChat=False)
+
+    db.add_all([message(base, "zanahoria antes")] + [message(base + k, "relleno") for k in range(2, 400)])
+    db.commit()
+    index.sync(db)
+
+    db.add(message(base + 1, "zanahoria tardia"))
+    db.commit()
+    index.sync(db)
+    assert [h[1] for h in index.search({match}, "tardia", 10)] == [base + 1]
+
+    reloaded = ChatSearchIndex(path=path)
+    reloaded.load(db)
+    assert [h[1] for h in reloaded.search({match}, "tardia", 10)] == [base + 1]
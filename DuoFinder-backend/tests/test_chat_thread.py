@@ -0,0 +1,59 @@
+"""
+GET /chats/{match_id}: sin parámetros trae los más recientes; con `offset`
+explícito (incluido 0) mantiene el paginado viejo desde el primer mensaje.
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.db.connection import SessionLocal
+from app.models import Chat, Matches, User
+from app.routers.auth import get_current_user_async
+from app.utils.principal_cache import Principal
+
+ME, PARTNER, MATCH = 3001, 3002, 3100
+MESSAGES = 8
+
+
+@pytest.fixture(scope="module")
+def message_ids(api):
+    db = SessionLocal()
+    try:
+        for uid in (ME, PARTNER):
+            db.add(User(ID=uid, Mail=f"t{uid}@x.com", Password="x", Username=f"t{uid}",
+                        BirthDate=date(1995, 1, 1), IsActive=True))
+        db.add(Matches(ID=MATCH, UserID1=ME, UserID2=PARTNER, Status=True, IsRanked=False,
+                       LikedByUser1=True, LikedByUser2=True, MatchDate=datetime(2024, 1, 1)))
+        rows = [
+            Chat(MatchesID=MATCH, SenderID=ME if k % 2 else PARTNER, ContentChat=f"m{k}",
+                 CreatedDate=datetime(2024, 2, 1) + timedelta(minutes=k), Status=True, ReadChat=False)
+            for k in range(MESSAGES)
+        ]
+        db.add_all(rows)
+        db.commit()
+        return [r.ID for r in rows]
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def as_me(api):
+    api.app.dependency_overrides[get_current_user_async] = lambda: Principal(ID=ME, Mail="t@x.com", IsActive=True)
+    yield
+    api.app.dependency_overrides.pop(get_current_user_async, None)
+
+
+def _ids(api, **params):
+    r = api.get(f"/chats/chats/{MATCH}", params={"limit": 3, **params})
+    assert r.status_code == 200, r.text
+    return [m["id"] for m in r.json()["messages"]], r.json()["has_more"]
+
+
+def test_without_offset_returns_newest(api, message_ids, as_me):
+    assert _ids(api) == (message_ids[-3:], True)
+
+
+def test_explicit_offset_zero_keeps_ascending_paging(api, message_ids, as_me):
+    assert _ids(api, offset=0) == (message_ids[:3], True)
+    assert _ids(api, offset=3) == (message_ids[3:6], True)
+    assert _ids(api, offset=6) == (message_ids[6:], False)
@@ -0,0 +1,62 @@
+"""
+/chats/ws: un token revocado no sigue suscripto y un envío que falla cierra
+el socket en vez de dejarlo abierto sin reenviar nada.
+"""
+import time
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.routers import chat as chat_router
+from app.utils.pubsub import hub
+from app.utils.security import create_access_token
+from app.utils.token_epochs import token_epochs
+
+
+def _connect(api, uid):
+    token = create_access_token({"sub": f"ws{uid}@x.com", "uid": uid, "ep": 0})
+    return api.websocket_connect(f"/chats/chats/ws?token={token}")
+
+
+def _wait_subscribed(uid):
+    deadline = time.monotonic() + 2
+    while f"user:{uid}" not in hub._subs:
+        assert time.monotonic() < deadline, "el socket nunca se suscribió"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def fast_revalidation(monkeypatch):
+    monkeypatch.setattr(chat_router, "CHAT_WS_REVALIDATE_SECONDS", 0.05)
+
+
+def test_revoked_token_closes_socket(api, fast_revalidation):
+    with _connect(api, 8001) as ws:
+        _wait_subscribed(8001)
+        token_epochs.note(8001, 1)  # cambio de contraseña en este worker
+
+        with pytest.raises(WebSocketDisconnect) as e:
+            ws.receive_json()
+
+    assert e.value.code == 1008
+    assert "user:8001" not in hub._subs
+
+
+def test_failed_send_closes_socket(api):
+    with _connect(api, 8002) as ws:
+        _wait_subscribed(8002)
+        hub.publish("user:8002", {"type": "message", "message": object()})  # no serializable
+
+        with pytest.raises(WebSocketDisconnect) as e:
+            ws.receive_json()
+
+    assert e.value.code == 1011
+    assert "user:8002" not in hub._subs
+
+
+def test_events_are_forwarded(api):
+    with _connect(api, 8003) as ws:
+        _wait_subscribed(8003)
+        hub.publish("user:8003", {"type": "read", "match_id": 1})
+
+        assert ws.receive_json() == {"type": "read", "match_id": 1}
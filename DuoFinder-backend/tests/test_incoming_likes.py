@@ -0,0 +1,156 @@
+"""
+Likes recibidos (app/utils/incoming_likes.py y GET /matches/incoming) sobre el
+ledger dbo.Swipes: un like sale de la cola cuando lo respondo (match o
+rechazo), match_id solo viene cuando la pareja llegó a Matches y un like
+atendido por otro worker aparece al vencer el TTL. El MERGE de T-SQL se
+reemplaza por un doble que escribe el ledger igual que el batch.
+"""
+import time
+from datetime import date, datetime
+
+import pytest
+
+from app.db.connection import SessionLocal
+from app.db.swipe_merge import SwipeOutcome
+from app.models import Games, Swipes, User, UserGamesSkill, UserImages
+from app.routers import match as match_router
+from app.routers.auth import get_current_user
+from app.utils.incoming_likes import IncomingLikes, incoming_likes, load_incoming
+from app.utils.principal_cache import Principal
+
+ME, LIKER_A, LIKER_B, DISLIKER, ANSWERED, STRANGER = 7001, 7002, 7003, 7004, 7005, 7006
+GAME = 7100
+MATCH_ID, CHAT_ID = 7900, 7950
+NOW = datetime(2024, 1, 1)
+
+
+@pytest.fixture(scope="module")
+def ledger(api):
+    db = SessionLocal()
+    try:
+        db.add(Games(ID=GAME, GameName="Dota"))
+        for uid in (ME, LIKER_A, LIKER_B, DISLIKER, ANSWERED, STRANGER):
+            db.add(User(ID=uid, Mail=f"i{uid}@x.com", Password="x", Username=f"i{uid}",
+                        BirthDate=date(1995, 1, 1), IsActive=True))
+            db.add(UserGamesSkill(UserID=uid, GameId=GAME, IsRanked=False, SkillLevel="mid"))
+            db.add(UserImages(UserID=uid, ImageURL=f"http://img/{uid}", IsPrimary=True))
+        db.add_all([
+            Swipes(ID=70001, ActorID=LIKER_A, TargetID=ME, Liked=True, CreatedDate=NOW),
+            Swipes(ID=70002, ActorID=DISLIKER, TargetID=ME, Liked=False, CreatedDate=NOW),
+            Swipes(ID=70003, ActorID=ANSWERED, TargetID=ME, Liked=True, CreatedDate=NOW),
+            Swipes(ID=70004, ActorID=ME, TargetID=ANSWERED, Liked=False, CreatedDate=NOW),
+            Swipes(ID=70005, ActorID=LIKER_B, TargetID=ME, Liked=True, CreatedDate=NOW),
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def as_me(api, ledger, monkeypatch):
+    next_id = iter(range(70100, 70200))
+
+    def fake_merge(db, me, swipes):
+        out = []
+        for target, like, _ in swipes:
+            seq = next(next_id)
+            db.add(Swipes(ID=seq, ActorID=me, TargetID=target, Liked=like, CreatedDate=NOW))
+            last = db.query(Swipes.Liked).filter(Swipes.ActorID == target, Swipes.TargetID == me) \
+                .order_by(Swipes.ID.desc()).first()
+            theirs = last.Liked if last else None
+            new = (like, theirs) if me < target else (theirs, like)
+            mutual = like and theirs is True
+            out.append(SwipeOutcome(target, seq, MATCH_ID if mutual else None, (None, None), new,
+                                    CHAT_ID if mutual else None))
+        return out
+
+    monkeypatch.setattr(match_router, "merge_swipes", fake_merge)
+    api.app.dependency_overrides[get_current_user] = lambda: Principal(ID=ME, Mail="i@x.com", IsActive=True)
+    for uid in (ME, STRANGER):
+        incoming_likes.forget(uid)
+    yield ME
+    api.app.dependency_overrides.pop(get_current_user, None)
+    db = SessionLocal()
+    db.query(Swipes).filter(Swipes.ID >= 70100).delete()
+    db.commit()
+    db.close()
+    for uid in (ME, STRANGER):
+        incoming_likes.forget(uid)
+
+
+def _incoming(api):
+    r = api.get("/matches/incoming")
+    assert r.status_code == 200, r.text
+    return [u["id"] for u in r.json()]
+
+
+def test_queue_is_built_from_unanswered_likes(as_me):
+    db = SessionLocal()
+    try:
+        assert load_incoming(db, ME) == {LIKER_A: 70001, LIKER_B: 70005}
+    finally:
+        db.close()
+
+
+def test_incoming_pages_newest_first(api, as_me):
+    r = api.get("/matches/incoming", params={"limit": 1})
+    assert [u["id"] for u in r.json()] == [LIKER_B]
+
+    r = api.get("/matches/incoming", params={"limit": 1, "cursor": r.headers["X-Next-Cursor"]})
+    assert [u["id"] for u in r.json()] == [LIKER_A]
+    assert "X-Next-Cursor" not in r.headers
+
+
+def test_like_drops_out_once_matched(api, as_me):
+    assert _incoming(api) == [LIKER_B, LIKER_A]
+
+    r = api.post("/matches/swipe", json={"target_user_id": LIKER_A, "like": True})
+
+    assert r.status_code == 200, r.text
+    assert r.json()["match"] and r.json()["match_id"] == MATCH_ID and r.json()["chat_id"] == CHAT_ID
+    assert _incoming(api) == [LIKER_B]
+    incoming_likes.forget(ME)  # reconstruida desde el ledger tampoco aparece
+    assert _incoming(api) == [LIKER_B]
+
+
+def test_like_drops_out_once_rejected(api, as_me):
+    assert _incoming(api) == [LIKER_B, LIKER_A]
+
+    r = api.post("/matches/swipe", json={"target_user_id": LIKER_B, "like": False})
+
+    assert r.status_code == 200, r.text
+    assert not r.json()["match"] and r.json()["match_id"] is None
+    assert _incoming(api) == [LIKER_A]
+    incoming_likes.forget(ME)
+    assert _incoming(api) == [LIKER_A]
+
+
+def test_one_sided_like_has_no_match_and_reaches_the_target_queue(api, as_me):
+    db = SessionLocal()
+    try:
+        assert incoming_likes.likers(db, STRANGER) == frozenset()  # cola en caché
+    finally:
+        db.close()
+
+    r = api.post("/matches/swipe", json={"target_user_id": STRANGER, "like": True})
+
+    assert r.status_code == 200, r.text
+    assert not r.json()["match"] and r.json()["match_id"] is None
+    page, has_more = incoming_likes.page(None, STRANGER, None, 10)
+    assert page == [(70100, ME)] and not has_more
+
+
+def test_likes_from_other_workers_show_up_after_the_ttl(as_me):
+    queue = IncomingLikes(ttl=0.2)
+    db = SessionLocal()
+    try:
+        assert queue.likers(db, ME) == {LIKER_A, LIKER_B}
+
+        db.add(Swipes(ID=70150, ActorID=STRANGER, TargetID=ME, Liked=True, CreatedDate=NOW))
+        db.commit()
+        assert STRANGER not in queue.likers(db, ME)
+
+        time.sleep(0.25)
+        assert queue.likers(db, ME) == {LIKER_A, LIKER_B, STRANGER}
+    finally:
+        db.close()
@@ -0,0 +1,89 @@
+"""
+Cantidad de sentencias SQL por endpoint (app/db/load_profiles.py).
+
+El usuario 1 tiene historial pesado (muchos matches, mensajes e imágenes): con
+las relaciones de User en selectin, cualquier select(User) sumaba una sentencia
+por colección y traía todo a memoria. Si un endpoint vuelve a cargar
+relaciones que no usa, su cuenta sube y el test falla.
+
+Se mide el segundo request de cada endpoint: el primero calienta los cachés en
+memoria (épocas de tokens, miembros de match), que no son lo que se prueba acá.
+"""
+import os
+import subprocess
+import sys
+from datetime import date, datetime
+
+import pytest
+
+from app.db.connection import SessionLocal
+from app.models import Chat, Matches, Swipes, User, UserImages
+from app.utils.principal_cache import principal_cache
+from app.utils.security import hash_password
+
+PARTNERS = range(2, 12)
+MESSAGES_PER_MATCH = 30
+
+
+@pytest.fixture(scope="module")
+def token(api):
+    db = SessionLocal()
+    try:
+        db.add(User(ID=1, Mail="u1@x.com", Password=hash_password("pw"), Username="u1",
+                    BirthDate=date(1995, 1, 1), IsActive=True))
+        for i in PARTNERS:
+            db.add(User(ID=i, Mail=f"u{i}@x.com", Password="x", Username=f"u{i}",
+                        BirthDate=date(1995, 1, 1), IsActive=True))
+        for i in (1, *PARTNERS):
+            for k in range(3):
+                db.add(UserImages(UserID=i, ImageURL=f"img{i}-{k}", IsPrimary=k == 0))
+        for i in PARTNERS:
+            db.add(Matches(ID=100 + i, UserID1=1, UserID2=i, Status=True, IsRanked=False,
+                           LikedByUser1=True, LikedByUser2=True, MatchDate=datetime(2024, 1, i)))
+            for k in range(MESSAGES_PER_MATCH):
+                db.add(Chat(MatchesID=100 + i, SenderID=1 if k % 2 else i, ContentChat=f"m{k}",
+                            CreatedDate=datetime(2024, 2, 1), Status=True, ReadChat=False))
+        db.add(Swipes(ID=1, ActorID=20, TargetID=1, Liked=True, CreatedDate=datetime(2024, 1, 1)))
+        db.add(User(ID=20, Mail="u20@x.com", Password="x", Username="u20",
+                    BirthDate=date(1995, 1, 1), IsActive=True))
+        db.commit()
+    finally:
+        db.close()
+    return api.post("/auth/login", json={"email": "u1@x.com", "password": "pw"}).json()["access_token"]
+
+
+# (método, path, body, sentencias esperadas)
+ENDPOINTS = [
+    ("POST", "/auth/login", {"email": "u1@x.com", "password": "pw"}, 2),
+    ("GET", "/users/me", None, 3),
+    ("GET", "/users/2", None, 3),
+    ("PUT", "/users/me", {"bio": "hola"}, 3),
+    ("GET", "/matches/matches", None, 1),
+    ("GET", "/matches/matches/102", None, 1),
+    ("GET", "/matches/incoming", None, 2),
+    ("GET", "/chats/chats/inbox", None, 1),
+    ("GET", "/chats/chats/102?limit=5", None, 2),
+]
+
+
+@pytest.mark.parametrize("method,path,body,expected", ENDPOINTS, ids=[f"{m} {p}" for m, p, _, _ in ENDPOINTS])
+def test_statement_count(api, token, statements, method, path, body, expected):
+    headers = {"Authorization": f"Bearer {token}"}
+    assert api.request(method, path, json=body, headers=headers).status_code == 200
+    principal_cache.invalidate_user(1)
+    statements.clear()
+
+    response = api.request(method, path, json=body, headers=headers)
+
+    assert response.status_code == 200
+    assert len(statements) == expected, "\n\n".join(statements)
+
+
+def test_profiles_import_before_routers():
+    """load_profiles configura los mappers al importarse: tiene que andar en un intérprete limpio."""
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", "import app.db.load_profiles, app.routers.auth"],
+        cwd=backend, env=os.environ.copy(), capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,189 @@
+"""
+El hub no bloquea el event loop: con el backend broker, publish_async manda
+el envío a un thread y la primera suscripción conecta en segundo plano.
+Si el broker se cae, un worker que solo está suscripto reconecta solo y
+vuelve a mandar sus canales; el broker no reenvía canales sin suscriptos.
+"""
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from app.utils import pubsub
+from app.utils.pubsub import BrokerBackend, PubSubHub
+
+ROOT = Path(__file__).resolve().parents[1]
+HOST = "127.0.0.1"
+
+
+class _SlowBroker(BrokerBackend):
+    """Broker inalcanzable: cada operación tarda lo que tardaría un timeout."""
+
+    def __init__(self):
+        super().__init__(lambda ch, p: None, "127.0.0.1", 0)
+        self.published = []
+
+    def start(self) -> None:
+        time.sleep(0.3)
+
+    def publish(self, channel, payload) -> None:
+        time.sleep(0.3)
+        self.published.append((channel, payload))
+
+
+def _max_loop_stall(coro_factory) -> float:
+    """Corre la corrutina junto a un ticker y devuelve el mayor hueco entre ticks."""
+    async def main():
+        gaps = []
+        done = asyncio.Event()
+
+        async def ticker():
+            last = time.monotonic()
+            while not done.is_set():
+                await asyncio.sleep(0.01)
+                now = time.monotonic()
+                gaps.append(now - last)
+                last = now
+
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0.02)
+        await coro_factory()
+        done.set()
+        await task
+        return max(gaps)
+
+    return asyncio.run(main())
+
+
+def test_publish_async_offloads_broker_send():
+    hub = PubSubHub(backend="memory")
+    hub._backend = broker = _SlowBroker()
+
+    stall = _max_loop_stall(lambda: hub.publish_async("user:1", {"type": "message"}))
+
+    assert broker.published == [("user:1", {"type": "message"})]
+    assert stall < 0.2
+
+
+def test_first_subscribe_connects_in_background():
+    hub = PubSubHub(backend="memory")
+    hub._backend = _SlowBroker()
+
+    async def subscribe():
+        sub = hub.subscribe("user:1")
+        hub.unsubscribe(sub)
+
+    assert _max_loop_stall(subscribe) < 0.2
+
+
+def test_memory_backend_delivers_inline():
+    hub = PubSubHub(backend="memory")
+
+    async def roundtrip():
+        sub = hub.subscribe("user:1")
+        await hub.publish_async("user:1", {"n": 1})
+        return await asyncio.wait_for(sub.get(), 1)
+
+    assert asyncio.run(roundtrip()) == {"n": 1}
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+def _start_broker(port):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "app.utils.pubsub", "--host", HOST, "--port", str(port)],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    _wait(lambda: _listening(port), "el broker nunca empezó a escuchar")
+    return proc
+
+
+def _listening(port):
+    try:
+        socket.create_connection((HOST, port), timeout=0.2).close()
+        return True
+    except OSError:
+        return False
+
+
+def _wait(condition, message, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, message
+        time.sleep(0.02)
+
+
+def _publish_until_received(publisher, got, channel, payload):
+    # el sub del otro worker viaja por otra conexión: se reintenta hasta que llega
+    deadline = time.monotonic() + 10
+    while (channel, payload) not in got:
+        assert time.monotonic() < deadline, "el suscriptor nunca recibió el evento"
+        publisher.publish(channel, payload)
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    monkeypatch.setattr(pubsub, "PUBSUB_RECONNECT_MAX_SECONDS", 0.2)
+    monkeypatch.setattr(BrokerBackend, "RECONNECT_MIN_SECONDS", 0.05)
+    port = _free_port()
+    procs = [_start_broker(port)]
+    backends = []
+    yield port, procs, backends
+    for backend in backends:
+        backend.close()
+    for proc in procs:
+        proc.kill()
+        proc.wait()
+
+
+def test_subscriber_reconnects_and_resubscribes(broker):
+    port, procs, backends = broker
+    got = []
+    listener = BrokerBackend(lambda ch, p: got.append((ch, p)), HOST, port)
+    publisher = BrokerBackend(lambda ch, p: None, HOST, port)
+    backends.extend((listener, publisher))
+    listener.watch("user:1", True)
+    listener.send_interest("user:1")
+    _wait(listener._connected.is_set, "el suscriptor nunca conectó")
+
+    _publish_until_received(publisher, got, "user:1", {"n": 1})
+
+    procs[0].kill()
+    procs[0].wait()
+    _wait(lambda: not listener._connected.is_set(), "el suscriptor no notó la caída")
+    procs.append(_start_broker(port))
+    _wait(listener._connected.is_set, "el suscriptor nunca reconectó")
+
+    publisher.publish("user:2", {"n": 0})  # canal sin suscriptores: no llega
+    _publish_until_received(publisher, got, "user:1", {"n": 2})
+    assert all(ch == "user:1" for ch, _ in got)
+
+
+def test_unwatched_channel_stops_arriving(broker):
+    port, _, backends = broker
+    got = []
+    listener = BrokerBackend(lambda ch, p: got.append((ch, p)), HOST, port)
+    backends.append(listener)
+    listener.watch("user:3", True)
+    listener.send_interest("user:3")
+    _wait(listener._connected.is_set, "el suscriptor nunca conectó")
+    _publish_until_received(listener, got, "user:3", {"n": 1})
+
+    listener.watch("user:3", False)
+    listener.send_interest("user:3")
+    listener.publish("user:3", {"n": 2})
+    listener.publish("user:4", {"n": 0})
+    listener.watch("user:4", True)
+    listener.send_interest("user:4")
+    _publish_until_received(listener, got, "user:4", {"n": 5})
+
+    assert ("user:3", {"n": 2}) not in got
@@ -0,0 +1,90 @@
+"""
+/matches/suggestions (async): paginado completo por cursor sin repetidos,
+tanto desde el mazo precalculado como con el cálculo en un thread. Un like
+fijado al frente del mazo no vuelve a salir cuando el refill lo trae por score.
+"""
+from datetime import date
+
+import pytest
+
+from app.db.connection import SessionLocal
+from app.models import GameRanks, Games, User, UserGamesSkill, UserImages
+from app.routers.auth import get_current_user_async
+from app.utils.principal_cache import Principal
+from app.utils.suggestion_deck import DeckEntry, SuggestionDecks, suggestion_decks
+
+BASE = 1000
+PLAYERS = 40
+
+
+@pytest.fixture(scope="module")
+def players(api):
+    db = SessionLocal()
+    try:
+        db.add_all([Games(ID=BASE + 1, GameName="LoL"), Games(ID=BASE + 2, GameName="Valo")])
+        db.add_all([
+            GameRanks(Game_id=BASE + 1, Local_rank_id=i, Rank_name=f"R{i}", Rank_order=i) for i in range(1, 20)
+        ])
+        for i in range(1, PLAYERS + 1):
+            uid = BASE + i
+            db.add(User(ID=uid, Mail=f"p{i}@x.com", Password="x", Username=f"p{i}",
+                        BirthDate=date(1990 + i % 15, 5, 1), Server="LAS" if i % 2 else "NA",
+                        IsActive=True, AgeMin=18, AgeMax=40))
+            db.add(UserGamesSkill(UserID=uid, GameId=BASE + 1, IsRanked=i % 3 != 0,
+                                  Game_rank_local_id=(i % 19) + 1 if i % 3 != 0 else None, SkillLevel="mid"))
+            if i % 4 == 0:
+                db.add(UserGamesSkill(UserID=uid, GameId=BASE + 2, IsRanked=False, SkillLevel="low"))
+            db.add(UserImages(UserID=uid, ImageURL=f"http://img/{i}", IsPrimary=True))
+        db.commit()
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def as_player(api):
+    me = BASE + 4
+    api.app.dependency_overrides[get_current_user_async] = lambda: Principal(ID=me, Mail="p4@x.com", IsActive=True)
+    suggestion_decks.invalidate(me)
+    yield me
+    api.app.dependency_overrides.pop(get_current_user_async, None)
+
+
+def test_pages_through_all_candidates(api, players, as_player):
+    seen, cursor = [], None
+    while True:
+        r = api.get("/matches/suggestions", params={"limit": 5, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200, r.text
+        seen += [s["id"] for s in r.json()]
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen
+    assert as_player not in seen
+    assert len(set(seen)) == len(seen)
+
+
+def test_cursor_from_other_filters_is_rejected(api, players, as_player):
+    r = api.get("/matches/suggestions", params={"limit": 5})
+    cursor = r.headers["X-Next-Cursor"]
+
+    r = api.get("/matches/suggestions", params={"limit": 5, "server": "NA", "cursor": cursor})
+
+    assert r.status_code == 400
+
+
+def test_refill_does_not_repeat_a_served_pinned_liker():
+    decks = SuggestionDecks(size=3, low_water=2, workers=1)
+    decks.seed(1, "f", None, [DeckEntry(10, 1, 1.0), DeckEntry(11, 1, 2.0)], exhausted=False)
+    decks.prepend(1, DeckEntry(50, 1, 0.0, pinned=True))  # like recibido
+
+    served, head, _ = decks.take(1, "f", None, 2)
+    assert [e.user_id for e in served] == [50, 10]
+
+    # la tanda siguiente trae al mismo usuario en su lugar por score
+    decks.maybe_refill(1, lambda after, k: ([DeckEntry(50, 1, 3.0), DeckEntry(12, 1, 4.0)], True))
+    decks._executor.shutdown(wait=True)
+
+    served, _, has_more = decks.take(1, "f", head, 5)
+    assert [e.user_id for e in served] == [11, 12]
+    assert not has_more
@@ -0,0 +1,59 @@
+"""
+POST /matches/swipe/batch: un target inexistente o inactivo es un error de
+ese ítem y no tira abajo el lote (el MERGE de T-SQL se reemplaza por un doble).
+"""
+from datetime import date
+
+import pytest
+
+from app.db.connection import SessionLocal
+from app.db.swipe_merge import SwipeOutcome
+from app.models import Games, User, UserGamesSkill
+from app.routers import match as match_router
+from app.routers.auth import get_current_user
+from app.utils.principal_cache import Principal
+
+ME, ACTIVE, INACTIVE, MISSING = 4001, 4002, 4003, 4999
+GAME = 4100
+
+
+@pytest.fixture(scope="module")
+def users(api):
+    db = SessionLocal()
+    try:
+        db.add(Games(ID=GAME, GameName="CS"))
+        for uid, active in ((ME, True), (ACTIVE, True), (INACTIVE, False)):
+            db.add(User(ID=uid, Mail=f"s{uid}@x.com", Password="x", Username=f"s{uid}",
+                        BirthDate=date(1995, 1, 1), IsActive=active))
+            db.add(UserGamesSkill(UserID=uid, GameId=GAME, IsRanked=False, SkillLevel="mid"))
+        db.commit()
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def merged(api, monkeypatch):
+    """Targets que llegaron al MERGE."""
+    seen = []
+
+    def fake_merge(db, me, swipes):
+        seen.extend(t for t, _, _ in swipes)
+        return [SwipeOutcome(t, 1, None, (None, None), (like, None), None) for t, like, _ in swipes]
+
+    monkeypatch.setattr(match_router, "merge_swipes", fake_merge)
+    api.app.dependency_overrides[get_current_user] = lambda: Principal(ID=ME, Mail="s@x.com", IsActive=True)
+    yield seen
+    api.app.dependency_overrides.pop(get_current_user, None)
+
+
+def test_missing_and_inactive_targets_fail_per_item(api, users, merged):
+    body = {"swipes": [{"target_user_id": t, "like": True} for t in (ACTIVE, MISSING, INACTIVE)]}
+
+    r = api.post("/matches/swipe/batch", json=body)
+
+    assert r.status_code == 200, r.text
+    results = {item["target_user_id"]: item for item in r.json()["results"]}
+    assert results[ACTIVE]["ok"] and results[ACTIVE]["game_id"] == GAME
+    assert not results[MISSING]["ok"] and results[MISSING]["error"] == "Usuario no encontrado"
+    assert not results[INACTIVE]["ok"]
+    assert merged == [ACTIVE]
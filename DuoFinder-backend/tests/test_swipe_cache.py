@@ -0,0 +1,42 @@
+"""
+Set de "ya swipeados" (app/utils/swipe_cache.py): un swipe atendido por otro
+worker (solo en el ledger) aparece cuando vence el TTL.
+"""
+import time
+from datetime import datetime
+
+import pytest
+
+from app.db.connection import SessionLocal
+from app.models import Swipes
+from app.utils.swipe_cache import SwipedCache
+
+ME, SEEN, OTHER_WORKER, LOCAL = 7301, 7302, 7303, 7304
+
+
+@pytest.fixture
+def db(db_schema):
+    session = SessionLocal()
+    session.add(Swipes(ID=73001, ActorID=ME, TargetID=SEEN, Liked=True, CreatedDate=datetime(2024, 1, 1)))
+    session.commit()
+    yield session
+    session.rollback()
+    session.query(Swipes).filter(Swipes.ActorID == ME).delete()
+    session.commit()
+    session.close()
+
+
+def test_swipes_from_other_workers_show_up_after_the_ttl(db):
+    cache = SwipedCache(ttl=0.2)
+    assert SEEN in cache.get(db, ME)
+
+    db.add(Swipes(ID=73002, ActorID=ME, TargetID=OTHER_WORKER, Liked=False, CreatedDate=datetime(2024, 1, 1)))
+    db.commit()
+    cache.add(ME, LOCAL)  # swipe de este worker: se ve enseguida
+
+    ids = cache.get(db, ME)
+    assert LOCAL in ids and OTHER_WORKER not in ids
+
+    time.sleep(0.25)
+    ids = cache.get(db, ME)
+    assert SEEN in ids and OTHER_WORKER in ids
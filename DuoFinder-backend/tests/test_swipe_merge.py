@@ -0,0 +1,115 @@
+"""
+Batch de swipes (app/db/swipe_merge.py). El T-SQL no corre sobre sqlite: se
+prueban los parámetros que arma merge_swipes (pareja en orden canónico, mi
+lado, bits) y cómo traduce las filas del SELECT final a SwipeOutcome.
+"""
+from collections import namedtuple
+
+from app.db import swipe_merge
+from app.db.swipe_merge import merge_swipes
+
+Row = namedtuple(
+    "Row",
+    "TargetID MySide PrevMine Theirs Liked SwipeID MatchID PrevL1 PrevL2 NewL1 NewL2 ChatID",
+)
+
+
+def row(target, side, liked, *, prev_mine=None, theirs=None, swipe_id=1,
+        match_id=None, prev=(None, None), new=(None, None), chat_id=None):
+    return Row(target, side, prev_mine, theirs, liked, swipe_id, match_id, *prev, *new, chat_id)
+
+
+class _FakeSession:
+    """Guarda el SQL y los parámetros y devuelve las filas preparadas."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.calls = []
+
+    def execute(self, statement, params):
+        self.calls.append((str(statement), params))
+        return self
+
+    def fetchall(self):
+        return self.rows
+
+
+def _pairs(params, n):
+    return [(params[f"l{i}"], params[f"h{i}"], params[f"side{i}"]) for i in range(n)]
+
+
+def test_builds_one_canonical_row_per_target():
+    db = _FakeSession()
+
+    merge_swipes(db, 50, [(70, True, 1), (30, False, 0)])
+
+    (sql, params), = db.calls
+    assert "VALUES (:t0, :l0, :h0, :side0, :like0, :ranked0), (:t1, :l1, :h1, :side1, :like1, :ranked1);" in sql
+    assert _pairs(params, 2) == [(50, 70, 1), (30, 50, 2)]
+    assert (params["like0"], params["ranked0"], params["like1"], params["ranked1"]) == (1, 1, 0, 0)
+    assert params["me"] == 50 and params["sysmsg"] == swipe_merge.MATCH_SYSTEM_MESSAGE
+
+
+def test_empty_batch_does_not_hit_the_database():
+    db = _FakeSession()
+
+    assert merge_swipes(db, 50, []) == []
+    assert db.calls == []
+
+
+def test_concurrent_pair_takes_the_same_lock():
+    # los dos lados del mismo par arman la misma pareja (y el mismo applock swipe:lo:hi)
+    a, b = _FakeSession(), _FakeSession()
+
+    merge_swipes(a, 7, [(3, True, 0)])
+    merge_swipes(b, 3, [(7, True, 0)])
+
+    assert _pairs(a.calls[0][1], 1) == [(3, 7, 2)]
+    assert _pairs(b.calls[0][1], 1) == [(3, 7, 1)]
+    assert "CONCAT(N'swipe:', @lo, N':', @hi)" in a.calls[0][0]
+    assert "ORDER BY UserID1, UserID2" in a.calls[0][0]
+
+
+def test_mutual_like_is_a_new_match_with_system_chat():
+    db = _FakeSession([row(70, 1, 1, theirs=1, swipe_id=9, match_id=500,
+                           prev=(None, None), new=(1, 1), chat_id=800)])
+
+    (out,) = merge_swipes(db, 50, [(70, True, 0)])
+
+    assert out.is_match and out.is_new_match
+    assert (out.target_id, out.swipe_id, out.match_id, out.chat_id) == (70, 9, 500, 800)
+    assert out.prev_liked == (None, None) and out.new_liked == (True, True)
+
+
+def test_repeated_like_on_existing_match_is_not_new():
+    db = _FakeSession([row(30, 2, 1, prev_mine=1, theirs=1, match_id=500,
+                           prev=(1, 1), new=(1, 1))])
+
+    (out,) = merge_swipes(db, 50, [(30, True, 0)])
+
+    assert out.is_match and not out.is_new_match
+    assert out.chat_id is None
+
+
+def test_unlike_after_match_maps_my_side():
+    db = _FakeSession([row(30, 2, 0, prev_mine=1, theirs=1, match_id=500,
+                           prev=(1, 1), new=(1, 0))])
+
+    (out,) = merge_swipes(db, 50, [(30, False, 0)])
+
+    assert not out.is_match
+    assert out.new_liked == (True, False)
+
+
+def test_one_sided_like_comes_from_the_ledger():
+    # sin fila en Matches: (usuario menor, usuario mayor) según mi lado
+    db = _FakeSession([
+        row(70, 1, 1, prev_mine=0, theirs=None),
+        row(30, 2, 1, prev_mine=None, theirs=0),
+    ])
+
+    low_side, high_side = merge_swipes(db, 50, [(70, True, 0), (30, True, 0)])
+
+    assert low_side.match_id is None and not low_side.is_match
+    assert low_side.prev_liked == (False, None) and low_side.new_liked == (True, None)
+    assert high_side.prev_liked == (False, None) and high_side.new_liked == (False, True)
@@ -0,0 +1,60 @@
+"""
+Épocas de tokens (app/utils/token_epochs.py): sin una primera lectura de la
+tabla se rechaza con 503 en vez de aceptar época 0, la carga nunca espera el
+lock, y bump incrementa en la DB sin leer y reescribir.
+"""
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import OperationalError
+
+from app.db.connection import SessionLocal
+from app.models import UserTokenEpoch
+from app.utils.token_epochs import TokenEpochs
+
+USER = 5001
+
+
+class _DownDB:
+    def query(self, *entities):
+        raise OperationalError("SELECT", {}, Exception("conexión perdida"))
+
+
+@pytest.fixture
+def db(db_schema):
+    session = SessionLocal()
+    yield session
+    session.rollback()
+    session.close()
+
+
+def test_rejects_until_first_load_succeeds(db):
+    epochs = TokenEpochs(refresh_seconds=3600)
+
+    with pytest.raises(HTTPException) as e:
+        epochs.current(_DownDB(), USER)
+    assert e.value.status_code == 503
+
+    assert epochs.current(db, USER) == 0
+
+
+def test_first_load_does_not_wait_for_the_lock(db):
+    epochs = TokenEpochs(refresh_seconds=3600)
+    epochs._refreshing.acquire()  # otra carga en curso
+    try:
+        with pytest.raises(HTTPException) as e:
+            epochs.current(db, USER)
+        assert e.value.status_code == 503
+    finally:
+        epochs._refreshing.release()
+
+
+def test_bump_increments_in_the_database(db):
+    epochs = TokenEpochs(refresh_seconds=3600)
+
+    assert epochs.bump(db, USER) == 1
+    assert epochs.bump(db, USER) == 2
+    db.commit()
+
+    db.expire_all()
+    assert db.get(UserTokenEpoch, USER).Epoch == 2
+    assert epochs.load_exact(db, USER) == 2
@@ -139,6 +139,28 @@ export interface ApiMatchResponse {
   };
 }
 
+export interface ApiInboxThread {
+  match_id: number;
+  partner_id: number;
+  partner_username: string;
+  partner_image?: string | null;
+  last_message?: {
+    id: number;
+    match_id: number;
+    sender_id: number;
+    content: string;
+    created_at: string;
+    read: boolean;
+  } | null;
+  unread_count: number;
+  last_activity: string;
+}
+
+export interface InboxPage {
+  items: ApiInboxThread[];
+  nextCursor: string | null;
+}
+
 export interface ChatInfoResponse {
   partner_id: number;
   partner_username: string;
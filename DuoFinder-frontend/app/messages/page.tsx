@@ -4,7 +4,7 @@
 /* eslint-disable react/no-unescaped-entities */
 
 
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { useRouter } from 'next/navigation';
 import styles from '@/styles/pages/messages.module.css';
 import Image from 'next/image';
@@ -12,8 +12,8 @@ import { chatService } from '@/lib/apiService';
 import type {
   FrontendChat,
   FrontendMessage,
-  ApiMatchResponse,
-  ChatInfoResponse
+  ApiInboxThread,
+  InboxPage
 } from './message.types';
 
 // Hook para obtener el ID del usuario actual
@@ -101,104 +101,44 @@ const MessagesPage = () => {
   const showChatView = !!selectedMatch;
   const showListView = !selectedMatch || !isMobile;
 
-  // Cargar todos los matches y su información de chat
+  // Cargar todos los chats con su información (partner, último mensaje, no leídos)
   const loadMatchesWithChatInfo = useCallback(async () => {
     try {
       setLoading(true);
-      
-      let apiMatches: ApiMatchResponse[] = [];
-      try {
-        apiMatches = await chatService.getAllMatches();
-        console.log('Matches obtenidos:', apiMatches);
-      } catch (error) {
-        console.error('Error loading matches from API:', error);
-        apiMatches = [];
-      }
-      
-      // Para cada match, obtener información del chat
-      const chatsWithInfo = await Promise.all(
-        apiMatches.map(async (match) => {
-          try {
-            const chatInfo: ChatInfoResponse = await chatService.getChatInfo(match.match_id || match.id);
-            console.log(`Chat info para match ${match.match_id || match.id}:`, chatInfo);
-            
-            // Crear chat básico primero
-            const chat = {
-              id: `match-${match.match_id || match.id}`,
-              matchId: match.match_id || match.id,
-              userId: chatInfo.partner_id,
-              matchedOn: match.created_at || new Date().toISOString(),
-              lastMessage: chatInfo.last_message ? {
-                id: 0,
-                match_id: match.match_id || match.id,
-                sender_id: chatInfo.partner_id,
-                content: chatInfo.last_message,
-                created_at: new Date().toISOString(),
-                read: true,
-                isCurrentUser: false
-              } : undefined,
-              unreadCount: chatInfo.unread_count,
-              currentUserId,
-              user: {
-                id: chatInfo.partner_id,
-                name: chatInfo.partner_username,
-                username: chatInfo.partner_username,
-                image: chatInfo.partner_image || '/favicon.ico',
-                avatar: match.other_user?.avatar || '/default-avatar.png',
-                bio: match.other_user?.bio || '',
-                age: match.other_user?.age,
-                onlineStatus: match.other_user?.online_status || false,
-                lastOnline: match.other_user?.last_online,
-                location: match.other_user?.location || '',
-                skillLevel: match.other_user?.skill_level || '',
-              }
-            } as FrontendChat;
-            
-            return chat;
-          } catch (error) {
-            console.error(`Error loading chat info for match ${match.match_id || match.id}:`, error);
-            // Si hay error, crear chat básico
-            return {
-              id: `match-${match.match_id || match.id}`,
-              matchId: match.match_id || match.id,
-              userId: match.other_user_id || 0,
-              matchedOn: match.created_at || new Date().toISOString(),
-              lastMessage: undefined,
-              unreadCount: 0,
-              currentUserId,
-              user: {
-                id: match.other_user_id || 0,
-                name: match.other_user_name || match.other_user?.name || `Usuario ${match.other_user_id || match.id}`,
-                image: match.other_user?.image || '/favicon.ico',
-                avatar: match.other_user_avatar || match.other_user?.avatar || '/default-avatar.png',
-                gamePreferences: [],
-                onlineStatus: false,
-                location: '',
-                skillLevel: '',
-                favoriteGames: []
-              }
-            } as FrontendChat;
-          }
-        })
-      );
-
-      // Combinar todos los chats
-      const allChats = [...chatsWithInfo]
-        .filter((chat): chat is FrontendChat => chat !== null)
-        .sort((a, b) => {
-          // Ordenar por si tiene último mensaje primero, luego por fecha
-          if (a.lastMessage && !b.lastMessage) return -1;
-          if (!a.lastMessage && b.lastMessage) return 1;
-          
-          // Si ambos tienen último mensaje o no tienen, ordenar por fecha
-          const getDate = (chat: FrontendChat) => {
-            return chat.lastMessage?.created_at || chat.matchedOn;
-          };
-          
-          const dateA = new Date(getDate(a)).getTime();
-          const dateB = new Date(getDate(b)).getTime();
-          return dateB - dateA; // Orden descendente (más reciente primero)
-        });
+
+      const threads: ApiInboxThread[] = [];
+      let cursor: string | null = null;
+      do {
+        const page: InboxPage = await chatService.getInbox(cursor);
+        threads.push(...page.items);
+        cursor = page.nextCursor;
+      } while (cursor);
+      console.log('Bandeja obtenida:', threads);
+
+      // El backend ya los devuelve ordenados por última actividad
+      const allChats: FrontendChat[] = threads.map((thread) => ({
+        id: `match-${thread.match_id}`,
+        matchId: thread.match_id,
+        userId: thread.partner_id,
+        matchedOn: thread.last_activity,
+        lastMessage: thread.last_message ? {
+          ...thread.last_message,
+          isCurrentUser: thread.last_message.sender_id !== thread.partner_id
+        } : undefined,
+        unreadCount: thread.unread_count,
+        currentUserId,
+        user: {
+          id: thread.partner_id,
+          name: thread.partner_username,
+          username: thread.partner_username,
+          image: thread.partner_image || '/favicon.ico',
+          avatar: thread.partner_image || '/default-avatar.png',
+          bio: '',
+          onlineStatus: false,
+          location: '',
+          skillLevel: '',
+        }
+      }) as FrontendChat);
 
       console.log('Chats finales cargados:', allChats);
       setMatches(allChats);
@@ -214,6 +154,103 @@ const MessagesPage = () => {
     loadMatchesWithChatInfo();
   }, [loadMatchesWithChatInfo]);
 
+  // Mensajes en tiempo real: se agregan al chat abierto y actualizan la bandeja
+  const selectedMatchRef = useRef<FrontendChat | null>(null);
+  const messagesRef = useRef<FrontendMessage[]>([]);
+  useEffect(() => {
+    selectedMatchRef.current = selectedMatch;
+  }, [selectedMatch]);
+  useEffect(() => {
+    messagesRef.current = messages;
+  }, [messages]);
+
+  useEffect(() => {
+    let socket: WebSocket | null = null;
+    let retry: ReturnType<typeof setTimeout> | null = null;
+    let closed = false;
+    let reconnecting = false;
+
+    // Al reconectar, traer solo lo que llegó mientras el socket estuvo caído
+    const syncOpenChat = async () => {
+      const open = selectedMatchRef.current;
+      const last = messagesRef.current[messagesRef.current.length - 1];
+      if (!open?.matchId || !last) return;
+      try {
+        const { messages: newer } = await chatService.getChatMessages(open.matchId, last.id);
+        if (newer.length === 0) return;
+        setMessages(prev => [...prev, ...newer.filter(n => !prev.some(p => p.id === n.id))]);
+      } catch (error) {
+        console.error('Error sincronizando mensajes:', error);
+      }
+    };
+
+    const connect = () => {
+      socket = chatService.openSocket((msg) => {
+        const matchId = msg.match_id || msg.MatchesID || 0;
+        const open = selectedMatchRef.current;
+        const toFrontend = (partnerId: number): FrontendMessage => ({
+          id: msg.id,
+          match_id: matchId,
+          sender_id: msg.sender_id || 0,
+          content: msg.content || '',
+          created_at: msg.created_at || new Date().toISOString(),
+          read: !!msg.read,
+          isCurrentUser: msg.sender_id !== partnerId
+        });
+
+        setMatches(prev => prev.map(m => {
+          if (m.matchId !== matchId) return m;
+          const message = toFrontend(m.userId);
+          const countIt = !message.isCurrentUser && open?.matchId !== matchId;
+          return {
+            ...m,
+            lastMessage: message,
+            unreadCount: countIt ? m.unreadCount + 1 : m.unreadCount
+          };
+        }));
+
+        if (open && open.matchId === matchId) {
+          setMessages(prev => {
+            if (prev.some(p => p.id === msg.id)) return prev; // ya agregado al enviarlo
+            return [...prev, toFrontend(open.userId)];
+          });
+          if (msg.sender_id === open.userId) {
+            chatService.markRead(matchId, msg.id).catch(err => console.error('Error marcando leído:', err));
+          }
+        }
+      }, (event) => {
+        const open = selectedMatchRef.current;
+        setMatches(prev => prev.map(m => {
+          // lo leí yo (esta u otra sesión): contador en 0
+          if (m.matchId !== event.match_id || event.reader_id === m.userId) return m;
+          return { ...m, unreadCount: 0 };
+        }));
+        if (open?.matchId === event.match_id && event.reader_id === open.userId) {
+          // read receipt del partner sobre mis mensajes
+          setMessages(prev => prev.map(p =>
+            p.isCurrentUser && p.id <= event.up_to_id ? { ...p, read: true } : p
+          ));
+        }
+      });
+      if (socket) {
+        socket.onopen = () => {
+          if (reconnecting) syncOpenChat();
+        };
+        socket.onclose = () => {
+          reconnecting = true;
+          if (!closed) retry = setTimeout(connect, 3000);
+        };
+      }
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      if (retry) clearTimeout(retry);
+      socket?.close();
+    };
+  }, []);
+
   // Cargar todos los mensajes cuando se selecciona un chat
   useEffect(() => {
     console.log('=== useEffect de mensajes activado ===');
@@ -251,6 +288,15 @@ const MessagesPage = () => {
           })));
           
           setMessages(chatData.messages);
+
+          const last = chatData.messages[chatData.messages.length - 1];
+          if (last && selectedMatch.unreadCount > 0) {
+            chatService.markRead(selectedMatch.matchId, last.id)
+              .then(() => setMatches(prev => prev.map(m =>
+                m.matchId === selectedMatch.matchId ? { ...m, unreadCount: 0 } : m
+              )))
+              .catch(err => console.error('Error marcando leído:', err));
+          }
           
           // Actualizar información del partner si es necesario
           if (chatData.partner_id !== selectedMatch.userId) {
@@ -328,8 +374,8 @@ const MessagesPage = () => {
           content: sentMessage.content
         });
         
-        const updatedMessages = [...messages, sentMessage];
-        setMessages(updatedMessages);
+        // puede haber llegado antes por el WebSocket
+        setMessages(prev => prev.some(p => p.id === sentMessage.id) ? prev : [...prev, sentMessage]);
         setNewMessage('');
         
         // Actualizar el último mensaje en la lista
@@ -7,7 +7,7 @@ export const useProfiles = () => {
   const [profiles, setProfiles] = useState<Profile[]>([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
-  const [skip, setSkip] = useState(0);
+  const [cursor, setCursor] = useState<string | null>(null);
   const [hasMore, setHasMore] = useState(true);
   const [lastResponseCount, setLastResponseCount] = useState<number>(0);
   const loadingRef = useRef(false); // Para evitar doble carga
@@ -37,10 +37,10 @@ export const useProfiles = () => {
     setError(null);
 
     try {
-      const suggestions = await apiService.getSuggestions(skip, 20); // Reducir a 10
+      const { items: suggestions, nextCursor } = await apiService.getSuggestions(cursor, 20);
       
       console.log('API Response:', {
-        skip,
+        cursor,
         received: suggestions.length,
         hasIds: suggestions.map(s => s.id)
       });
@@ -69,12 +69,12 @@ export const useProfiles = () => {
         return updated;
       });
       
-      setSkip(prev => prev + newSuggestions.length);
+      setCursor(nextCursor);
       setLastResponseCount(newSuggestions.length);
       
-      // Si recibimos menos de lo solicitado, probablemente no hay más
-      if (newSuggestions.length < 10) {
-        console.log(`Received less than requested (${newSuggestions.length}/10), marking as no more`);
+      // Sin cursor siguiente el backend no tiene más páginas
+      if (!nextCursor) {
+        console.log('No next cursor, marking as no more');
         setHasMore(false);
       }
       
@@ -85,7 +85,7 @@ export const useProfiles = () => {
       setLoading(false);
       loadingRef.current = false;
     }
-  }, [skip, hasMore, profiles]);
+  }, [cursor, hasMore, profiles]);
 
   // Cargar perfiles iniciales solo una vez
   useEffect(() => {
@@ -118,7 +118,7 @@ export const useProfiles = () => {
   // Reiniciar el estado
   const resetProfiles = useCallback(() => {
     setProfiles([]);
-    setSkip(0);
+    setCursor(null);
     setHasMore(true);
     setError(null);
     setLastResponseCount(0);
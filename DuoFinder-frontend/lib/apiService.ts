@@ -1,7 +1,8 @@
 // lib/apiService.ts
-import { authFetch } from './auth';
+import { authFetch, authService, API_BASE_URL } from './auth';
 import { 
   Suggestion, 
+  SuggestionsPage,
   UserProfile, 
   SwipeResponse, 
   SwipeInput,
@@ -14,7 +15,7 @@ import {
   FrontendChat
 } from './types';
 
-import { ApiMatchResponse, ApiMessageResponse, ChatInfoResponse, FrontendMessage } from '@/app/messages/message.types'
+import { ApiMatchResponse, ApiMessageResponse, ChatInfoResponse, FrontendMessage, InboxPage } from '@/app/messages/message.types'
 
 // ======================= TIPOS DE COMUNIDADES =======================
 
@@ -50,6 +51,12 @@ const getCurrentUserId = (): number | null => {
 };
 
 
+export interface ReadEvent {
+  match_id: number;
+  reader_id: number;
+  up_to_id: number;
+}
+
 // ======================= CHAT SERVICE =======================
 export const chatService = {
   // Obtener todos los matches del usuario
@@ -65,6 +72,75 @@ export const chatService = {
     return Array.isArray(matches) ? matches : [];
   },
 
+  // Long-poll (para clientes sin WebSocket): espera hasta `timeout` s por mensajes después de afterId
+  waitForUpdates: async (matchId: number, afterId: number, timeout: number = 25): Promise<ApiMessageResponse[]> => {
+    const params = new URLSearchParams({ after_id: String(afterId), timeout: String(timeout) });
+    const response = await authFetch(`/chats/chats/${matchId}/updates?${params.toString()}`);
+
+    if (!response.ok) {
+      const errorData = await response.json();
+      throw new Error(errorData.detail || 'Error fetching chat updates');
+    }
+
+    const messages = await response.json();
+    return Array.isArray(messages) ? messages : [];
+  },
+
+  // Marcar como leído todo lo recibido hasta upToId (watermark)
+  markRead: async (matchId: number, upToId: number): Promise<{ unread_count: number }> => {
+    const response = await authFetch(`/chats/chats/${matchId}/read`, {
+      method: 'POST',
+      body: JSON.stringify({ up_to_id: upToId }),
+    });
+
+    if (!response.ok) {
+      const errorData = await response.json();
+      throw new Error(errorData.detail || 'Error marking chat as read');
+    }
+
+    return response.json();
+  },
+
+  // Eventos en tiempo real (todos mis matches) por WebSocket: mensajes nuevos y read receipts
+  openSocket: (
+    onMessage: (message: ApiMessageResponse) => void,
+    onRead?: (event: ReadEvent) => void
+  ): WebSocket | null => {
+    const token = authService.getToken();
+    if (!token || typeof window === 'undefined') return null;
+
+    const wsUrl = `${API_BASE_URL.replace(/^http/, 'ws')}/chats/chats/ws?token=${encodeURIComponent(token)}`;
+    const socket = new WebSocket(wsUrl);
+    socket.onmessage = (event) => {
+      try {
+        const data = JSON.parse(event.data);
+        if (data.type === 'message' && data.message) onMessage(data.message);
+        else if (data.type === 'read' && onRead) onRead(data as ReadEvent);
+      } catch (error) {
+        console.error('Evento de chat inválido:', error);
+      }
+    };
+    return socket;
+  },
+
+  // Bandeja de chats: partner, imagen, último mensaje y no leídos en una sola llamada
+  getInbox: async (cursor: string | null = null, limit: number = 50): Promise<InboxPage> => {
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (cursor) params.set('cursor', cursor);
+    const response = await authFetch(`/chats/chats/inbox?${params.toString()}`);
+
+    if (!response.ok) {
+      const errorData = await response.json();
+      throw new Error(errorData.detail || 'Error fetching inbox');
+    }
+
+    const items = await response.json();
+    return {
+      items: Array.isArray(items) ? items : [],
+      nextCursor: response.headers.get('X-Next-Cursor'),
+    };
+  },
+
   // Obtener información del chat para un match específico
   getChatInfo: async (matchId: number): Promise<{
     partner_id: number;
@@ -83,14 +159,15 @@ export const chatService = {
     return await response.json();
   },
 
-  // Obtener todos los mensajes de un chat específico
-  getChatMessages: async (matchId: number): Promise<{
+  // Obtener los mensajes de un chat (los más recientes, o solo los nuevos después de afterId)
+  getChatMessages: async (matchId: number, afterId?: number): Promise<{
     partner_id: number;
     partner_username: string;
     messages: FrontendMessage[];
   }> => {
     try {
-      const response = await authFetch(`/chats/chats/${matchId}`);
+      const query = afterId ? `?after_id=${afterId}` : '';
+      const response = await authFetch(`/chats/chats/${matchId}${query}`);
       
       if (!response.ok) {
         const errorData = await response.json();
@@ -295,7 +372,11 @@ export const apiService = {
       throw new Error(errorData.detail || 'Failed to update profile');
     }
 
-    return await response.json();
+    const data: UpdateProfileResponse = await response.json();
+    if (data.access_token && typeof window !== 'undefined') {
+      localStorage.setItem('access_token', data.access_token);
+    }
+    return data;
   },
 
   deleteAccount: async (): Promise<{ message: string }> => {
@@ -312,14 +393,17 @@ export const apiService = {
   },
 
   // === DISCOVER & MATCHING ===
-  getSuggestions: async (skip: number = 0, limit: number = 20): Promise<Suggestion[]> => {
-    const response = await authFetch(`/matches/suggestions?skip=${skip}&limit=${limit}`);
+  getSuggestions: async (cursor: string | null = null, limit: number = 20): Promise<SuggestionsPage> => {
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (cursor) params.set('cursor', cursor);
+    const response = await authFetch(`/matches/suggestions?${params.toString()}`);
     
     if (!response.ok) {
       throw new Error('Error fetching suggestions');
     }
 
-    return response.json();
+    const items: Suggestion[] = await response.json();
+    return { items, nextCursor: response.headers.get('X-Next-Cursor') };
   },
 
   swipeUser: async (data: SwipeInput): Promise<SwipeResponse> => {
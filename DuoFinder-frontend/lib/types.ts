@@ -18,6 +18,11 @@ export interface GameSkill {
   isRanked: boolean;
 }
 
+export interface SuggestionsPage {
+  items: Suggestion[];
+  nextCursor: string | null;
+}
+
 export interface Profile {
   id: number;
   username: string;
@@ -88,6 +93,7 @@ export interface UpdateProfileRequest {
 
 export interface UpdateProfileResponse {
   message: string;
+  access_token?: string | null; // nuevo token si cambió la contraseña (el anterior queda revocado)
   new_profile: {
     username: string;
     email: string;
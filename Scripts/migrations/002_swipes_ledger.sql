@@ -0,0 +1,21 @@
+-- Ledger append-only de swipes: (actor, target, like, fecha), clustered por actor.
+-- Solo los likes mutuos se promueven a dbo.Matches. Ver scripts/backfill_swipe_ledger.py
+-- para migrar los swipes que hoy viven en Matches.
+USE [DuoFinderDB]
+GO
+IF OBJECT_ID(N'[dbo].[Swipes]', N'U') IS NULL
+BEGIN
+    CREATE TABLE [dbo].[Swipes](
+        [ID] [bigint] IDENTITY(1,1) NOT NULL,
+        [ActorID] [int] NOT NULL,
+        [TargetID] [int] NOT NULL,
+        [Liked] [bit] NOT NULL,
+        [CreatedDate] [datetime] NOT NULL,
+        CONSTRAINT [PK_Swipes] PRIMARY KEY NONCLUSTERED ([ID] ASC)
+    )
+    CREATE CLUSTERED INDEX [CIX_Swipes_Actor] ON [dbo].[Swipes] ([ActorID] ASC, [TargetID] ASC, [ID] ASC)
+    CREATE NONCLUSTERED INDEX [IX_Swipes_Target] ON [dbo].[Swipes] ([TargetID] ASC, [ActorID] ASC, [ID] ASC) INCLUDE ([Liked])
+    ALTER TABLE [dbo].[Swipes] WITH CHECK ADD CONSTRAINT [FK_Swipes_Actor] FOREIGN KEY([ActorID]) REFERENCES [dbo].[User] ([ID])
+    ALTER TABLE [dbo].[Swipes] WITH CHECK ADD CONSTRAINT [FK_Swipes_Target] FOREIGN KEY([TargetID]) REFERENCES [dbo].[User] ([ID])
+END
+GO
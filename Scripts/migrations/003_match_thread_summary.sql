@@ -0,0 +1,33 @@
+-- Resumen por match para la bandeja de chats: último mensaje y no leídos por participante.
+-- Lo mantienen send_message y el batch de swipes (mensaje de sistema) al escribir.
+USE [DuoFinderDB]
+GO
+IF OBJECT_ID(N'[dbo].[MatchThreadSummary]', N'U') IS NULL
+BEGIN
+    CREATE TABLE [dbo].[MatchThreadSummary](
+        [MatchesID] [int] NOT NULL,
+        [LastMessageID] [int] NULL,
+        [LastSenderID] [int] NULL,
+        [LastPreview] [nvarchar](200) NULL,
+        [LastActivity] [datetime] NULL,
+        [UnreadUser1] [int] NOT NULL CONSTRAINT [DF_MatchThreadSummary_Unread1] DEFAULT ((0)),
+        [UnreadUser2] [int] NOT NULL CONSTRAINT [DF_MatchThreadSummary_Unread2] DEFAULT ((0)),
+        CONSTRAINT [PK_MatchThreadSummary] PRIMARY KEY CLUSTERED ([MatchesID] ASC)
+    )
+    ALTER TABLE [dbo].[MatchThreadSummary] WITH CHECK ADD CONSTRAINT [FK_MatchThreadSummary_Matches] FOREIGN KEY([MatchesID]) REFERENCES [dbo].[Matches] ([ID])
+END
+GO
+-- Backfill de los matches que ya tienen mensajes
+INSERT INTO [dbo].[MatchThreadSummary] (MatchesID, LastMessageID, LastSenderID, LastPreview, LastActivity, UnreadUser1, UnreadUser2)
+SELECT m.ID, l.ID, l.SenderID, LEFT(l.ContentChat, 200), l.CreatedDate,
+       (SELECT COUNT(*) FROM [dbo].[Chat] c WHERE c.MatchesID = m.ID AND c.ReadChat = 0 AND c.SenderID <> m.UserID1),
+       (SELECT COUNT(*) FROM [dbo].[Chat] c WHERE c.MatchesID = m.ID AND c.ReadChat = 0 AND c.SenderID <> m.UserID2)
+FROM [dbo].[Matches] m
+CROSS APPLY (
+    SELECT TOP 1 c.ID, c.SenderID, c.ContentChat, c.CreatedDate
+    FROM [dbo].[Chat] c
+    WHERE c.MatchesID = m.ID
+    ORDER BY c.CreatedDate DESC, c.ID DESC
+) l
+WHERE NOT EXISTS (SELECT 1 FROM [dbo].[MatchThreadSummary] s WHERE s.MatchesID = m.ID)
+GO
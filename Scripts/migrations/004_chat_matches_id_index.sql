@@ -0,0 +1,7 @@
+-- Índice para paginar el historial de chat por cursor (before_id / after_id).
+USE [DuoFinderDB]
+GO
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_Chat_MatchesID_ID' AND object_id = OBJECT_ID(N'[dbo].[Chat]'))
+CREATE NONCLUSTERED INDEX [IX_Chat_MatchesID_ID] ON [dbo].[Chat] ([MatchesID] ASC, [ID] ASC)
+    INCLUDE ([SenderID], [CreatedDate], [ReadChat])
+GO
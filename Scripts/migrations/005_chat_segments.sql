@@ -0,0 +1,20 @@
+-- Segmentos comprimidos (JSON + zlib) con los mensajes viejos de cada match.
+-- Los llena DuoFinder-backend/scripts/compact_chat.py; dbo.Chat queda solo con lo reciente.
+USE [DuoFinderDB]
+GO
+IF OBJECT_ID(N'[dbo].[ChatSegment]', N'U') IS NULL
+BEGIN
+    CREATE TABLE [dbo].[ChatSegment](
+        [MatchesID] [int] NOT NULL,
+        [SegmentNo] [int] NOT NULL,
+        [FirstID] [int] NOT NULL,
+        [LastID] [int] NOT NULL,
+        [MessageCount] [int] NOT NULL,
+        [FirstDate] [datetime] NULL,
+        [LastDate] [datetime] NULL,
+        [Payload] [varbinary](max) NOT NULL,
+        CONSTRAINT [PK_ChatSegment] PRIMARY KEY CLUSTERED ([MatchesID] ASC, [SegmentNo] ASC),
+        CONSTRAINT [FK_ChatSegment_Matches] FOREIGN KEY ([MatchesID]) REFERENCES [dbo].[Matches] ([ID])
+    )
+END
+GO
@@ -0,0 +1,16 @@
+-- Época de tokens por usuario (revocación de JWT al cambiar la contraseña o dar de baja la cuenta).
+-- Solo tienen fila los usuarios que alguna vez revocaron; los workers leen los cambios por UpdatedAt.
+USE [DuoFinderDB]
+GO
+IF OBJECT_ID(N'[dbo].[UserTokenEpoch]', N'U') IS NULL
+BEGIN
+    CREATE TABLE [dbo].[UserTokenEpoch](
+        [UserID] [int] NOT NULL,
+        [Epoch] [int] NOT NULL CONSTRAINT [DF_UserTokenEpoch_Epoch] DEFAULT ((0)),
+        [UpdatedAt] [datetime] NOT NULL,
+        CONSTRAINT [PK_UserTokenEpoch] PRIMARY KEY CLUSTERED ([UserID] ASC)
+    )
+    ALTER TABLE [dbo].[UserTokenEpoch] WITH CHECK ADD CONSTRAINT [FK_UserTokenEpoch_User] FOREIGN KEY([UserID]) REFERENCES [dbo].[User] ([ID])
+    CREATE NONCLUSTERED INDEX [IX_UserTokenEpoch_UpdatedAt] ON [dbo].[UserTokenEpoch] ([UpdatedAt] ASC) INCLUDE ([Epoch])
+END
+GO